@@ -0,0 +1,127 @@
+# Arquivo: benchmarks/bench_backend_c.py
+
+# Gerador de C (cc -O2 -fwrapv) contra o LLVM IR (llc/clang -O2) nos mesmos programas, já
+# otimizados no TAC com -O2: tempo de compilação, tempo de execução e se a saída é igual.
+# Uso: python benchmarks/bench_backend_c.py [escala]
+
+import os
+import sys
+import tempfile
+
+from common import gerar_tac, build_native, run_native, melhor_tempo, LLVMGenerator
+from src.c_generator import CGenerator
+from src.tac.licm import LoopInvariantCodeMotion
+from src.tac.induction import InductionVariableStrengthReduction
+from src.tac.write_coalescing import WriteCoalescing
+from src.tac.peephole import PeepholeOptimizer
+
+PROGRAMAS = {
+    "primos": """
+inteiro n;
+inteiro i;
+inteiro d;
+inteiro primo;
+inteiro total;
+leia(n);
+total <- 0;
+i <- 2;
+enquanto (i <= n) faca
+    primo <- 1;
+    d <- 2;
+    enquanto (d * d <= i && primo) faca
+        se (i - i / d * d == 0) entao
+            primo <- 0;
+        fimse
+        d <- d + 1;
+    fimenquanto
+    total <- total + primo;
+    i <- i + 1;
+fimenquanto
+escreva(total);
+""",
+    "matriz": """
+inteiro n;
+inteiro i;
+inteiro j;
+inteiro k;
+inteiro s;
+leia(n);
+s <- 0;
+i <- 0;
+enquanto (i < n) faca
+    j <- 0;
+    enquanto (j < n) faca
+        k <- 0;
+        enquanto (k < n) faca
+            s <- s + (i * n + k) * (k * n + j) - s / 7;
+            k <- k + 1;
+        fimenquanto
+        j <- j + 1;
+    fimenquanto
+    i <- i + 1;
+fimenquanto
+escreva(s);
+""",
+    "newton": """
+real r;
+real s;
+inteiro i;
+inteiro k;
+inteiro n;
+leia(n);
+s <- 0;
+i <- 1;
+enquanto (i <= n) faca
+    r <- i;
+    k <- 0;
+    enquanto (k < 8) faca
+        r <- (r + i / r) / 2;
+        k <- k + 1;
+    fimenquanto
+    s <- s + r;
+    i <- i + 1;
+fimenquanto
+escreva(s);
+""",
+    "escreve": """
+inteiro i;
+inteiro n;
+leia(n);
+i <- 0;
+enquanto (i < n) faca
+    escreva(i);
+    se (i - i / 10 * 10 == 9) entao
+        escreva("\\n");
+    fimse
+    i <- i + 1;
+fimenquanto
+""",
+}
+QUANTIDADES = {"primos": 400000, "matriz": 300, "newton": 2000000, "escreve": 3000000}
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    passes = [LoopInvariantCodeMotion(), InductionVariableStrengthReduction(), WriteCoalescing(), PeepholeOptimizer()]
+    print(f"{'programa':<8} {'LLVM build (s)':>15} {'C build (s)':>12} {'LLVM exec (s)':>14} {'C exec (s)':>11} "
+          f"{'C/LLVM':>7}  saída igual")
+    for nome, fonte in PROGRAMAS.items():
+        n = max(1, int(QUANTIDADES[nome] * escala))
+        tac_code, tabela = gerar_tac(fonte, passes)
+        codigos = {".ll": LLVMGenerator(tabela).generate(list(tac_code)), ".c": CGenerator(tabela).generate(tac_code)}
+        compilacao, execucao, saidas = {}, {}, {}
+        for extensao, codigo in codigos.items():
+            exe_path = os.path.join(pasta, f"{nome}_{extensao[1:]}")
+            _, compilacao[extensao] = melhor_tempo(lambda: build_native(codigo, exe_path, "-O2", extensao), 1)
+            if not os.path.exists(exe_path):
+                print(f"sem compilador para {extensao}")
+                return
+            saidas[extensao], execucao[extensao] = run_native(exe_path, str(n))
+        print(f"{nome:<8} {compilacao['.ll']:>15.3f} {compilacao['.c']:>12.3f} {execucao['.ll']:>14.3f} "
+              f"{execucao['.c']:>11.3f} {execucao['.c'] / execucao['.ll']:>6.2f}x  "
+              f"{'sim' if saidas['.ll'] == saidas['.c'] else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Arquivo: benchmarks/bench_backend_x86.py
+
+# Gerador de assembly x86-64 (as + cc, registradores por varredura linear) contra o LLVM IR
+# compilado com -O1, nos programas de bench_backend_c já otimizados no TAC com -O2: tempo de
+# build (geração do código final + compilação + ligação), tempo de execução e se a saída é igual.
+# Uso: python benchmarks/bench_backend_x86.py [escala]
+
+import os
+import sys
+import tempfile
+
+from common import gerar_tac, build_native, run_native, melhor_tempo, LLVMGenerator
+from bench_backend_c import PROGRAMAS, QUANTIDADES
+from src.x86_generator import X86Generator
+from src.tac.licm import LoopInvariantCodeMotion
+from src.tac.induction import InductionVariableStrengthReduction
+from src.tac.write_coalescing import WriteCoalescing
+from src.tac.peephole import PeepholeOptimizer
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    passes = [LoopInvariantCodeMotion(), InductionVariableStrengthReduction(), WriteCoalescing(), PeepholeOptimizer()]
+    backends = {".ll": ("-O1", lambda tac, tabela: LLVMGenerator(tabela).generate(list(tac))),
+                ".s": ("-O0", lambda tac, tabela: X86Generator(tabela).generate(tac))}
+    print(f"{'programa':<8} {'LLVM build (s)':>15} {'x86 build (s)':>14} {'LLVM exec (s)':>14} {'x86 exec (s)':>13} "
+          f"{'x86/LLVM':>9}  saída igual")
+    for nome, fonte in PROGRAMAS.items():
+        n = max(1, int(QUANTIDADES[nome] * escala))
+        tac_code, tabela = gerar_tac(fonte, passes)
+        compilacao, execucao, saidas = {}, {}, {}
+        for extensao, (nivel, gerar) in backends.items():
+            exe_path = os.path.join(pasta, f"{nome}_{extensao[1:]}")
+            _, compilacao[extensao] = melhor_tempo(
+                lambda: build_native(gerar(tac_code, tabela), exe_path, nivel, extensao), 3)
+            if not os.path.exists(exe_path):
+                print(f"sem ferramentas para {extensao}")
+                return
+            execucoes = [run_native(exe_path, str(n)) for _ in range(3)]
+            saidas[extensao] = execucoes[0][0]
+            execucao[extensao] = min(tempo for _, tempo in execucoes)
+        print(f"{nome:<8} {compilacao['.ll']:>15.3f} {compilacao['.s']:>14.3f} {execucao['.ll']:>14.3f} "
+              f"{execucao['.s']:>13.3f} {execucao['.s'] / execucao['.ll']:>8.2f}x  "
+              f"{'sim' if saidas['.ll'] == saidas['.s'] else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
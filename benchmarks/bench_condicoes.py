@@ -0,0 +1,69 @@
+# Arquivo: benchmarks/bench_condicoes.py
+
+# Compara a avaliação completa de '&&'/'||' com o código de curto-circuito
+# e com os desvios de comparação fundidos (IF_LT, IF_GE, ...).
+# Uso: python benchmarks/bench_condicoes.py [escala]
+
+import os
+import sys
+import tempfile
+
+from common import gerar_tac, build_native, run_native, executar_tac, LLVMGenerator
+
+PROGRAMAS = {
+    "filtro": """
+inteiro i; inteiro n; inteiro c;
+leia(n);
+i <- 0; c <- 0;
+enquanto (i < n) faca
+    se (i > 100 && i < 200 && i != 150) entao
+        c <- c + 1;
+    fimse
+    se (i == 7 || i == 70 || i == 700) entao
+        c <- c + 10;
+    fimse
+    i <- i + 1;
+fimenquanto
+escreva(c);
+""",
+    "valor": """
+inteiro i; inteiro n; inteiro c; inteiro x;
+leia(n);
+i <- 0; c <- 0;
+enquanto (i < n && c >= 0) faca
+    x <- i > 1000 && i < 2000;
+    c <- c + x;
+    i <- i + 1;
+fimenquanto
+escreva(c);
+""",
+}
+
+ENTRADAS = {"filtro": 100000000, "valor": 100000000}
+ENTRADAS_TAC = {"filtro": 3000, "valor": 3000}
+
+MODOS = [("completa", False, False), ("curto-circuito", True, False), ("fundido", True, True)]
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    print(f"{'programa':<8} {'modo':<14} {'instr. exec.':>13} {'desvios exec.':>14} {'comparações':>12} {'nativo -O0 (s)':>15}")
+    for nome, fonte in PROGRAMAS.items():
+        entrada = str(int(ENTRADAS[nome] * escala))
+        referencia = None
+        for modo, short_circuit, fuse_branches in MODOS:
+            tac_code, tabela = gerar_tac(fonte, short_circuit=short_circuit, fuse_branches=fuse_branches)
+            _, contadores = executar_tac(tac_code, str(ENTRADAS_TAC[nome]))
+            exe = build_native(LLVMGenerator(tabela).generate(tac_code), os.path.join(pasta, f"{nome}_{modo}"))
+            tempo = "-"
+            if exe:
+                saida, decorrido = run_native(exe, entrada)
+                referencia = referencia or saida
+                assert saida == referencia, f"{nome}/{modo}: saída diferente"
+                tempo = f"{decorrido:.3f}"
+            print(f"{nome:<8} {modo:<14} {contadores['instrucoes']:>13} {contadores['desvios']:>14} {contadores['comparacoes']:>12} {tempo:>15}")
+
+
+if __name__ == "__main__":
+    main()
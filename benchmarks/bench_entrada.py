@@ -0,0 +1,151 @@
+# Arquivo: benchmarks/bench_entrada.py
+
+# Leitura da entrada nos modos interpretados: o ProgramIO lendo em blocos e convertendo um
+# número por leia com uma expressão regular, contra o leitor anterior (uma linha por vez e
+# um caractere por chamada), com o programa traduzido para Python (--python) somando
+# alguns milhões de números. Também a entrada já em memória (ProgramIO.replay, o --entrada)
+# e o executável nativo: tempo, MB/s e se a saída é igual.
+# Uso: python benchmarks/bench_entrada.py [escala]
+
+import io
+import os
+import random
+import sys
+import tempfile
+
+from common import front_end, build_native, run_native, gerar_tac, melhor_tempo, LLVMGenerator
+from src.interpreter.transpiler import Transpiler, executar_codigo
+from src.interpreter.runtime import ProgramIO, int32, _NUMERO_REAL
+
+SOMA_INTEIROS = """
+inteiro n;
+inteiro i;
+inteiro x;
+inteiro soma;
+leia(n);
+soma <- 0;
+i <- 0;
+enquanto (i < n) faca
+    leia(x);
+    soma <- soma + x;
+    i <- i + 1;
+fimenquanto
+escreva(soma);
+"""
+SOMA_REAIS = """
+inteiro n;
+inteiro i;
+real x;
+real soma;
+leia(n);
+soma <- 0;
+i <- 0;
+enquanto (i < n) faca
+    leia(x);
+    soma <- soma + x;
+    i <- i + 1;
+fimenquanto
+escreva(soma);
+"""
+QUANTIDADES = {"inteiros": 1000000, "reais": 400000}
+_ESPACOS = " \t\n\r\v\f"
+
+
+#O leitor anterior: readline a cada linha e _peek a cada caractere
+class ProgramIOPorCaractere(ProgramIO):
+    def __init__(self, entrada, saida):
+        super().__init__(entrada, saida)
+        self.linha = ""
+
+    def _peek(self):
+        if self.pos == len(self.linha):
+            self.flush()
+            self.linha = self.entrada.readline()
+            self.pos = 0
+            if not self.linha:
+                return ""
+        return self.linha[self.pos]
+
+    def _skip_spaces(self):
+        c = self._peek()
+        while c and c in _ESPACOS:
+            self.pos += 1
+            c = self._peek()
+        return c
+
+    def read_int(self, atual):
+        c = self._skip_spaces()
+        negativo = False
+        if c == "-" or c == "+":
+            negativo = c == "-"
+            self.pos += 1
+            c = self._peek()
+        if not c or not "0" <= c <= "9":
+            return atual
+        valor = 0
+        while c and "0" <= c <= "9":
+            valor = valor * 10 + ord(c) - 48
+            self.pos += 1
+            c = self._peek()
+        return int32(-valor if negativo else valor)
+
+    def read_real(self, atual):
+        c = self._skip_spaces()
+        texto = []
+        while c and (c in "0123456789.+-eE") and len(texto) < 63:
+            texto.append(c)
+            self.pos += 1
+            c = self._peek()
+        numero = _NUMERO_REAL.match("".join(texto))
+        return float(numero.group(0)) if numero else atual
+
+
+def gerar_entrada(nome, quantidade):
+    gerador = random.Random(quantidade)
+    if nome == "inteiros":
+        numeros = (str(gerador.randint(-10 ** 6, 10 ** 6)) for _ in range(quantidade))
+    else:
+        numeros = ("%.4f" % gerador.uniform(-1000, 1000) for _ in range(quantidade))
+    #Dez números por linha, como um arquivo de dados
+    linhas = []
+    numeros = list(numeros)
+    for i in range(0, quantidade, 10):
+        linhas.append(" ".join(numeros[i:i + 10]))
+    return f"{quantidade}\n" + "\n".join(linhas) + "\n"
+
+
+def executar(codigo, criar_io):
+    saida = io.StringIO()
+    executar_codigo(codigo, criar_io(saida))
+    return saida.getvalue()
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    print(f"{'programa':<9} {'MB':>6} {'por caractere (s)':>18} {'em blocos (s)':>14} {'replay (s)':>11} "
+          f"{'nativo (s)':>11} {'MB/s':>7} {'ganho':>7}  saída igual")
+    for nome, fonte in (("inteiros", SOMA_INTEIROS), ("reais", SOMA_REAIS)):
+        entrada = gerar_entrada(nome, max(1, int(QUANTIDADES[nome] * escala)))
+        dados = entrada.encode("latin-1")
+        arvore, tabela = front_end(fonte)
+        codigo = Transpiler(tabela).compile(arvore)
+        saidas = {}
+        saidas["caractere"], caractere = melhor_tempo(
+            lambda: executar(codigo, lambda s: ProgramIOPorCaractere(io.StringIO(entrada), s)), 1)
+        #Como o stdin num pipe: bytes, lidos com read1
+        saidas["blocos"], blocos = melhor_tempo(
+            lambda: executar(codigo, lambda s: ProgramIO(io.BufferedReader(io.BytesIO(dados)), s)), 3)
+        saidas["replay"], replay = melhor_tempo(lambda: executar(codigo, lambda s: ProgramIO.replay(entrada, s)), 3)
+        nativo = float("nan")
+        exe_path = os.path.join(pasta, nome)
+        if build_native(LLVMGenerator(tabela).generate(list(gerar_tac(fonte)[0])), exe_path, "-O2") is not None:
+            saidas["nativo"], nativo = run_native(exe_path, entrada)
+        megabytes = len(dados) / 1e6
+        iguais = len(set(saidas.values())) == 1
+        print(f"{nome:<9} {megabytes:>6.1f} {caractere:>18.3f} {blocos:>14.3f} {replay:>11.3f} {nativo:>11.3f} "
+              f"{megabytes / blocos:>7.1f} {caractere / blocos:>6.1f}x  {'sim' if iguais else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
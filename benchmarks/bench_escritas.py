@@ -0,0 +1,70 @@
+# Arquivo: benchmarks/bench_escritas.py
+
+# Efeito da junção de escritas constantes (passe 'writes', ativo a partir de -O1) em
+# programas que escrevem muito: chamadas ao printf feitas pelo código gerado, tamanho
+# do LLVM IR e tempo de execução nativa com a saída capturada.
+# Uso: python benchmarks/bench_escritas.py [escala]
+
+import os
+import sys
+import tempfile
+
+from common import front_end, build_native, run_native, executar_tac, LLVMGenerator
+from src.tac.TACGenerator import TACGenerator
+from src.tac.pass_manager import PassManager
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+PROGRAMAS = {
+    "pascal": open(os.path.join(RAIZ, "exemplos", "pascal.arara"), encoding="utf-8").read(),
+    "moldura": """
+inteiro i; inteiro j; inteiro n;
+leia(n);
+i <- 0;
+enquanto (i < n) faca
+    escreva("|");
+    j <- 0;
+    enquanto (j < n) faca
+        escreva("*");
+        j <- j + 1;
+    fimenquanto
+    escreva("|");
+    escreva(0);
+    escreva("\\n");
+    i <- i + 1;
+fimenquanto
+""",
+}
+ENTRADAS = {"pascal": 2000, "moldura": 3000}
+ENTRADAS_TAC = {"pascal": 60, "moldura": 100}
+
+
+def gerar(fonte, nivel):
+    arvore, tabela = front_end(fonte)
+    generator = TACGenerator(reuse_temps=nivel == 0, symbols=tabela)
+    generator.visit(arvore)
+    return PassManager.for_level(nivel).run(generator.tac_instructions), tabela
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    print(f"{'programa':<9} {'nível':<6} {'printf (TAC)':>13} {'linhas IR':>10} {'nativo -O0 (s)':>15}")
+    for nome, fonte in PROGRAMAS.items():
+        referencia = None
+        for nivel in (0, 1):
+            tac_code, tabela = gerar(fonte, nivel)
+            _, contadores = executar_tac(tac_code, str(ENTRADAS_TAC[nome]))
+            llvm_ir = LLVMGenerator(tabela).generate(list(tac_code))
+            exe = build_native(llvm_ir, os.path.join(pasta, f"{nome}_{nivel}"))
+            tempo = "-"
+            if exe:
+                saida, decorrido = run_native(exe, str(max(1, int(ENTRADAS[nome] * escala))))
+                referencia = referencia or saida
+                assert saida == referencia, f"{nome}: saída diferente com -O{nivel}"
+                tempo = f"{decorrido:.3f}"
+            print(f"{nome:<9} -O{nivel:<4} {contadores['escritas']:>13} {llvm_ir.count(chr(10)):>10} {tempo:>15}")
+
+
+if __name__ == "__main__":
+    main()
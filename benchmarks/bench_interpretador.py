@@ -0,0 +1,178 @@
+# Arquivo: benchmarks/bench_interpretador.py
+
+# Interpretador compilado para closures (--interpretar) contra um visitor ingênuo que avalia
+# a árvore sintática a cada execução (visit por nó, operador decodificado com getText e tipo
+# decidido em tempo de execução), em laços como os do triângulo de Pascal e nos programas de
+# bench_backend_c: tempo de execução, razão e se a saída é igual.
+# Uso: python benchmarks/bench_interpretador.py [escala]
+
+import io
+import sys
+
+from common import front_end, melhor_tempo
+from bench_backend_c import PROGRAMAS
+from grammar.generated.AraraVisitor import AraraVisitor
+from src.interpreter.Interpreter import Interpreter
+from src.interpreter.runtime import (ProgramIO, int32, divisao_inteira, divisao_real, para_inteiro, texto_real,
+                                     decodificar_string)
+
+PASCAL = """
+inteiro n;
+inteiro linha;
+inteiro i;
+inteiro C;
+inteiro j;
+inteiro total;
+leia(n);
+total <- 0;
+linha <- 0;
+enquanto (linha < n) faca
+    j <- 0;
+    enquanto (j < n - linha - 1) faca
+        j <- j + 1;
+    fimenquanto
+    C <- 1;
+    i <- 0;
+    enquanto (i <= linha) faca
+        total <- total + C - total / 1000 * 1000;
+        C <- C * (linha - i) / (i + 1);
+        i <- i + 1;
+    fimenquanto
+    linha <- linha + 1;
+fimenquanto
+escreva(total);
+"""
+QUANTIDADES = {"pascal": 150, "primos": 5000, "matriz": 25, "newton": 5000, "escreve": 30000}
+
+
+#O interpretador como seria escrito direto sobre o visitor gerado pelo ANTLR
+class InterpretadorIngenuo(AraraVisitor):
+    def __init__(self, tabela, programa_io):
+        self.tabela = tabela
+        self.io = programa_io
+        self.memoria = {nome: 0.0 if tipo == "real" else 0 for nome, tipo in tabela.items()}
+
+    def visitComandoLeia(self, ctx):
+        nome = ctx.ID().getText()
+        leitura = self.io.read_real if self.tabela[nome] == "real" else self.io.read_int
+        self.memoria[nome] = leitura(self.memoria[nome])
+
+    def visitComandoEscreva(self, ctx):
+        valor = self.visit(ctx.expressao())
+        if isinstance(valor, str):
+            self.io.write(valor)
+        elif isinstance(valor, float):
+            self.io.write(texto_real(valor))
+        else:
+            self.io.write("%d " % valor)
+
+    def visitComandoAtrib(self, ctx):
+        nome = ctx.ID().getText()
+        valor = self.visit(ctx.expressao())
+        if self.tabela[nome] == "real":
+            self.memoria[nome] = float(valor)
+        else:
+            self.memoria[nome] = para_inteiro(valor) if isinstance(valor, float) else valor
+
+    def visitCondicional(self, ctx):
+        if self.visit(ctx.expressao()):
+            self.visit(ctx.bloco())
+        elif ctx.cond_opc().SENAO():
+            self.visit(ctx.cond_opc().bloco())
+
+    def visitRepeticao(self, ctx):
+        while self.visit(ctx.expressao()):
+            self.visit(ctx.bloco())
+
+    def visitLogica(self, ctx):
+        valor = self.visit(ctx.comparacao())
+        suf = ctx.logica_suf()
+        while suf.OPLOG():
+            if suf.OPLOG().getText() == "&&":
+                valor = int(bool(valor) and bool(self.visit(suf.comparacao())))
+            else:
+                valor = int(bool(valor) or bool(self.visit(suf.comparacao())))
+            suf = suf.logica_suf()
+        return valor
+
+    def visitComparacao(self, ctx):
+        a = self.visit(ctx.soma())
+        suf = ctx.comparacao_suf()
+        if not suf.OPCOMP():
+            return a
+        op = suf.OPCOMP().getText()
+        b = self.visit(suf.soma())
+        if op == "==":
+            return int(a == b)
+        elif op == "!=":
+            return int(a != b)
+        elif op == "<":
+            return int(a < b)
+        elif op == "<=":
+            return int(a <= b)
+        elif op == ">":
+            return int(a > b)
+        return int(a >= b)
+
+    def visitSoma(self, ctx):
+        valor = self.visit(ctx.termo())
+        suf = ctx.soma_suf()
+        while suf.OPSUM():
+            outro = self.visit(suf.termo())
+            valor = valor + outro if suf.OPSUM().getText() == "+" else valor - outro
+            if not isinstance(valor, float):
+                valor = int32(valor)
+            suf = suf.soma_suf()
+        return valor
+
+    def visitTermo(self, ctx):
+        valor = self.visit(ctx.fator())
+        suf = ctx.termo_suf()
+        while suf.OPMULT():
+            outro = self.visit(suf.fator())
+            real = isinstance(valor, float) or isinstance(outro, float)
+            if suf.OPMULT().getText() == "*":
+                valor = valor * outro if real else int32(valor * outro)
+            else:
+                valor = divisao_real(valor, outro) if real else divisao_inteira(valor, outro)
+            suf = suf.termo_suf()
+        return valor
+
+    def visitFator(self, ctx):
+        if ctx.INT():
+            return int(ctx.INT().getText())
+        elif ctx.STRING():
+            return decodificar_string(ctx.STRING().getText())
+        elif ctx.ID():
+            return self.memoria[ctx.ID().getText()]
+        elif ctx.expressao():
+            return self.visit(ctx.expressao())
+        return int(not self.visit(ctx.fator()))
+
+
+def executar(interpretar, entrada):
+    saida = io.StringIO()
+    programa_io = ProgramIO(io.StringIO(entrada), saida)
+    interpretar(programa_io)
+    programa_io.flush()
+    return saida.getvalue()
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    programas = {"pascal": PASCAL, **PROGRAMAS}
+    print(f"{'programa':<8} {'visitor (s)':>12} {'closures (s)':>13} {'ganho':>7}  saída igual")
+    for nome, fonte in programas.items():
+        entrada = str(max(1, int(QUANTIDADES[nome] * escala)))
+        arvore, tabela = front_end(fonte)
+        saidas = {}
+        saidas["visitor"], visitor = melhor_tempo(
+            lambda: executar(lambda p: InterpretadorIngenuo(tabela, p).visit(arvore), entrada), 3)
+        saidas["closures"], closures = melhor_tempo(
+            lambda: executar(lambda p: Interpreter(tabela).run(arvore, p), entrada), 3)
+        print(f"{nome:<8} {visitor:>12.3f} {closures:>13.3f} {visitor / closures:>6.1f}x  "
+              f"{'sim' if saidas['visitor'] == saidas['closures'] else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Arquivo: benchmarks/bench_jit.py
+
+# Execução no próprio processo com o JIT do llvmlite contra o caminho nativo
+# (llc/clang, ligação e um processo por execução): tempo de compilar e executar cada
+# programa e vazão de muitas execuções curtas, como num harness de testes.
+# Uso: python benchmarks/bench_jit.py [escala] [execucoes]
+
+import os
+import sys
+import tempfile
+import time
+
+from common import gerar_tac, build_native, run_native, LLVMGenerator
+from bench_loops import PROGRAMAS, ENTRADAS
+from src.llvm_jit import compilar, executar, executar_compilado, jit_disponivel
+
+EXEMPLO = """
+inteiro a;
+inteiro b;
+leia(a);
+leia(b);
+escreva(a + b * 2);
+"""
+
+
+def main():
+    if not jit_disponivel():
+        print("llvmlite não está instalado; nada a medir.")
+        return
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 0.01
+    execucoes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+
+    print(f"{'programa':<11} {'JIT -O0 (s)':>12} {'JIT -O2 (s)':>12} {'nativo -O2 (s)':>15}")
+    for nome, fonte in PROGRAMAS.items():
+        entrada = f"{max(1, int(ENTRADAS[nome] * escala))}"
+        tac_code, tabela = gerar_tac(fonte)
+        llvm_ir = LLVMGenerator(tabela, runtime=False).generate(list(tac_code))
+        tempos = []
+        referencia = None
+        for nivel in (0, 2):
+            inicio = time.perf_counter()
+            _, saida = executar(llvm_ir, entrada, nivel)
+            tempos.append(f"{time.perf_counter() - inicio:.3f}")
+            referencia = referencia or saida
+            assert saida == referencia, f"{nome}: saída diferente entre os níveis do JIT"
+        inicio = time.perf_counter()
+        exe = build_native(llvm_ir, os.path.join(pasta, nome), "-O2")
+        nativo = "-"
+        if exe:
+            saida, _ = run_native(exe, entrada)
+            assert saida == referencia, f"{nome}: saída do JIT diferente da nativa"
+            nativo = f"{time.perf_counter() - inicio:.3f}"
+        print(f"{nome:<11} {tempos[0]:>12} {tempos[1]:>12} {nativo:>15}")
+
+    tac_code, tabela = gerar_tac(EXEMPLO)
+    llvm_ir = LLVMGenerator(tabela, runtime=False).generate(list(tac_code))
+    inicio = time.perf_counter()
+    for i in range(execucoes):
+        _, saida = executar(llvm_ir, f"{i} 3", 0)
+        assert saida == f"{i + 6} ", saida
+    jit = time.perf_counter() - inicio
+    print(f"\n{execucoes} execuções curtas")
+    print(f"JIT no processo, compilando a cada vez: {jit:.3f} s ({execucoes / jit:.0f}/s)")
+    inicio = time.perf_counter()
+    motor = compilar(llvm_ir, 0)
+    for i in range(execucoes):
+        _, saida = executar_compilado(motor, f"{i} 3")
+        assert saida == f"{i + 6} ", saida
+    jit = time.perf_counter() - inicio
+    print(f"JIT no processo, compilado uma vez: {jit:.3f} s ({execucoes / jit:.0f}/s)")
+    exe = build_native(llvm_ir, os.path.join(pasta, "exemplo"))
+    if exe:
+        inicio = time.perf_counter()
+        for i in range(execucoes):
+            saida, _ = run_native(exe, f"{i} 3")
+            assert saida == f"{i + 6} ", saida
+        nativo = time.perf_counter() - inicio
+        print(f"executável já compilado, um processo por execução: {nativo:.3f} s ({execucoes / nativo:.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
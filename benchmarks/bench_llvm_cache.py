@@ -0,0 +1,45 @@
+# Arquivo: benchmarks/bench_llvm_cache.py
+
+# Efeito do cache de valores por bloco no LLVM IR (loads reaproveitados, stores só no
+# fim do bloco e phi nos pontos de junção): tamanho do IR, loads/stores/phis, tempo de
+# compilação e tempo de execução do executável sem otimização (-O0).
+# Uso: python benchmarks/bench_llvm_cache.py [escala]
+
+import os
+import sys
+import tempfile
+import time
+
+from common import gerar_tac, build_native, run_native, LLVMGenerator
+from bench_loops import PROGRAMAS, ENTRADAS
+from bench_temps import programa
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    programas = dict(PROGRAMAS, expressoes=programa(200))
+    entradas = dict(ENTRADAS, expressoes=5000000)
+    print(f"{'programa':<11} {'cache':<5} {'linhas IR':>10} {'loads':>6} {'stores':>7} {'phis':>5} "
+          f"{'compilação (s)':>15} {'nativo -O0 (s)':>15}")
+    for nome, fonte in programas.items():
+        entrada = f"{int(entradas[nome] * escala)} 3"    # 'expressoes' lê dois valores
+        tac_code, tabela = gerar_tac(fonte)
+        referencia = None
+        for cache in (False, True):
+            llvm_ir = LLVMGenerator(tabela, cache_values=cache).generate(list(tac_code))
+            inicio = time.perf_counter()
+            exe = build_native(llvm_ir, os.path.join(pasta, f"{nome}_{cache}"))
+            compilacao = time.perf_counter() - inicio
+            tempo = "-"
+            if exe:
+                saida, decorrido = run_native(exe, entrada)
+                referencia = referencia or saida
+                assert saida == referencia, f"{nome}: saída diferente com o cache"
+                tempo = f"{decorrido:.3f}"
+            print(f"{nome:<11} {'sim' if cache else 'não':<5} {llvm_ir.count(chr(10)):>10} {llvm_ir.count(' = load '):>6} "
+                  f"{llvm_ir.count('    store '):>7} {llvm_ir.count(' = phi '):>5} {compilacao:>15.3f} {tempo:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Arquivo: benchmarks/bench_llvm_hints.py
+
+# Informações extras no LLVM IR (nsw nos contadores de laço, noundef e atributos nounwind/norecurse)
+# contra o mesmo IR sem elas, compilado com opt + llc -O2: tamanho do IR otimizado, tempo de
+# execução e se a saída é igual.
+# Uso: python benchmarks/bench_llvm_hints.py [escala]
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+from common import gerar_tac, build_native, run_native, LLVMGenerator
+from bench_backend_c import PROGRAMAS, QUANTIDADES
+from src.tac.licm import LoopInvariantCodeMotion
+from src.tac.induction import InductionVariableStrengthReduction
+from src.tac.write_coalescing import WriteCoalescing
+from src.tac.peephole import PeepholeOptimizer
+
+#Tira do IR tudo o que o gerador acrescenta só como informação para o otimizador
+DICAS = [(r"\nattributes #\d+ = \{[^}]*\}", ""), (r" nsw", ""), (r" noundef", ""), (r" #\d+", "")]
+
+
+def sem_dicas(llvm_ir):
+    for padrao, troca in DICAS:
+        llvm_ir = re.sub(padrao, troca, llvm_ir)
+    return llvm_ir
+
+
+#Instruções no IR depois do opt -O2 (linhas indentadas do corpo das funções)
+def instrucoes_otimizadas(caminho):
+    result = subprocess.run(["opt", "-O2", "-S", caminho], capture_output=True, text=True, check=True)
+    return sum(1 for linha in result.stdout.splitlines() if linha.startswith("  ") and not linha.startswith("  ;"))
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    passes = [LoopInvariantCodeMotion(), InductionVariableStrengthReduction(), WriteCoalescing(), PeepholeOptimizer()]
+    print(f"{'programa':<9} {'instr. sem':>11} {'instr. com':>11} {'sem (s)':>8} {'com (s)':>8} {'com/sem':>8}  saída igual")
+    for nome, fonte in PROGRAMAS.items():
+        n = max(1, int(QUANTIDADES[nome] * escala))
+        tac_code, tabela = gerar_tac(fonte, passes)
+        llvm_ir = LLVMGenerator(tabela).generate(list(tac_code))
+        instrucoes, execucao, saidas = {}, {}, {}
+        for versao, codigo in (("sem", sem_dicas(llvm_ir)), ("com", llvm_ir)):
+            exe_path = os.path.join(pasta, f"{nome}_{versao}")
+            if build_native(codigo, exe_path, "-O2") is None:
+                print("nenhum compilador nativo encontrado (clang, ou llc e cc)")
+                return
+            instrucoes[versao] = instrucoes_otimizadas(exe_path + ".ll")
+            execucoes = [run_native(exe_path, str(n)) for _ in range(3)]
+            saidas[versao] = execucoes[0][0]
+            execucao[versao] = min(tempo for _, tempo in execucoes)
+        print(f"{nome:<9} {instrucoes['sem']:>11} {instrucoes['com']:>11} {execucao['sem']:>8.3f} "
+              f"{execucao['com']:>8.3f} {execucao['com'] / execucao['sem']:>7.2f}x  "
+              f"{'sim' if saidas['sem'] == saidas['com'] else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Arquivo: benchmarks/bench_llvm_stream.py
+
+# Pico de memória da geração de LLVM IR: montando o módulo inteiro numa string
+# (generate) e escrevendo direto no arquivo, bloco a bloco (generate_to).
+# A coluna 'análise' mostra o pico só das análises feitas sobre o TAC antes da
+# emissão (temporárias que vão para a memória), que não dependem do modo.
+# Uso: python benchmarks/bench_llvm_stream.py [escala]
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import gerar_tac, LLVMGenerator
+from bench_temps import programa
+
+
+#Só aritmética, sem temporárias reaproveitadas: a emissão domina o pico
+def programa_aritmetico(n):
+    linhas = ["inteiro a; inteiro b; inteiro c;", "leia(a); leia(b); c <- 0;"]
+    for k in range(n):
+        linhas.append(f"c <- c + (a + {k}) * (b - {k}) + (a * b) / ({k} + 1); escreva(c);")
+    return "\n".join(linhas)
+
+
+def medir(funcao):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcao()
+    decorrido = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico, decorrido
+
+
+def em_string(tac_code, tabela, caminho):
+    llvm_ir = LLVMGenerator(tabela).generate(list(tac_code))
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(llvm_ir)
+
+
+def em_arquivo(tac_code, tabela, caminho):
+    with open(caminho, "w", encoding="utf-8") as f:
+        LLVMGenerator(tabela).generate_to(list(tac_code), f)
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    print(f"{'programa':<11} {'expressões':>10} {'modo':<9} {'IR (bytes)':>11} {'pico (MB)':>10} {'análise (MB)':>13} {'tempo (s)':>10}")
+    for nome, fonte, n, reuse in [(nome, fonte, int(n * escala), reuse)
+                                  for nome, fonte, reuse in [("condições", programa, True), ("aritmético", programa_aritmetico, False)]
+                                  for n in [100, 1000, 5000]]:
+        tac_code, tabela = gerar_tac(fonte(n), reuse_temps=reuse)
+        analise, _ = medir(lambda: LLVMGenerator(tabela)._memory_temps(tac_code))
+        for modo, gerar in [("string", em_string), ("arquivo", em_arquivo)]:
+            caminho = os.path.join(pasta, f"{modo}.ll")
+            pico, decorrido = medir(lambda: gerar(tac_code, tabela, caminho))
+            print(f"{nome:<11} {n:>10} {modo:<9} {os.path.getsize(caminho):>11} {pico / 2**20:>10.2f} {analise / 2**20:>13.2f} "
+                  f"{decorrido:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
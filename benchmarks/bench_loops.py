@@ -0,0 +1,114 @@
+# Arquivo: benchmarks/bench_loops.py
+
+# Benchmark dos passes de TAC (LICM, redução de força e peephole de saltos) sobre programas sintéticos.
+# Uso: python benchmarks/bench_loops.py [n]
+
+import os
+import sys
+import tempfile
+
+from common import gerar_tac, build_native, run_native, executar_tac, LLVMGenerator
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.tac.licm import LoopInvariantCodeMotion
+from src.tac.induction import InductionVariableStrengthReduction
+from src.tac.peephole import PeepholeOptimizer
+
+PROGRAMAS = {
+    "contador": """
+inteiro i; inteiro n; inteiro s;
+leia(n);
+i <- 0; s <- 0;
+enquanto (i < n) faca
+    s <- s + i * 3 + i * 5;
+    i <- i + 1;
+fimenquanto
+escreva(s);
+""",
+    "aninhado": """
+inteiro i; inteiro j; inteiro n; inteiro s;
+leia(n);
+i <- 0; s <- 0;
+enquanto (i < n) faca
+    j <- 0;
+    enquanto (j < n - i - 1) faca
+        s <- s + n * 2 - i;
+        j <- j + 1;
+    fimenquanto
+    i <- i + 1;
+fimenquanto
+escreva(s);
+""",
+    "desvios": """
+inteiro i; inteiro n; inteiro a; inteiro b;
+leia(n);
+i <- 0; a <- 0; b <- 0;
+enquanto (i < n) faca
+    se (i > 10) entao
+        se (i > 20) entao
+            a <- a + 1;
+        fimse
+    senao
+        se (i == 3) entao
+            b <- b + 1;
+        senao
+            b <- b - 1;
+        fimse
+    fimse
+    i <- i + 1;
+fimenquanto
+escreva(a); escreva(b);
+""",
+    "matriz": """
+inteiro i; inteiro j; inteiro k; inteiro n; inteiro s;
+leia(n);
+i <- 0; s <- 0;
+enquanto (i < n) faca
+    j <- 0; k <- 0;
+    enquanto (k < n) faca
+        s <- s + i * n + j * 4;
+        j <- j + 1;
+        k <- k + 1;
+    fimenquanto
+    i <- i + 1;
+fimenquanto
+escreva(s);
+""",
+}
+
+PIPELINES = {
+    "nenhum": lambda: [],
+    "licm": lambda: [LoopInvariantCodeMotion()],
+    "licm+ivsr": lambda: [LoopInvariantCodeMotion(), InductionVariableStrengthReduction()],
+    "todos": lambda: [LoopInvariantCodeMotion(), InductionVariableStrengthReduction(), PeepholeOptimizer()],
+}
+
+ENTRADAS = {"contador": 200000000, "aninhado": 20000, "desvios": 200000000, "matriz": 15000}
+# Tamanhos menores para a execução contada do TAC em Python
+ENTRADAS_TAC = {"contador": 2000, "aninhado": 60, "desvios": 2000, "matriz": 50}
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    print(f"{'programa':<10} {'passes':<10} {'TAC':>5} {'blocos LLVM':>12} {'instr. exec.':>13} {'desvios exec.':>14} {'nativo -O0 (s)':>15}")
+    for nome, fonte in PROGRAMAS.items():
+        entrada = str(int(ENTRADAS[nome] * escala))
+        referencia = None
+        for pipeline, passes in PIPELINES.items():
+            tac_code, tabela = gerar_tac(fonte, passes())
+            tamanho = len(tac_code)
+            _, contadores = executar_tac(tac_code, str(ENTRADAS_TAC[nome]))
+            llvm_ir = LLVMGenerator(tabela).generate(tac_code)
+            blocos = sum(1 for linha in llvm_ir.splitlines() if linha.endswith(":"))
+            exe = build_native(llvm_ir, os.path.join(pasta, f"{nome}_{pipeline}"))
+            tempo = "-"
+            if exe:
+                saida, decorrido = run_native(exe, entrada)
+                referencia = referencia or saida
+                assert saida == referencia, f"{nome}/{pipeline}: saída diferente"
+                tempo = f"{decorrido:.3f}"
+            print(f"{nome:<10} {pipeline:<10} {tamanho:>5} {blocos:>12} {contadores['instrucoes']:>13} "
+                  f"{contadores['desvios']:>14} {tempo:>15}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Arquivo: benchmarks/bench_outline.py
+
+# Tempo de compilação nativa (opt/llc -O2 ou clang -O2) em função do tamanho do programa, com todo o
+# programa num só @main e dividido em funções internas (OUTLINE_THRESHOLD/OUTLINE_SIZE do gerador).
+# Os programas são sequências de laços aninhados, como os gerados por máquina; no fim, um gráfico
+# em texto do tempo de compilação contra o número de instruções TAC.
+# Uso: python benchmarks/bench_outline.py [maior quantidade de laços]
+
+import os
+import sys
+import tempfile
+
+from common import gerar_tac, build_native, run_native, melhor_tempo, LLVMGenerator
+
+LARGURA_GRAFICO = 60
+
+
+def programa(lacos):
+    partes = ["inteiro i; inteiro j; inteiro s; inteiro n; leia(n); s <- 0;"]
+    for k in range(lacos):
+        partes.append(f"i <- 0; enquanto (i < n) faca j <- 0; enquanto (j < {k % 5 + 2}) faca s <- s + i * {k} - j; "
+                      f"j <- j + 1; fimenquanto se (s > 100000) entao s <- s - 99991; fimse i <- i + 1; fimenquanto")
+    partes.append("escreva(s);")
+    return "\n".join(partes)
+
+
+def main():
+    maior = int(sys.argv[1]) if len(sys.argv) > 1 else 800
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    quantidades = [q for q in (25, 50, 100, 200, 400, 800, 1600) if q <= maior]
+    geradores = {"um main": lambda tabela: LLVMGenerator(tabela, outline_threshold=None),
+                 "dividido": lambda tabela: LLVMGenerator(tabela)}
+    print(f"{'laços':>6} {'instr. TAC':>11} {'funções':>8} {'um main (s)':>12} {'dividido (s)':>13} "
+          f"{'dividido/um':>12}  saída igual")
+    pontos = []
+    for lacos in quantidades:
+        tac_code, tabela = gerar_tac(programa(lacos), [])
+        tempos, saidas = {}, {}
+        for nome, gerador in geradores.items():
+            llvm_ir = gerador(tabela).generate(list(tac_code))
+            exe_path = os.path.join(pasta, f"p{lacos}_{nome.replace(' ', '_')}")
+            exe, tempos[nome] = melhor_tempo(lambda: build_native(llvm_ir, exe_path, "-O2"), 1)
+            if exe is None:
+                print("nenhum compilador nativo encontrado (clang, ou llc e cc)")
+                return
+            saidas[nome], _ = run_native(exe, "1000")
+            if nome == "dividido":
+                funcoes = llvm_ir.count("define internal void @arara.parte.")
+        pontos.append((len(tac_code), tempos["um main"], tempos["dividido"]))
+        print(f"{lacos:>6} {len(tac_code):>11} {funcoes:>8} {tempos['um main']:>12.2f} {tempos['dividido']:>13.2f} "
+              f"{tempos['dividido'] / tempos['um main']:>11.2f}x  "
+              f"{'sim' if saidas['um main'] == saidas['dividido'] else 'NÃO'}")
+
+    #Gráfico: uma linha por tamanho, '#' para um só main e '=' para o programa dividido
+    escala = LARGURA_GRAFICO / max(max(um, dividido) for _, um, dividido in pontos)
+    print(f"\ntempo de compilação (cada caractere = {1 / escala:.2f} s)")
+    for instrucoes, um, dividido in pontos:
+        print(f"{instrucoes:>7} | {'#' * max(1, round(um * escala))} {um:.2f}")
+        print(f"{'':>7} | {'=' * max(1, round(dividido * escala))} {dividido:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Arquivo: benchmarks/bench_python.py
+
+# Programa traduzido para Python (--python) contra o interpretador de closures (--interpretar)
+# e a VM de bytecode sobre o TAC de -O2 (--vm): tempo de preparo (front-end, tradução e
+# compile() na primeira execução; só a leitura do code object do cache nas seguintes), tempo
+# de execução, razão closures/Python e se as saídas são iguais.
+# Uso: python benchmarks/bench_python.py [escala]
+
+import io
+import sys
+import tempfile
+import time
+
+from common import gerar_tac, front_end
+from bench_backend_c import PROGRAMAS
+from bench_interpretador import PASCAL
+from bench_vm import QUANTIDADES
+from src.interpreter.Interpreter import Interpreter
+from src.interpreter.vm import BytecodeCompiler, VM
+from src.interpreter.transpiler import Transpiler, carregar_do_cache, gravar_no_cache, executar_codigo
+from src.interpreter.runtime import ProgramIO
+from src.tac.licm import LoopInvariantCodeMotion
+from src.tac.induction import InductionVariableStrengthReduction
+from src.tac.write_coalescing import WriteCoalescing
+from src.tac.peephole import PeepholeOptimizer
+
+
+def executar(funcao, entrada):
+    saida = io.StringIO()
+    inicio = time.perf_counter()
+    funcao(ProgramIO(io.StringIO(entrada), saida))
+    return saida.getvalue(), time.perf_counter() - inicio
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta_cache = tempfile.mkdtemp(prefix="arara_bench_")
+    passes = [LoopInvariantCodeMotion(), InductionVariableStrengthReduction(), WriteCoalescing(), PeepholeOptimizer()]
+    print(f"{'programa':<8} {'tradução (ms)':>14} {'cache (ms)':>11} {'closures (s)':>13} {'VM -O2 (s)':>11} "
+          f"{'Python (s)':>11} {'closures/Python':>16}  saída igual")
+    for nome, fonte in {"pascal": PASCAL, **PROGRAMAS}.items():
+        entrada = str(max(1, int(QUANTIDADES[nome] * escala)))
+        inicio = time.perf_counter()
+        arvore, tabela = front_end(fonte)
+        codigo = Transpiler(tabela).compile(arvore)
+        traducao = time.perf_counter() - inicio
+        gravar_no_cache(fonte, codigo, pasta_cache)
+        inicio = time.perf_counter()
+        codigo = carregar_do_cache(fonte, pasta_cache)
+        cache = time.perf_counter() - inicio
+
+        bytecode = BytecodeCompiler(tabela).compile(gerar_tac(fonte, passes)[0])
+        saidas = {}
+        saidas["closures"], closures = executar(lambda p: Interpreter(tabela).run(arvore, p), entrada)
+        saidas["vm"], vm = executar(lambda p: VM(p).run(bytecode), entrada)
+        saidas["python"], python = executar(lambda p: executar_codigo(codigo, p), entrada)
+        iguais = len(set(saidas.values())) == 1
+        print(f"{nome:<8} {traducao * 1000:>14.2f} {cache * 1000:>11.3f} {closures:>13.3f} {vm:>11.3f} "
+              f"{python:>11.3f} {closures / python:>15.2f}x  {'sim' if iguais else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
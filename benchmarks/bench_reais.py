@@ -0,0 +1,101 @@
+# Arquivo: benchmarks/bench_reais.py
+
+# Núcleos numéricos com variáveis 'real' (double, fadd/fmul/fdiv) contra os mesmos
+# programas com 'inteiro' (i32, add/mul/sdiv), compilados para código nativo com -O2.
+# As versões com real também são conferidas contra o printf/scanf (sem a runtime).
+# Uso: python benchmarks/bench_reais.py [escala]
+
+import os
+import sys
+import tempfile
+
+from common import gerar_tac, build_native, run_native, LLVMGenerator
+from src.tac.licm import LoopInvariantCodeMotion
+from src.tac.induction import InductionVariableStrengthReduction
+
+#'{tipo}' é trocado por 'real' ou 'inteiro'; contadores e limites são sempre inteiros
+PROGRAMAS = {
+    "acumula": """
+{tipo} s;
+{tipo} x;
+inteiro i;
+inteiro n;
+leia(n);
+leia(x);
+s <- 0;
+i <- 0;
+enquanto (i < n) faca
+    s <- s + i * x - s / 3;
+    i <- i + 1;
+fimenquanto
+escreva(s);
+""",
+    "newton": """
+{tipo} r;
+{tipo} s;
+inteiro i;
+inteiro k;
+inteiro n;
+leia(n);
+s <- 0;
+i <- 1;
+enquanto (i <= n) faca
+    r <- i;
+    k <- 0;
+    enquanto (k < 8) faca
+        r <- (r + i / r) / 2;
+        k <- k + 1;
+    fimenquanto
+    s <- s + r;
+    i <- i + 1;
+fimenquanto
+escreva(s);
+""",
+    "horner": """
+{tipo} x;
+{tipo} p;
+{tipo} s;
+inteiro i;
+inteiro n;
+leia(n);
+s <- 0;
+i <- 0;
+enquanto (i < n) faca
+    x <- i;
+    x <- x / 1000;
+    p <- ((3 * x + 5) * x - 7) * x + 11;
+    s <- s + p / n;
+    i <- i + 1;
+fimenquanto
+escreva(s);
+""",
+}
+QUANTIDADES = {"acumula": 20000000, "newton": 2000000, "horner": 10000000}
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    passes = [LoopInvariantCodeMotion(), InductionVariableStrengthReduction()]
+    print(f"{'programa':<8} {'iterações':>10} {'inteiro (s)':>12} {'real (s)':>9} {'real/inteiro':>13}  saída (real)")
+    for nome, fonte in PROGRAMAS.items():
+        n = max(1, int(QUANTIDADES[nome] * escala))
+        texto = f"{n} 3"
+        tempos = {}
+        saidas = {}
+        for tipo in ("inteiro", "real"):
+            tac_code, tabela = gerar_tac(fonte.replace("{tipo}", tipo), passes)
+            for runtime in (True, False) if tipo == "real" else (True,):
+                llvm_ir = LLVMGenerator(tabela, runtime=runtime).generate(list(tac_code))
+                exe = build_native(llvm_ir, os.path.join(pasta, f"{nome}_{tipo}_{runtime}"), "-O2")
+                if exe is None:
+                    print("nenhum compilador nativo encontrado (clang, ou llc e cc)")
+                    return
+                saidas[tipo, runtime], tempos[tipo, runtime] = run_native(exe, texto)
+        assert saidas["real", True] == saidas["real", False], f"{nome}: saída diferente com a runtime"
+        print(f"{nome:<8} {n:>10} {tempos['inteiro', True]:>12.3f} {tempos['real', True]:>9.3f} "
+              f"{tempos['real', True] / tempos['inteiro', True]:>12.2f}x  {saidas['real', True].strip()}")
+
+
+if __name__ == "__main__":
+    main()
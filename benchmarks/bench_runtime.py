@@ -0,0 +1,78 @@
+# Arquivo: benchmarks/bench_runtime.py
+
+# E/S pela biblioteca de runtime (saída em buffer, formatação e leitura de inteiros à mão)
+# contra printf/scanf por valor, em programas que escrevem ou leem milhões de inteiros.
+# Uso: python benchmarks/bench_runtime.py [escala]
+
+import os
+import sys
+import tempfile
+
+from common import gerar_tac, build_native, run_native, LLVMGenerator
+
+PROGRAMAS = {
+    "escreve": """
+inteiro i; inteiro n;
+leia(n);
+i <- 0;
+enquanto (i < n) faca
+    escreva(i);
+    i <- i + 1;
+fimenquanto
+""",
+    "le_soma": """
+inteiro i; inteiro n; inteiro x; inteiro s;
+leia(n);
+i <- 0; s <- 0;
+enquanto (i < n) faca
+    leia(x);
+    s <- s + x;
+    i <- i + 1;
+fimenquanto
+escreva(s);
+""",
+    "eco": """
+inteiro i; inteiro n; inteiro x;
+leia(n);
+i <- 0;
+enquanto (i < n) faca
+    leia(x);
+    escreva(x * 2 - 7);
+    i <- i + 1;
+fimenquanto
+""",
+}
+QUANTIDADES = {"escreve": 3000000, "le_soma": 2000000, "eco": 1000000}
+
+
+def entrada(nome, n):
+    if nome == "escreve":
+        return str(n)
+    return f"{n}\n" + " ".join(str((i * 7919) % 200001 - 100000) for i in range(n)) + "\n"
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    print(f"{'programa':<8} {'inteiros':>9} {'printf/scanf (s)':>17} {'runtime (s)':>12} {'milhões/s':>10} {'ganho':>6}")
+    for nome, fonte in PROGRAMAS.items():
+        n = max(1, int(QUANTIDADES[nome] * escala))
+        texto = entrada(nome, n)
+        tac_code, tabela = gerar_tac(fonte)
+        tempos = {}
+        saidas = {}
+        for runtime in (False, True):
+            llvm_ir = LLVMGenerator(tabela, runtime=runtime).generate(list(tac_code))
+            exe = build_native(llvm_ir, os.path.join(pasta, f"{nome}_{runtime}"), "-O2")
+            if exe is None:
+                print("nenhum compilador nativo encontrado (clang, ou llc e cc)")
+                return
+            saidas[runtime], tempos[runtime] = run_native(exe, texto)
+        assert saidas[False] == saidas[True], f"{nome}: saída diferente com a runtime"
+        inteiros = n * (2 if nome == "eco" else 1)
+        print(f"{nome:<8} {inteiros:>9} {tempos[False]:>17.3f} {tempos[True]:>12.3f} "
+              f"{inteiros / tempos[True] / 1e6:>10.1f} {tempos[False] / tempos[True]:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Arquivo: benchmarks/bench_tac_store.py
+
+# Compara a lista de TACInstruction com o armazenamento compacto (CompactTAC):
+# memória por instrução e vazão de uma análise simples, da impressão do TAC e
+# de um passe existente rodando sobre a visão iterável, além da gravação e
+# leitura do TAC em arquivo (texto .tac e binário .tacb).
+# Uso: python benchmarks/bench_tac_store.py [escala]
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+from common import gerar_tac
+from bench_temps import programa
+from src.tac.TACGenerator import TACOperand, TACInstruction
+from src.tac.compact import CompactTAC
+from src.tac.cfg import instr_def
+from src.tac.peephole import PeepholeOptimizer
+from src.tac.tac_file import write_text, write_binary, read_binary, parse_text
+
+
+def medir_memoria(construir):
+    tracemalloc.start()
+    objeto = construir()
+    usado, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objeto, usado
+
+
+#Cópia com operandos próprios, como o TACGenerator produz
+def copiar(instr):
+    operandos = [op and TACOperand(op.type, op.value) for op in (instr.result, instr.arg1, instr.arg2)]
+    return TACInstruction(instr.opcode, *operandos)
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    tac_code, _ = gerar_tac(programa(int(2000 * escala)))
+    # Replica o programa para chegar a algumas centenas de milhares de instruções
+    copias = max(1, int(400000 * escala) // len(tac_code))
+    linhas = [str(instr) for instr in tac_code] * copias
+    n = len(linhas)
+
+    lista, memoria_lista = medir_memoria(lambda: [copiar(instr) for _ in range(copias) for instr in tac_code])
+    compacto, memoria_compacto = medir_memoria(lambda: CompactTAC.from_instructions(lista))
+    assert list(compacto.lines()) == [str(instr) for instr in lista] == linhas
+
+    print(f"{n} instruções")
+    print(f"{'representação':<14} {'bytes/instr.':>12} {'defs (s)':>9} {'texto (s)':>10} {'peephole (s)':>13}")
+    for nome, store, memoria, texto in [
+            ("lista", lista, memoria_lista, lambda: [str(instr) for instr in lista]),
+            ("compacta", compacto, memoria_compacto, lambda: list(compacto.lines()))]:
+        defs = cronometrar(lambda: Counter(instr_def(instr) for instr in store))
+        impressao = cronometrar(texto)
+        peephole = cronometrar(lambda: PeepholeOptimizer().run(list(store)))
+        print(f"{nome:<14} {memoria / n:>12.1f} {defs:>9.3f} {impressao:>10.3f} {peephole:>13.3f}")
+
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    texto, binario = os.path.join(pasta, "programa.tac"), os.path.join(pasta, "programa.tacb")
+    print(f"\n{'arquivo':<14} {'bytes':>12} {'gravação (s)':>13} {'leitura (s)':>12}")
+    for nome, caminho, gravar, ler in [
+            ("texto", texto, lambda: write_text(texto, lista), lambda: parse_text(open(texto, encoding="utf-8").read())),
+            ("binário", binario, lambda: write_binary(binario, compacto), lambda: read_binary(binario))]:
+        gravacao = cronometrar(gravar)
+        leitura = cronometrar(ler)
+        print(f"{nome:<14} {os.path.getsize(caminho):>12} {gravacao:>13.3f} {leitura:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
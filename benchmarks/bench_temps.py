@@ -0,0 +1,47 @@
+# Arquivo: benchmarks/bench_temps.py
+
+# Mede o reaproveitamento de temporárias: programas sintéticos com cada vez mais
+# expressões, comparando o número de temporárias distintas, as que precisam de
+# alloca no LLVM e o tamanho do IR com e sem o alocador por vivacidade.
+# Uso: python benchmarks/bench_temps.py [escala]
+
+import sys
+import time
+
+from common import gerar_tac, LLVMGenerator
+
+
+#Programa com 'n' atribuições de expressões aninhadas e um laço com condição composta
+def programa(n):
+    linhas = ["inteiro a; inteiro b; inteiro c; inteiro i;", "leia(a); leia(b); i <- 0; c <- 0;"]
+    for k in range(n):
+        linhas.append(f"c <- (a + {k}) * (b - {k}) + (a * b) / ({k} + 1) - (c > a && b < {k});")
+    linhas.append("enquanto (i < a && (c > 0 || b > i)) faca")
+    for k in range(n):
+        linhas.append(f"    c <- c + (i * {k} + a) * (b + {k});")
+    linhas.append("    i <- i + 1;\nfimenquanto\nescreva(c);")
+    return "\n".join(linhas)
+
+
+def temporarias(tac_code):
+    return len({op.value for instr in tac_code for op in [instr.result, instr.arg1, instr.arg2]
+                if op is not None and op.is_temp()})
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    print(f"{'expressões':>10} {'reuso':<5} {'temporárias':>12} {'allocas':>8} {'linhas IR':>10} {'geração (s)':>12}")
+    for n in [10, 100, 1000]:
+        fonte = programa(int(n * escala))
+        for reuse in (False, True):
+            inicio = time.perf_counter()
+            tac_code, tabela = gerar_tac(fonte, reuse_temps=reuse)
+            llvm_ir = LLVMGenerator(tabela).generate(tac_code)
+            decorrido = time.perf_counter() - inicio
+            allocas = llvm_ir.count("alloca") - len(tabela)
+            print(f"{int(n * escala):>10} {'sim' if reuse else 'não':<5} {temporarias(tac_code):>12} {allocas:>8} "
+                  f"{llvm_ir.count(chr(10)):>10} {decorrido:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
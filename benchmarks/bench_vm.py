@@ -0,0 +1,68 @@
+# Arquivo: benchmarks/bench_vm.py
+
+# Máquina virtual de bytecode (--vm, sobre o TAC de -O0 e de -O2) contra o interpretador
+# compilado para closures (--interpretar) e o executável nativo (LLVM IR com -O2): tempo de
+# tradução do TAC para bytecode, tempo de execução e se a saída é igual à do executável.
+# Uso: python benchmarks/bench_vm.py [escala]
+
+import io
+import os
+import sys
+import tempfile
+import time
+
+from common import gerar_tac, front_end, build_native, run_native, LLVMGenerator
+from bench_backend_c import PROGRAMAS
+from bench_interpretador import PASCAL
+from src.interpreter.Interpreter import Interpreter
+from src.interpreter.vm import BytecodeCompiler, VM
+from src.interpreter.runtime import ProgramIO
+from src.tac.licm import LoopInvariantCodeMotion
+from src.tac.induction import InductionVariableStrengthReduction
+from src.tac.write_coalescing import WriteCoalescing
+from src.tac.peephole import PeepholeOptimizer
+
+QUANTIDADES = {"pascal": 400, "primos": 30000, "matriz": 50, "newton": 40000, "escreve": 200000}
+
+
+def medir(preparar, executar, entrada):
+    inicio = time.perf_counter()
+    pronto = preparar()
+    preparo = time.perf_counter() - inicio
+    saida = io.StringIO()
+    programa_io = ProgramIO(io.StringIO(entrada), saida)
+    inicio = time.perf_counter()
+    executar(pronto, programa_io)
+    return saida.getvalue(), preparo, time.perf_counter() - inicio
+
+
+def main():
+    escala = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    pasta = tempfile.mkdtemp(prefix="arara_bench_")
+    passes = [LoopInvariantCodeMotion(), InductionVariableStrengthReduction(), WriteCoalescing(), PeepholeOptimizer()]
+    print(f"{'programa':<8} {'instr.':>7} {'tradução (ms)':>14} {'closures (s)':>13} {'VM -O0 (s)':>11} {'VM -O2 (s)':>11} "
+          f"{'nativo (s)':>11} {'VM/closures':>12}  saída igual")
+    for nome, fonte in {"pascal": PASCAL, **PROGRAMAS}.items():
+        entrada = str(max(1, int(QUANTIDADES[nome] * escala)))
+        arvore, tabela = front_end(fonte)
+        tac_o0, _ = gerar_tac(fonte)
+        tac_o2, _ = gerar_tac(fonte, passes)
+        #A compilação para closures precisa da E/S, então entra no tempo de execução (é desprezível)
+        resultados = {"closures": medir(lambda: None, lambda _, p: Interpreter(tabela).run(arvore, p), entrada)}
+        for nivel, tac_code in (("-O0", tac_o0), ("-O2", tac_o2)):
+            resultados[nivel] = medir(lambda: BytecodeCompiler(tabela).compile(tac_code),
+                                      lambda bytecode, p: VM(p).run(bytecode), entrada)
+        exe_path = os.path.join(pasta, nome)
+        if build_native(LLVMGenerator(tabela).generate(list(tac_o2)), exe_path, "-O2") is None:
+            print("nenhum compilador nativo encontrado (clang, ou llc e cc)")
+            return
+        saida_nativa, nativo = run_native(exe_path, entrada)
+        iguais = all(saida == saida_nativa for saida, _, _ in resultados.values())
+        print(f"{nome:<8} {len(BytecodeCompiler(tabela).compile(tac_o2)):>7} {resultados['-O2'][1] * 1000:>14.2f} "
+              f"{resultados['closures'][2]:>13.3f} "
+              f"{resultados['-O0'][2]:>11.3f} {resultados['-O2'][2]:>11.3f} {nativo:>11.3f} "
+              f"{resultados['-O2'][2] / resultados['closures'][2]:>11.2f}x  {'sim' if iguais else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# Arquivo: benchmarks/common.py
+
+# Funções compartilhadas pelos benchmarks: front-end sem saída no terminal
+# e compilação nativa do LLVM IR gerado.
+
+import os
+import sys
+import subprocess
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from antlr4 import InputStream, CommonTokenStream
+from grammar.generated.AraraLexer import AraraLexer
+from grammar.generated.AraraParser import AraraParser
+from src.semantico.analisador_semantico import AnalisadorSemantico, CustomSemanticErrorListener
+from src.tac.TACGenerator import TACGenerator
+from src.tac.cfg import COMPARE_BRANCH
+from src.tac.pass_manager import AnalysisCache
+from src.tac.temp_allocator import TempAllocator
+from src.llvm_generator import LLVMGenerator
+from src.native_build import compilar_nativo, ferramentas
+
+
+def front_end(entrada):
+    parser = AraraParser(CommonTokenStream(AraraLexer(InputStream(entrada))))
+    arvore = parser.programa()
+    semantico = AnalisadorSemantico(CustomSemanticErrorListener())
+    semantico.visit(arvore)
+    return arvore, semantico.tabela_simbolos
+
+
+#Com passes, as temporárias são reaproveitadas só depois deles (como em main.py)
+def gerar_tac(entrada, passes=(), short_circuit=True, fuse_branches=True, reuse_temps=True):
+    arvore, tabela = front_end(entrada)
+    generator = TACGenerator(short_circuit, fuse_branches, reuse_temps and not passes, tabela)
+    generator.visit(arvore)
+    tac_code = generator.tac_instructions
+    analyses = AnalysisCache(tabela)
+    for tac_pass in passes:
+        tac_code = tac_pass.run(tac_code, analyses)
+    if reuse_temps and passes:
+        tac_code = TempAllocator().run(tac_code)
+    return tac_code, tabela
+
+
+#Compila o LLVM IR para um executável com clang, ou com llc + cc quando não há clang
+#(com extensao=".c", o fonte é o C do gerador de C e basta um compilador C);
+#sem o cache do --build, para o tempo de compilação medido ser sempre o real
+def build_native(codigo, exe_path, opt_level="-O0", extensao=".ll"):
+    if ferramentas(extensao) is None:
+        return None
+    fonte = exe_path + extensao
+    with open(fonte, "w", encoding="utf-8") as f:
+        f.write(codigo)
+    return compilar_nativo(fonte, exe_path, int(opt_level[2:]), None).executavel
+
+
+def run_native(exe_path, entrada=""):
+    inicio = time.perf_counter()
+    result = subprocess.run([exe_path], input=entrada, capture_output=True, text=True, check=True)
+    return result.stdout, time.perf_counter() - inicio
+
+
+def melhor_tempo(funcao, repeticoes=3):
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return resultado, melhor
+
+
+#Executa o TAC diretamente, contando instruções, desvios e comparações executados e as
+#chamadas ao printf que o código gerado faz (WRITE_REPEAT escreve até 4 KiB por chamada)
+def executar_tac(tac_code, entrada=""):
+    tokens = entrada.split()
+    memoria = {}
+    saida = []
+    contadores = {"instrucoes": 0, "desvios": 0, "comparacoes": 0, "escritas": 0}
+    labels = {instr.result.value: pos for pos, instr in enumerate(tac_code) if instr.opcode == "LABEL"}
+
+    def valor(op):
+        return op.value if op.is_literal() else memoria.get(op.value, 0)
+
+    def divisao(a, b):
+        q = abs(a) // abs(b)
+        return q if (a < 0) == (b < 0) else -q
+
+    binarias = {"ADD": lambda a, b: a + b, "SUB": lambda a, b: a - b, "MUL": lambda a, b: a * b, "DIV": divisao,
+                "EQ": lambda a, b: int(a == b), "NEQ": lambda a, b: int(a != b),
+                "LT": lambda a, b: int(a < b), "LE": lambda a, b: int(a <= b),
+                "GT": lambda a, b: int(a > b), "GE": lambda a, b: int(a >= b),
+                "AND": lambda a, b: int(bool(a) and bool(b)), "OR": lambda a, b: int(bool(a) or bool(b))}
+    pc = 0
+    while pc < len(tac_code):
+        instr = tac_code[pc]
+        pc += 1
+        op = instr.opcode
+        if op == "LABEL":
+            continue
+        contadores["instrucoes"] += 1
+        if op in binarias:
+            if op in ["EQ", "NEQ", "LT", "LE", "GT", "GE"]:
+                contadores["comparacoes"] += 1
+            memoria[instr.result.value] = binarias[op](valor(instr.arg1), valor(instr.arg2))
+        elif op == "NOT":
+            memoria[instr.result.value] = int(not valor(instr.arg1))
+        elif op == "ASSIGN":
+            memoria[instr.result.value] = valor(instr.arg1)
+        elif op == "READ":
+            memoria[instr.result.value] = int(tokens.pop(0))
+        elif op == "WRITE":
+            contadores["escritas"] += 1
+            if instr.result.is_literal() and isinstance(instr.result.value, str):
+                saida.append(instr.result.value[1:-1].encode("latin1").decode("unicode_escape"))
+            else:
+                saida.append(f"{valor(instr.result)} ")
+        elif op == "WRITE_REPEAT":
+            texto = instr.result.value[1:-1].encode("latin1").decode("unicode_escape")
+            vezes = max(0, valor(instr.arg1))
+            saida.append(texto * vezes)
+            tamanho = len(texto.encode("utf-8"))
+            if vezes and tamanho:
+                contadores["escritas"] += -(-vezes // max(1, 4096 // tamanho))
+        else:
+            contadores["desvios"] += 1
+            if op == "GOTO":
+                pc = labels[instr.result.value]
+            elif op == "IF_FALSE_GOTO" and not valor(instr.arg1):
+                pc = labels[instr.result.value]
+            elif op == "IF_TRUE_GOTO" and valor(instr.arg1):
+                pc = labels[instr.result.value]
+            elif op in COMPARE_BRANCH:
+                contadores["comparacoes"] += 1
+                if binarias[COMPARE_BRANCH[op]](valor(instr.arg1), valor(instr.arg2)):
+                    pc = labels[instr.result.value]
+    return "".join(saida), contadores
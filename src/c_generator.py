@@ -0,0 +1,378 @@
+# Arquivo: src/c_generator.py
+
+import io
+from src.tac.cfg import ControlFlowGraph, COMPARE_BRANCH, operand_types
+
+# Gerador de C a partir do TAC, alternativa ao LLVM IR para máquinas que têm um
+# compilador C mas não um LLVM que aceite o .ll gerado. Os laços e condicionais são
+# reconstruídos a partir do CFG (while/for, if/else, break/continue), com goto só onde a
+# estrutura não cabe; as variáveis viram locais tipadas (int ou double) e a E/S usa a
+# mesma biblioteca de runtime do LLVM IR (src/runtime/arara_runtime.c).
+# O C gerado espera aritmética inteira com transbordo circular, como o LLVM IR: compile
+# com -fwrapv (o --build já faz isso).
+
+C_OPS = {"ADD": "+", "SUB": "-", "MUL": "*", "DIV": "/", "EQ": "==", "NEQ": "!=",
+         "LT": "<", "LE": "<=", "GT": ">", "GE": ">=", "AND": "&&", "OR": "||"}
+NEGATED = {"EQ": "NEQ", "NEQ": "EQ", "LT": "GE", "LE": "GT", "GT": "LE", "GE": "LT"}
+
+RUNTIME_PROTOTYPES = ["void arara_write_str(const char *texto, int tamanho);",
+                      "void arara_write_int(int valor);",
+                      "void arara_write_real(double valor);",
+                      "void arara_write_repeat(const char *texto, int tamanho, int vezes);",
+                      "int arara_read_int(int atual);",
+                      "double arara_read_real(double atual);",
+                      "void arara_flush(void);"]
+
+INT32_MIN = -2 ** 31
+
+
+#Laço aberto no C: saltos para o cabeçalho viram 'continue' e para a saída, 'break'
+class LoopFrame:
+
+    def __init__(self, header, exit):
+        self.header = header
+        self.exit = exit
+
+
+#Literal de string C para os bytes; escapes octais não engolem o caractere seguinte
+#como os hexadecimais, e '?' escapado evita trigraphs
+def c_string(data):
+    parts = []
+    for byte in data:
+        ch = chr(byte)
+        if ch in '"\\?':
+            parts.append('\\' + ch)
+        elif ch == '\n':
+            parts.append('\\n')
+        elif ch == '\t':
+            parts.append('\\t')
+        elif 32 <= byte < 127:
+            parts.append(ch)
+        else:
+            parts.append(f'\\{byte:03o}')
+    return '"' + ''.join(parts) + '"'
+
+
+#Nome C de uma variável: as do programa ganham 'v_' (não colidem com palavras reservadas
+#nem com a runtime) e as criadas pelos passes, que têm '.', ganham 'p_'
+def c_variable(name):
+    if '.' in name:
+        return 'p_' + name.replace('.', '_')
+    return 'v_' + name
+
+
+class CGenerator:
+    def __init__(self, semantic_table={}):
+        self.semantic_table = semantic_table
+        self.lines = []
+        self.indent = 1
+        self.var_types = {}
+        self.temp_decls = {}
+        self.operand_names = {}
+        self.emitted = set()
+        self.used_labels = set()
+
+    def generate(self, tac_instructions):
+        buffer = io.StringIO()
+        self.generate_to(tac_instructions, buffer)
+        return buffer.getvalue()
+
+    def generate_to(self, tac_instructions, out):
+        self.__init__(self.semantic_table)
+        self.cfg = ControlFlowGraph(tac_instructions)
+        self._name_operands(tac_instructions)
+        self._analyze()
+
+        self._run((0, [], None))
+        for block in sorted(self.reachable - self.emitted):
+            # Só em CFGs irredutíveis sobra bloco sem lugar na estrutura: vai no fim, com goto
+            self._run((block, [], None))
+
+        out.write("// Gerado pelo compilador Arara a partir do TAC\n\n")
+        out.write("\n".join(RUNTIME_PROTOTYPES) + "\n\n")
+        out.write("int main(void) {\n")
+        for name, c_type in sorted(self.var_types.items()):
+            out.write(f"    {c_type} {name} = 0;\n")
+        for name, c_type in sorted(self.temp_decls.items()):
+            out.write(f"    {c_type} {name};\n")
+        out.write("\n")
+        self._write_lines(out)
+        out.write("}\n")
+
+    #Tipos e nomes C. Uma temporária reaproveitada para inteiros e reais (alocador de
+    #temporárias) vira duas locais, '_t3' e '_t3_d'.
+    def _name_operands(self, tac_instructions):
+        for instr, slot, real in operand_types(tac_instructions, self.semantic_table):
+            op = getattr(instr, slot)
+            c_type = "double" if real else "int"
+            if op.is_id():
+                c_name = c_variable(op.value)
+                self.var_types[c_name] = c_type
+            else:
+                c_name = f"{op.value}_d" if real else op.value
+                self.temp_decls[c_name] = c_type
+            self.operand_names[(id(instr), slot)] = c_name
+
+    #Ordem reversa de pós-ordem, árvore de dominadores, laços e os blocos de junção:
+    #os que têm mais de uma aresta de entrada para a frente (ou são saída do laço do pai
+    #na árvore) são escritos depois do pai, e os saltos até eles viram break/goto
+    def _analyze(self):
+        blocks = self.cfg.blocks
+        self.reachable = self.cfg.reachable()
+        postorder, seen, stack = [], {0}, [(0, iter(blocks[0].succs))]
+        while stack:
+            node, succs = stack[-1]
+            for s in succs:
+                if s not in seen:
+                    seen.add(s)
+                    stack.append((s, iter(blocks[s].succs)))
+                    break
+            else:
+                stack.pop()
+                postorder.append(node)
+        self.rpo = {b: i for i, b in enumerate(reversed(postorder))}
+
+        dom = self.cfg.dominators()
+        depth = {b: len(dom[b]) for b in self.reachable}
+        self.children = {b: [] for b in self.reachable}
+        for b in self.reachable - {0}:
+            idom = max(dom[b] - {b}, key=depth.__getitem__)
+            self.children[idom].append(b)
+        self.loop_body = {loop.header: loop.body for loop in self.cfg.loops()}
+
+        def is_merge(b):
+            return sum(1 for p in blocks[b].preds if p in self.rpo and self.rpo[p] < self.rpo[b]) > 1
+
+        self.follow_kids = {}
+        for b, kids in self.children.items():
+            body = self.loop_body.get(b)
+            self.follow_kids[b] = sorted((y for y in kids if is_merge(y) or (body is not None and y not in body)),
+                                         key=self.rpo.get)
+        self.follows = {y for kids in self.follow_kids.values() for y in kids}
+
+    def _line(self, text):
+        self.lines.append("    " * self.indent + text)
+
+    def _label(self, block):
+        self.lines.append((self.indent, self._label_name(block)))
+
+    def _label_name(self, block):
+        label = self.cfg.blocks[block].label
+        return label.replace('.', '_') if label is not None else f"_b{block}"
+
+    #Linhas geradas por 'emit' um nível mais para dentro, sem ir para a saída
+    def _capture(self, emit):
+        saved = self.lines
+        self.lines = []
+        self.indent += 1
+        emit()
+        self.indent -= 1
+        captured, self.lines = self.lines, saved
+        return captured
+
+    #Executa uma continuação (bloco, laços abertos, bloco que vem a seguir) e as que ela
+    #devolver: o que fica em posição final é devolvido em vez de chamado, para programas
+    #longos não esgotarem a pilha de recursão do Python
+    def _run(self, pending):
+        while pending is not None:
+            pending = self._node(*pending)
+
+    def _node(self, block, loops, tail):
+        self.emitted.add(block)
+        self._label(block)
+        kids = self.follow_kids[block]
+        if block not in self.loop_body:
+            return self._within(block, kids, loops, tail, lambda t: self._block_code(block, loops, t))
+
+        body = self.loop_body[block]
+        inside = [y for y in kids if y in body]
+        after = [y for y in kids if y not in body]
+        frame = LoopFrame(block, after[0] if after else None)
+        inner = loops + [frame]
+        condition = self._while_condition(block, frame)
+        if condition is not None:
+            expression, target = condition
+            self._line(f"while ({expression}) {{")
+            code = lambda t: self._branch(block, target, inner, t)
+        else:
+            self._line("for (;;) {")
+            code = lambda t: self._block_code(block, inner, t)
+        self.indent += 1
+        self._run(self._within(block, inside, inner, block, code))
+        self.indent -= 1
+        self._line("}")
+        return self._sequence(after, loops, tail)
+
+    def _within(self, block, kids, loops, tail, code):
+        pending = code(kids[0] if kids else tail)
+        if not kids:
+            return pending
+        self._run(pending)
+        return self._sequence(kids, loops, tail)
+
+    def _sequence(self, blocks, loops, tail):
+        for i, block in enumerate(blocks[:-1]):
+            self._run((block, loops, blocks[i + 1]))
+        return (blocks[-1], loops, tail) if blocks else None
+
+    #Cabeçalho que só decide entre o corpo e a saída: 'while (condição de ficar)'
+    def _while_condition(self, header, frame):
+        block = self.cfg.blocks[header]
+        term = block.terminator
+        if (term is None or term.opcode == "GOTO" or len(block.succs) != 2
+                or any(instr.opcode != "LABEL" for instr in block.instructions[:-1])):
+            return None
+        taken = self.cfg.label_block[term.result.value]
+        fall = next(s for s in block.succs if s != taken)
+        if taken == frame.exit and fall in self.loop_body[header]:
+            return self._condition(term, negate=True), fall
+        if fall == frame.exit and taken in self.loop_body[header]:
+            return self._condition(term, negate=False), taken
+        return None
+
+    #Salto de 'source' para 'target': nada se o destino é o que vem a seguir, continue/break
+    #para o laço mais interno, goto para os demais blocos já posicionados; um bloco que só é
+    #alcançado por aqui é escrito no lugar (e devolvido como continuação)
+    def _branch(self, source, target, loops, tail):
+        if target == tail:
+            return None
+        if self.rpo[target] <= self.rpo[source] or target in self.follows or target in self.emitted:
+            frame = loops[-1] if loops else None
+            if frame is not None and target == frame.header:
+                self._line("continue;")
+            elif frame is not None and target == frame.exit:
+                self._line("break;")
+            else:
+                self.used_labels.add(self._label_name(target))
+                self._line(f"goto {self._label_name(target)};")
+            return None
+        return (target, loops, tail)
+
+    def _block_code(self, index, loops, tail):
+        block = self.cfg.blocks[index]
+        for instr in block.instructions:
+            if instr.opcode != "LABEL" and instr is not block.terminator:
+                self._statement(instr)
+        term = block.terminator
+        fall = index + 1 if block.falls_through() and index + 1 < len(self.cfg.blocks) else None
+        if term is not None and term.opcode == "GOTO":
+            return self._branch(index, self.cfg.label_block[term.result.value], loops, tail)
+        if term is None:
+            if fall is None:
+                self._end_program()
+                return None
+            return self._branch(index, fall, loops, tail)
+
+        taken = self.cfg.label_block[term.result.value]
+        if taken == fall:
+            return self._branch(index, taken, loops, tail)
+        fall_lines = self._capture(lambda: self._arm(index, fall, loops, tail))
+        taken_lines = self._capture(lambda: self._arm(index, taken, loops, tail))
+        if fall_lines and taken_lines and (self._is_jump(taken_lines) or self._is_jump(fall_lines)):
+            # Um lado só sai dali (break, continue, goto): 'if (c) break;' e o outro lado depois
+            jump_first = self._is_jump(taken_lines)
+            self._line(f"if ({self._condition(term, negate=not jump_first)}) {{")
+            self.lines.extend(taken_lines if jump_first else fall_lines)
+            self._line("}")
+            self.lines.extend(self._dedent(fall_lines if jump_first else taken_lines))
+        elif fall_lines and taken_lines:
+            self._line(f"if ({self._condition(term, negate=True)}) {{")
+            self.lines.extend(fall_lines)
+            self._line("} else {")
+            self.lines.extend(taken_lines)
+            self._line("}")
+        elif fall_lines or taken_lines:
+            self._line(f"if ({self._condition(term, negate=bool(fall_lines))}) {{")
+            self.lines.extend(fall_lines or taken_lines)
+            self._line("}")
+        return None
+
+    def _is_jump(self, lines):
+        return (len(lines) == 1 and isinstance(lines[0], str)
+                and lines[0].strip().startswith(("break;", "continue;", "goto ")))
+
+    def _dedent(self, lines):
+        return [line[4:] if isinstance(line, str) else (line[0] - 1, line[1]) for line in lines]
+
+    #Um dos lados do if; sem bloco seguinte (fim do TAC), o programa termina
+    def _arm(self, source, target, loops, tail):
+        if target is None:
+            self._end_program()
+        else:
+            self._run(self._branch(source, target, loops, tail))
+
+    def _end_program(self):
+        self._line("arara_flush();")
+        self._line("return 0;")
+
+    #Condição em que o desvio é tomado (ou não, com 'negate'). Comparações entre inteiros
+    #são negadas trocando o operador; com reais, '!(a < b)' não é 'a >= b' (NaN)
+    def _condition(self, term, negate):
+        if term.opcode in COMPARE_BRANCH:
+            relation = COMPARE_BRANCH[term.opcode]
+            a, b = self._operand(term, "arg1"), self._operand(term, "arg2")
+            if negate and self._type(term, "arg1") == "int" and self._type(term, "arg2") == "int":
+                return f"{a} {C_OPS[NEGATED[relation]]} {b}"
+            expression = f"{a} {C_OPS[relation]} {b}"
+            return f"!({expression})" if negate else expression
+        value = self._operand(term, "arg1")
+        if (term.opcode == "IF_TRUE_GOTO") != negate:
+            return value
+        return f"!{value}"
+
+    def _type(self, instr, slot):
+        name = self.operand_names.get((id(instr), slot))
+        if name is None:
+            return "int"
+        return self.var_types.get(name) or self.temp_decls.get(name, "int")
+
+    def _operand(self, instr, slot):
+        op = getattr(instr, slot)
+        if (id(instr), slot) in self.operand_names:
+            return self.operand_names[(id(instr), slot)]
+        if isinstance(op.value, int):
+            value = (op.value - INT32_MIN) % 2 ** 32 + INT32_MIN
+            if value == INT32_MIN:
+                return "(-2147483647 - 1)"
+            return f"({value})" if value < 0 else str(value)
+        return "0"
+
+    def _literal_bytes(self, operand):
+        return operand.value[1:-1].encode('latin1').decode('unicode_escape').encode('utf-8')
+
+    def _statement(self, instr):
+        op = instr.opcode
+        if op in C_OPS:
+            self._line(f"{self._operand(instr, 'result')} = {self._operand(instr, 'arg1')} "
+                       f"{C_OPS[op]} {self._operand(instr, 'arg2')};")
+        elif op == "NOT":
+            self._line(f"{self._operand(instr, 'result')} = !{self._operand(instr, 'arg1')};")
+        elif op == "ASSIGN":
+            self._line(f"{self._operand(instr, 'result')} = {self._operand(instr, 'arg1')};")
+        elif op == "READ":
+            target = self._operand(instr, "result")
+            function = "arara_read_real" if self._type(instr, "result") == "double" else "arara_read_int"
+            self._line(f"{target} = {function}({target});")
+        elif op == "WRITE" and instr.result.is_literal() and str(instr.result.value).startswith('"'):
+            data = self._literal_bytes(instr.result)
+            self._line(f"arara_write_str({c_string(data)}, {len(data)});")
+        elif op == "WRITE":
+            function = "arara_write_real" if self._type(instr, "result") == "double" else "arara_write_int"
+            self._line(f"{function}({self._operand(instr, 'result')});")
+        elif op == "WRITE_REPEAT":
+            data = self._literal_bytes(instr.result)
+            self._line(f"arara_write_repeat({c_string(data)}, {len(data)}, {self._operand(instr, 'arg1')});")
+
+    #Escreve as linhas, com os labels usados um nível para fora; label antes de '}' precisa
+    #de um comando (vazio) depois dele
+    def _write_lines(self, out):
+        for i, line in enumerate(self.lines):
+            if isinstance(line, str):
+                out.write(line + "\n")
+                continue
+            indent, name = line
+            if name not in self.used_labels:
+                continue
+            following = next((l for l in self.lines[i + 1:] if isinstance(l, str)), "}")
+            empty = " ;" if following.strip().startswith("}") else ""
+            out.write("    " * max(indent - 1, 0) + f"{name}:{empty}\n")
@@ -1,124 +1,339 @@
-import sys
-from antlr4 import *
-from antlr4.tree.Tree import ParseTreeVisitor
-
-from generated.AraraLexer import *
-from generated.AraraParser import *
-
-class Interpreter(ParseTreeVisitor):
-    def __init__(self):
-        self.memory = {}
-    
-    def visitPrograma(self, ctx: AraraParser.ProgramaContext):
-        for comando in ctx.comando():
-            self.visit(comando)
-        return None
-
-    def visitAtribuicao(self, ctx: AraraParser.AtribuicaoContext):
-        var_name = ctx.ID().getText()
-        value = self.visit(ctx.expressao())
-        self.memory[var_name] = value
-        return None
-
-    def visitLeia(self, ctx: AraraParser.ComandoContext):
-        var_name = ctx.ID().getText()
-        user_input = input(f"Entrada para {var_name}: ")
-        if user_input.isdigit():
-            self.memory[var_name] = int(user_input)
+# Arquivo: src/interpreter/Interpreter.py
+
+# Interpretador da árvore sintática compilada para closures: a árvore é percorrida uma vez
+# só, e cada comando e expressão vira uma função Python aninhada que já sabe o operador, os
+# tipos (da tabela de símbolos) e a posição das variáveis numa lista de slots. Na execução
+# não há mais visit, getText nem decisão por tipo; constantes são dobradas na compilação.
+# A semântica é a do código nativo (src/interpreter/runtime.py).
+
+from functools import partial
+from itertools import repeat
+
+from grammar.generated.AraraParser import AraraParser
+from src.interpreter.runtime import (ProgramIO, InterpreterError, DESLOCAMENTO as D, MASCARA as M, int32,
+                                     divisao_inteira, divisao_real, para_inteiro, texto_real,
+                                     decodificar_string)
+
+#Operações entre duas funções (a, b) que devolvem os operandos
+INT_BINARIAS = {
+    "+": lambda a, b: lambda: ((a() + b() + D) & M) - D,
+    "-": lambda a, b: lambda: ((a() - b() + D) & M) - D,
+    "*": lambda a, b: lambda: ((a() * b() + D) & M) - D,
+    "/": lambda a, b: lambda: divisao_inteira(a(), b()),
+}
+REAL_BINARIAS = {
+    "+": lambda a, b: lambda: a() + b(),
+    "-": lambda a, b: lambda: a() - b(),
+    "*": lambda a, b: lambda: a() * b(),
+    "/": lambda a, b: lambda: divisao_real(a(), b()),
+}
+#Comparações e lógicas devolvem bool, que se comporta como 0/1 nas contas e é escrito com %d
+COMPARACOES = {
+    "==": lambda a, b: lambda: a() == b(),
+    "!=": lambda a, b: lambda: a() != b(),
+    "<": lambda a, b: lambda: a() < b(),
+    "<=": lambda a, b: lambda: a() <= b(),
+    ">": lambda a, b: lambda: a() > b(),
+    ">=": lambda a, b: lambda: a() >= b(),
+}
+LOGICAS = {
+    "&&": lambda a, b: lambda: bool(a()) and bool(b()),
+    "||": lambda a, b: lambda: bool(a()) or bool(b()),
+}
+
+#Formas especializadas para os operandos mais comuns nos laços: variável (slot i da
+#memória m) com constante c, expressão com constante e variável com variável
+INT_VAR_CONST = {
+    "+": lambda m, i, c: lambda: ((m[i] + c + D) & M) - D,
+    "-": lambda m, i, c: lambda: ((m[i] - c + D) & M) - D,
+    "*": lambda m, i, c: lambda: ((m[i] * c + D) & M) - D,
+    "/": lambda m, i, c: lambda: divisao_inteira(m[i], c),
+}
+INT_EXPR_CONST = {
+    "+": lambda a, c: lambda: ((a() + c + D) & M) - D,
+    "-": lambda a, c: lambda: ((a() - c + D) & M) - D,
+    "*": lambda a, c: lambda: ((a() * c + D) & M) - D,
+    "/": lambda a, c: lambda: divisao_inteira(a(), c),
+}
+INT_VAR_VAR = {
+    "+": lambda m, i, j: lambda: ((m[i] + m[j] + D) & M) - D,
+    "-": lambda m, i, j: lambda: ((m[i] - m[j] + D) & M) - D,
+    "*": lambda m, i, j: lambda: ((m[i] * m[j] + D) & M) - D,
+    "/": lambda m, i, j: lambda: divisao_inteira(m[i], m[j]),
+}
+COMPARA_VAR_CONST = {
+    "==": lambda m, i, c: lambda: m[i] == c,
+    "!=": lambda m, i, c: lambda: m[i] != c,
+    "<": lambda m, i, c: lambda: m[i] < c,
+    "<=": lambda m, i, c: lambda: m[i] <= c,
+    ">": lambda m, i, c: lambda: m[i] > c,
+    ">=": lambda m, i, c: lambda: m[i] >= c,
+}
+COMPARA_VAR_VAR = {
+    "==": lambda m, i, j: lambda: m[i] == m[j],
+    "!=": lambda m, i, j: lambda: m[i] != m[j],
+    "<": lambda m, i, j: lambda: m[i] < m[j],
+    "<=": lambda m, i, j: lambda: m[i] <= m[j],
+    ">": lambda m, i, j: lambda: m[i] > m[j],
+    ">=": lambda m, i, j: lambda: m[i] >= m[j],
+}
+
+
+class Interpreter:
+    def __init__(self, semantic_table={}):
+        self.semantic_table = semantic_table
+        self.slots = {}
+        self.memory = []
+        self.io = None
+
+    def run(self, tree, io=None):
+        io = io if io is not None else ProgramIO()
+        programa = self.compile(tree, io)
+        try:
+            programa()
+        finally:
+            io.flush()
+
+    #Devolve uma função sem argumentos que executa o programa; cada compilação tem a sua memória
+    def compile(self, tree, io):
+        self.io = io
+        self.slots = {nome: i for i, nome in enumerate(self.semantic_table)}
+        self.memory = [0.0 if tipo == "real" else 0 for tipo in self.semantic_table.values()]
+        return self._block(tree.comando())
+
+    def _slot(self, ctx):
+        nome = ctx.ID().getText()
+        if nome not in self.slots:
+            raise InterpreterError(f"variável '{nome}' não declarada (linha {ctx.start.line})")
+        return self.slots[nome], self.semantic_table[nome]
+
+    #Comandos
+
+    def _block(self, comandos):
+        comandos = self._commands(comandos)
+        if not comandos:
+            return lambda: None
+        if len(comandos) == 1:
+            return comandos[0]
+
+        def bloco():
+            for comando in comandos:
+                comando()
+        return bloco
+
+    def _commands(self, comandos):
+        compilados = (self._command(comando) for comando in comandos)
+        return tuple(comando for comando in compilados if comando is not None)
+
+    def _command(self, ctx):
+        if isinstance(ctx, AraraParser.ComandoAtribContext):
+            return self._assign(ctx)
+        if isinstance(ctx, AraraParser.ComandoEscrevaContext):
+            return self._write(ctx)
+        if isinstance(ctx, AraraParser.ComandoLeiaContext):
+            return self._read(ctx)
+        if isinstance(ctx, AraraParser.ComandoCondicionalContext):
+            return self._if(ctx.condicional())
+        if isinstance(ctx, AraraParser.ComandoRepeticaoContext):
+            return self._while(ctx.repeticao())
+        return None    # declarações já estão na tabela de símbolos
+
+    def _assign(self, ctx):
+        m = self.memory
+        i, tipo = self._slot(ctx)
+        forma, valor, tipo_expr, origem = self._expression(ctx.expressao())
+        if tipo_expr == "string":
+            raise InterpreterError(f"string atribuída à variável '{ctx.ID().getText()}' (linha {ctx.start.line})")
+        if tipo == "real" and tipo_expr != "real":
+            valor, forma, origem = self._convert(float, forma, valor)
+        elif tipo != "real" and tipo_expr == "real":
+            valor, forma, origem = self._convert(para_inteiro, forma, valor)
+
+        if forma == "c":
+            def atrib():
+                m[i] = valor
+        elif forma == "v":
+            def atrib():
+                m[i] = m[valor]
+        elif origem is not None and origem[1] == i and origem[0] in "+-":
+            #i <- i + c e i <- i - c sem chamar a closure da soma
+            passo = origem[2] if origem[0] == "+" else -origem[2]
+
+            def atrib():
+                m[i] = ((m[i] + passo + D) & M) - D
+        else:
+            def atrib():
+                m[i] = valor()
+        return atrib
+
+    #Conversão para o tipo da variável atribuída, feita já na compilação se o valor é constante
+    def _convert(self, conversao, forma, valor):
+        if forma == "c":
+            return conversao(valor), "c", None
+        a = self._getter((forma, valor))
+        return (lambda: conversao(a())), "e", None
+
+    def _write(self, ctx):
+        m = self.memory
+        write = self.io.write
+        forma, valor, tipo, _ = self._expression(ctx.expressao())
+        if forma == "s":
+            return partial(write, valor)
+        if tipo == "real":
+            a = self._getter((forma, valor))
+            return lambda: write(texto_real(a()))
+        if forma == "c":
+            return partial(write, "%d " % valor)
+        if forma == "v":
+            return lambda: write("%d " % m[valor])
+        return lambda: write("%d " % valor())
+
+    def _read(self, ctx):
+        m = self.memory
+        i, tipo = self._slot(ctx)
+        leitura = self.io.read_real if tipo == "real" else self.io.read_int
+
+        def leia():
+            m[i] = leitura(m[i])
+        return leia
+
+    def _if(self, ctx):
+        condicao = self._condition(ctx.expressao())
+        entao = self._block(ctx.bloco().comando())
+        senao = self._block(ctx.cond_opc().bloco().comando()) if ctx.cond_opc().SENAO() else None
+        if senao is None:
+            def se():
+                if condicao():
+                    entao()
+        else:
+            def se():
+                if condicao():
+                    entao()
+                else:
+                    senao()
+        return se
+
+    def _while(self, ctx):
+        condicao = self._condition(ctx.expressao())
+        corpo = self._commands(ctx.bloco().comando())
+        if len(corpo) == 1:
+            unico = corpo[0]
+
+            def enquanto():
+                while condicao():
+                    unico()
         else:
-            self.memory[var_name] = user_input
-        return None
-
-    def visitEscreva(self, ctx: AraraParser.ComandoContext):
-        value = self.visit(ctx.expressao())
-        print(value)
-        return None
-
-    def visitCondicional(self, ctx: AraraParser.CondicionalContext):
-        condition = self.visit(ctx.expressao())
-        if condition:
-            self.visit(ctx.bloco(0))
-        elif ctx.cond_opc() is not None:
-            self.visit(ctx.cond_opc())
-        return None
-
-    def visitCond_opc(self, ctx: AraraParser.Cond_opcContext):
-        if ctx.bloco():
-            self.visit(ctx.bloco())
-        return None
-
-    def visitRepeticao(self, ctx: AraraParser.RepeticaoContext):
-        while self.visit(ctx.expressao()):
-            self.visit(ctx.bloco())
-        return None
-
-    def visitExpressao(self, ctx: AraraParser.ExpressaoContext):
-        return self.visit(ctx.logica())
-
-    def visitLogica(self, ctx: AraraParser.LogicaContext):
-        left = self.visit(ctx.comparacao())
-        if ctx.logica_suf():
-            op = ctx.logica_suf().OPLOG().getText()
-            right = self.visit(ctx.logica_suf().comparacao())
-            if op == "&&":
-                return left and right
-            elif op == "||":
-                return left or right
-        return left
-
-    def visitComparacao(self, ctx: AraraParser.ComparacaoContext):
-        left = self.visit(ctx.soma())
-        if ctx.comparacao_suf():
-            op = ctx.comparacao_suf().OPCOMP().getText()
-            right = self.visit(ctx.comparacao_suf().soma())
-            if op == "==":
-                return left == right
-            elif op == "!=":
-                return left != right
-            elif op == "<":
-                return left < right
-            elif op == "<=":
-                return left <= right
-            elif op == ">":
-                return left > right
-            elif op == ">=":
-                return left >= right
-        return left
-
-    def visitSoma(self, ctx: AraraParser.SomaContext):
-        result = self.visit(ctx.termo())
-        if ctx.soma_suf():
-            op = ctx.soma_suf().OPSUM().getText()
-            next_term = self.visit(ctx.soma_suf().termo())
-            if op == "+":
-                return result + next_term
-            elif op == "-":
-                return result - next_term
-        return result
-
-    def visitTermo(self, ctx: AraraParser.TermoContext):
-        result = self.visit(ctx.fator())
-        if ctx.termo_suf():
-            op = ctx.termo_suf().OPMULT().getText()
-            next_factor = self.visit(ctx.termo_suf().fator())
-            if op == "*":
-                return result * next_factor
-            elif op == "/":
-                return result // next_factor
-        return result
-
-    def visitFator(self, ctx: AraraParser.FatorContext):
+            def enquanto():
+                while condicao():
+                    for comando in corpo:
+                        comando()
+        return enquanto
+
+    def _condition(self, ctx):
+        forma, valor, tipo, _ = self._expression(ctx)
+        if tipo == "string":
+            raise InterpreterError(f"string usada como condição (linha {ctx.start.line})")
+        return self._getter((forma, valor))
+
+    #Expressões: cada uma vira (forma, valor, tipo, origem), com forma "c" (constante em
+    #valor), "v" (variável no slot valor), "e" (closure em valor) ou "s" (string); origem
+    #guarda (operador, slot, constante) das contas inteiras entre variável e constante
+
+    #Constantes viram o __next__ de um repeat, que devolve o valor sem criar um frame Python
+    def _getter(self, expr):
+        forma, valor = expr[0], expr[1]
+        if forma == "c":
+            return repeat(valor).__next__
+        if forma == "v":
+            return partial(self.memory.__getitem__, valor)
+        return valor
+
+    def _expression(self, ctx):
+        return self._logic(ctx.logica())
+
+    def _logic(self, ctx):
+        esquerda = self._comparison(ctx.comparacao())
+        suf = ctx.logica_suf()
+        while suf.OPLOG():
+            direita = self._comparison(suf.comparacao())
+            esquerda = self._binary(LOGICAS[suf.OPLOG().getText()], esquerda, direita, "inteiro", suf)
+            suf = suf.logica_suf()
+        return esquerda
+
+    def _comparison(self, ctx):
+        esquerda = self._sum(ctx.soma())
+        suf = ctx.comparacao_suf()
+        if not suf.OPCOMP():
+            return esquerda
+        op = suf.OPCOMP().getText()
+        direita = self._sum(suf.soma())
+        if esquerda[0] == "v" and direita[0] == "c":
+            return self._specialized(COMPARA_VAR_CONST[op](self.memory, esquerda[1], direita[1]), "inteiro")
+        if esquerda[0] == "v" and direita[0] == "v":
+            return self._specialized(COMPARA_VAR_VAR[op](self.memory, esquerda[1], direita[1]), "inteiro")
+        return self._binary(COMPARACOES[op], esquerda, direita, "inteiro", suf)
+
+    def _sum(self, ctx):
+        esquerda = self._term(ctx.termo())
+        suf = ctx.soma_suf()
+        while suf.OPSUM():
+            esquerda = self._arithmetic(suf.OPSUM().getText(), esquerda, self._term(suf.termo()), suf)
+            suf = suf.soma_suf()
+        return esquerda
+
+    def _term(self, ctx):
+        esquerda = self._factor(ctx.fator())
+        suf = ctx.termo_suf()
+        while suf.OPMULT():
+            esquerda = self._arithmetic(suf.OPMULT().getText(), esquerda, self._factor(suf.fator()), suf)
+            suf = suf.termo_suf()
+        return esquerda
+
+    def _factor(self, ctx):
         if ctx.INT():
-            return int(ctx.INT().getText())
-        elif ctx.STRING():
-            return ctx.STRING().getText().strip('"')
-        elif ctx.ID():
-            var_name = ctx.ID().getText()
-            if var_name not in self.memory:
-                raise RuntimeError(f"Variable '{var_name}' is not initialized.")
-            return self.memory[var_name]
-        elif ctx.expressao():
-            return self.visit(ctx.expressao())
-        elif ctx.getChild(0).getText() == '!':
-            return not self.visit(ctx.fator())
-        return None
\ No newline at end of file
+            return ("c", int32(int(ctx.INT().getText())), "inteiro", None)
+        if ctx.STRING():
+            return ("s", decodificar_string(ctx.STRING().getText()), "string", None)
+        if ctx.ID():
+            i, tipo = self._slot(ctx)
+            return ("v", i, tipo, None)
+        if ctx.expressao():
+            return self._expression(ctx.expressao())
+        operando = self._factor(ctx.fator())
+        self._check_not_string(operando, ctx)
+        if operando[0] == "c":
+            return ("c", not operando[1], "inteiro", None)
+        a = self._getter(operando)
+        return ("e", lambda: not a(), "inteiro", None)
+
+    def _arithmetic(self, op, esquerda, direita, ctx):
+        if "real" in (esquerda[2], direita[2]):
+            return self._binary(REAL_BINARIAS[op], esquerda, direita, "real", ctx)
+        if direita[0] == "c" and esquerda[0] == "v":
+            expr = self._specialized(INT_VAR_CONST[op](self.memory, esquerda[1], direita[1]), "inteiro")
+            return expr[:3] + ((op, esquerda[1], direita[1]),)
+        if direita[0] == "c" and esquerda[0] == "e":
+            return self._specialized(INT_EXPR_CONST[op](esquerda[1], direita[1]), "inteiro")
+        if esquerda[0] == "v" and direita[0] == "v":
+            return self._specialized(INT_VAR_VAR[op](self.memory, esquerda[1], direita[1]), "inteiro")
+        return self._binary(INT_BINARIAS[op], esquerda, direita, "inteiro", ctx)
+
+    def _specialized(self, funcao, tipo):
+        return ("e", funcao, tipo, None)
+
+    #Monta a closure da operação; com os dois lados constantes, calcula já na compilação
+    #(menos a divisão inteira por zero, que fica para dar erro se for executada)
+    def _binary(self, fabrica, esquerda, direita, tipo, ctx):
+        self._check_not_string(esquerda, ctx)
+        self._check_not_string(direita, ctx)
+        funcao = fabrica(self._getter(esquerda), self._getter(direita))
+        if esquerda[0] == "c" and direita[0] == "c":
+            try:
+                return ("c", funcao(), tipo, None)
+            except InterpreterError:
+                pass
+        return ("e", funcao, tipo, None)
+
+    def _check_not_string(self, expr, ctx):
+        if expr[2] == "string":
+            raise InterpreterError(f"string usada numa operação (linha {ctx.start.line})")
@@ -0,0 +1,348 @@
+# Arquivo: src/interpreter/profiler.py
+
+# Perfil de execução dos modos interpretados. Os comandos do programa formam uma árvore
+# (um comando dentro de um se ou enquanto é filho dele) e, como Arara não tem funções, a
+# pilha de cada comando em execução é sempre o caminho dele na árvore. Para cada comando
+# são medidos execuções e tempo, e cada um é identificado pela linha e coluna do seu
+# primeiro token no .arara, a posição que o ANTLR guarda.
+# - Interpretador de closures: a closure de cada comando é embrulhada numa que conta e mede
+#   o tempo (com os comandos de dentro); a condição de cada enquanto conta as voltas.
+# - VM: o TAC é traduzido sem juntar instruções e o laço de despacho, sem mudança nenhuma,
+#   roda sob sys.settrace, que avisa a cada instrução buscada. O tempo de uma instrução vai
+#   até a busca da seguinte; cada instrução do TAC traz a posição do comando que a gerou.
+#   Os laços vêm do CFG do TAC, não da árvore: com -O2 parte de um comando pode ter ido para
+#   o pré-cabeçalho, fora do laço.
+# O resultado é um relatório ordenado pelo tempo (linhas, laços e, na VM, instruções do
+# TAC) e um arquivo de pilhas colapsadas ("a;b;c microssegundos"), o formato de entrada do
+# flamegraph.pl e do speedscope. O próprio perfil deixa a execução bem mais lenta; o que
+# vale é a proporção entre as partes.
+
+import inspect
+import sys
+import time
+
+from grammar.generated.AraraParser import AraraParser
+from src.interpreter.Interpreter import Interpreter
+from src.interpreter.vm import BytecodeCompiler, VM
+from src.tac.cfg import ControlFlowGraph
+
+#Linhas de cada seção do relatório
+LIMITE_RELATORIO = 20
+
+
+class Profile:
+
+    def __init__(self, tree, source, name="programa"):
+        self.name = name
+        self.lines = source.splitlines()
+        self.kinds = []
+        self.positions = []
+        self.parents = []
+        self.labels = []
+        self.index = {}
+        self._nodes(tree.comando(), None)
+        n = len(self.positions)
+        self.counts = [0] * n
+        self.times = [0.0] * n       # tempo com os comandos de dentro
+        self.own_times = [0.0] * n   # tempo só do comando (no enquanto e no se, o do teste)
+        self.entries = [0] * n
+        self.iterations = [0] * n
+        #Na VM: (instrução do TAC, posição, execuções, tempo) de cada instrução executada
+        self.instructions = []
+        self.total = 0.0
+        self.backend = ""
+
+    def _nodes(self, comandos, pai):
+        for ctx in comandos:
+            if isinstance(ctx, AraraParser.ComandoAtribContext):
+                tipo, rotulo = "atribuicao", f"{ctx.ID().getText()} <-"
+            elif isinstance(ctx, AraraParser.ComandoEscrevaContext):
+                tipo, rotulo = "escreva", "escreva"
+            elif isinstance(ctx, AraraParser.ComandoLeiaContext):
+                tipo, rotulo = "leia", f"leia({ctx.ID().getText()})"
+            elif isinstance(ctx, AraraParser.ComandoCondicionalContext):
+                tipo, rotulo = "se", "se"
+            elif isinstance(ctx, AraraParser.ComandoRepeticaoContext):
+                tipo, rotulo = "enquanto", "enquanto"
+            else:
+                continue    # declarações não executam
+            no = len(self.positions)
+            posicao = (ctx.start.line, ctx.start.column)
+            self.kinds.append(tipo)
+            self.positions.append(posicao)
+            self.parents.append(pai)
+            self.labels.append(f"{rotulo} {posicao[0]}:{posicao[1]}")
+            self.index[posicao] = no
+            if tipo == "se":
+                condicional = ctx.condicional()
+                self._nodes(condicional.bloco().comando(), no)
+                if condicional.cond_opc().SENAO():
+                    self._nodes(condicional.cond_opc().bloco().comando(), no)
+            elif tipo == "enquanto":
+                self._nodes(ctx.repeticao().bloco().comando(), no)
+
+    def _stack(self, no):
+        pilha = []
+        while no is not None:
+            pilha.append(self.labels[no])
+            no = self.parents[no]
+        pilha.append(self.name)
+        return list(reversed(pilha))
+
+    #Tempo próprio a partir do tempo com os filhos, ou o contrário; os nós estão em pré-ordem,
+    #então os filhos vêm sempre depois do pai
+    def _own_from_inclusive(self):
+        self.own_times = list(self.times)
+        for no, pai in enumerate(self.parents):
+            if pai is not None:
+                self.own_times[pai] -= self.times[no]
+
+    def _inclusive_from_own(self):
+        self.times = list(self.own_times)
+        for no in reversed(range(len(self.parents))):
+            pai = self.parents[no]
+            if pai is not None:
+                self.times[pai] += self.times[no]
+
+    def _source_line(self, linha):
+        return self.lines[linha - 1].strip() if 0 < linha <= len(self.lines) else ""
+
+    def _percent(self, tempo):
+        return 100 * tempo / self.total if self.total else 0.0
+
+    def report(self, limite=LIMITE_RELATORIO):
+        saida = [f"Perfil de {self.name} ({self.backend}): {self.total:.3f} s no total", ""]
+        linhas = {}
+        for no, (linha, _) in enumerate(self.positions):
+            execucoes, tempo = linhas.get(linha, (0, 0.0))
+            linhas[linha] = (max(execucoes, self.counts[no]), tempo + self.own_times[no])
+        saida.append("Linhas mais quentes (tempo próprio):")
+        saida.append(f"{'linha':>6} {'execuções':>11} {'tempo (s)':>10} {'%':>6}  código")
+        for linha, (execucoes, tempo) in sorted(linhas.items(), key=lambda item: -item[1][1])[:limite]:
+            saida.append(f"{linha:>6} {execucoes:>11} {tempo:>10.4f} {self._percent(tempo):>6.1f}  "
+                         f"{self._source_line(linha)}")
+
+        lacos = [no for no, tipo in enumerate(self.kinds) if tipo == "enquanto"]
+        if lacos:
+            saida.append("")
+            saida.append("Laços enquanto (tempo com o corpo):")
+            saida.append(f"{'posição':>9} {'entradas':>9} {'voltas':>11} {'tempo (s)':>10} {'%':>6}  código")
+            for no in sorted(lacos, key=lambda no: -self.times[no])[:limite]:
+                linha, coluna = self.positions[no]
+                saida.append(f"{f'{linha}:{coluna}':>9} {self.entries[no]:>9} {self.iterations[no]:>11} "
+                             f"{self.times[no]:>10.4f} {self._percent(self.times[no]):>6.1f}  "
+                             f"{self._source_line(linha)}")
+
+        if self.instructions:
+            saida.append("")
+            saida.append("Instruções do TAC mais quentes:")
+            saida.append(f"{'posição':>9} {'execuções':>11} {'tempo (s)':>10} {'%':>6}  instrução")
+            for texto, posicao, execucoes, tempo in sorted(self.instructions, key=lambda item: -item[3])[:limite]:
+                local = f"{posicao[0]}:{posicao[1]}" if posicao else "?"
+                saida.append(f"{local:>9} {execucoes:>11} {tempo:>10.4f} {self._percent(tempo):>6.1f}  {texto}")
+        return "\n".join(saida) + "\n"
+
+    #Pilhas colapsadas em microssegundos: o tempo próprio de cada comando ou, na VM, o tempo
+    #de cada instrução do TAC, como folha embaixo do comando que a gerou
+    def collapsed(self):
+        pilhas = []
+        if self.instructions:
+            for texto, posicao, _, tempo in self.instructions:
+                no = self.index.get(posicao)
+                pilhas.append((self._stack(no) + [texto.replace(";", ",")], tempo))
+        else:
+            pilhas = [(self._stack(no), tempo) for no, tempo in enumerate(self.own_times)]
+        linhas = []
+        for pilha, tempo in pilhas:
+            micro = int(round(tempo * 1e6))
+            if micro > 0:
+                linhas.append(f"{';'.join(pilha)} {micro}")
+        return "\n".join(linhas) + "\n"
+
+
+class ProfilingInterpreter(Interpreter):
+
+    def __init__(self, semantic_table, profile):
+        super().__init__(semantic_table)
+        self.profile = profile
+        self.atual = None
+
+    def _command(self, ctx):
+        no = self.profile.index.get((ctx.start.line, ctx.start.column))
+        if no is None:
+            return super()._command(ctx)
+        externo, self.atual = self.atual, no
+        comando = super()._command(ctx)
+        self.atual = externo
+        contagens, tempos = self.profile.counts, self.profile.times
+        relogio = time.perf_counter
+
+        def medido():
+            inicio = relogio()
+            try:
+                comando()
+            finally:
+                tempos[no] += relogio() - inicio
+                contagens[no] += 1
+        return medido
+
+    #A condição de um enquanto conta as avaliações: as voltas são elas menos as entradas
+    def _condition(self, ctx):
+        condicao = super()._condition(ctx)
+        no = self.atual
+        if self.profile.kinds[no] != "enquanto":
+            return condicao
+        avaliacoes = self.profile.iterations
+
+        def contada():
+            avaliacoes[no] += 1
+            return condicao()
+        return contada
+
+
+def profile_interpreter(profile, semantic_table, tree, io):
+    profile.backend = "interpretador"
+    inicio = time.perf_counter()
+    try:
+        ProfilingInterpreter(semantic_table, profile).run(tree, io)
+    finally:
+        profile.total = time.perf_counter() - inicio
+        for no, tipo in enumerate(profile.kinds):
+            if tipo == "enquanto":
+                profile.entries[no] = profile.counts[no]
+                profile.iterations[no] -= profile.counts[no]
+        profile._own_from_inclusive()
+
+
+#Linha do laço de despacho da VM que busca a próxima instrução ('op, a, b, c = code[pc]')
+def _fetch_line():
+    linhas, primeira = inspect.getsourcelines(VM._execute)
+    for deslocamento, linha in enumerate(linhas):
+        if "= code[pc]" in linha:
+            return primeira + deslocamento
+    raise RuntimeError("busca de instrução não encontrada no laço da VM")
+
+
+def profile_vm(profile, tac_code, semantic_table, io):
+    profile.backend = "VM"
+    tac_code = list(tac_code)
+    bytecode = BytecodeCompiler(semantic_table).compile(tac_code, profiling=True)
+    origens = bytecode.origins
+    nos = [profile.index.get(tac_code[origem].position) if origem is not None else None for origem in origens]
+    blocos, profundidades, cabecas = _vm_loops(profile, tac_code, origens, nos)
+    repeticoes = _vm_repeats(profile, tac_code, origens, nos, bytecode.instructions(), cabecas)
+    contagens = [0] * len(origens)
+    tempos = [0.0] * len(origens)
+    relogio = time.perf_counter
+    linha_busca = _fetch_line()
+    codigo_laco = VM._execute.__code__
+    estado = [None, 0.0]
+
+    def fecha(agora):
+        if estado[0] is not None:
+            tempos[estado[0]] += agora - estado[1]
+
+    def rastro_laco(frame, evento, arg):
+        if evento == "line" and frame.f_lineno == linha_busca:
+            fecha(relogio())
+            pc = frame.f_locals["pc"]
+            contagens[pc] += 1
+            cabeca = cabecas.get(pc)
+            if cabeca is not None:
+                laco, corpo = cabeca
+                anterior = estado[0]
+                if anterior is not None and blocos[anterior] in corpo:
+                    profile.iterations[laco] += 1
+                else:
+                    profile.entries[laco] += 1
+            repeticao = repeticoes.get(pc)
+            if repeticao is not None:
+                laco, registrador = repeticao
+                profile.iterations[laco] += max(0, frame.f_locals["r"][registrador])
+            estado[0] = pc
+            estado[1] = relogio()
+        elif evento == "return":
+            fecha(relogio())
+            estado[0] = None
+        return rastro_laco
+
+    def rastro(frame, evento, arg):
+        return rastro_laco if frame.f_code is codigo_laco else None
+
+    inicio = relogio()
+    sys.settrace(rastro)
+    try:
+        VM(io).run(bytecode)
+    finally:
+        sys.settrace(None)
+        profile.total = relogio() - inicio
+        _collect_vm(profile, tac_code, origens, nos, profundidades, cabecas, repeticoes, contagens, tempos)
+
+
+#Laços naturais do TAC: bloco de cada instrução do bytecode, em quantos laços ela está e, para
+#a primeira instrução do cabeçalho de cada laço (o começo do teste), o enquanto e os blocos do
+#laço. Chegar no cabeçalho de um bloco do laço (o salto de volta) é mais uma volta; de fora
+#(inclusive do pré-cabeçalho), uma entrada
+def _vm_loops(profile, tac_code, origens, nos):
+    cfg = ControlFlowGraph(tac_code)
+    bloco_de = {id(instr): block.index for block in cfg.blocks for instr in block.instructions}
+    blocos = [bloco_de[id(tac_code[origem])] if origem is not None else None for origem in origens]
+    profundidades = [0] * len(origens)
+    cabecas = {}
+    for loop in cfg.loops():
+        for pc, bloco in enumerate(blocos):
+            if bloco in loop.body:
+                profundidades[pc] += 1
+        cabeca = [pc for pc, bloco in enumerate(blocos) if bloco == loop.header]
+        laco = next((nos[pc] for pc in cabeca if nos[pc] is not None and profile.kinds[nos[pc]] == "enquanto"),
+                    None)
+        if laco is not None:
+            cabecas[cabeca[0]] = (laco, loop.body)
+    return blocos, profundidades, cabecas
+
+
+#Enquanto que a junção de escritas trocou por uma escrita repetida: não é mais laço no CFG, e
+#as voltas são a contagem da escrita (o registrador lido na hora de executá-la)
+def _vm_repeats(profile, tac_code, origens, nos, codigo, cabecas):
+    lacos = {laco for laco, _ in cabecas.values()}
+    repeticoes = {}
+    for pc, origem in enumerate(origens):
+        no = nos[pc]
+        if (origem is not None and tac_code[origem].opcode == "WRITE_REPEAT" and no is not None
+                and profile.kinds[no] == "enquanto" and no not in lacos):
+            repeticoes[pc] = (no, codigo[pc][2])
+    return repeticoes
+
+
+#Junta as medidas por instrução do TAC (uma conversão de tipo pode gerar duas no bytecode) e
+#por comando: execuções do comando são as da sua primeira instrução entre as que estão em mais
+#laços, para não contar o que foi tirado do laço (no enquanto, as entradas; num enquanto que
+#virou uma escrita repetida, as execuções do teste que sobrou e, nos comandos do corpo, as voltas)
+def _collect_vm(profile, tac_code, origens, nos, profundidades, cabecas, repeticoes, contagens, tempos):
+    por_instrucao = {}
+    representante = {}
+    for pc, origem in enumerate(origens):
+        if origem is None:
+            continue
+        execucoes, tempo = por_instrucao.get(origem, (0, 0.0))
+        por_instrucao[origem] = (max(execucoes, contagens[pc]), tempo + tempos[pc])
+        no = nos[pc]
+        if no is not None:
+            profile.own_times[no] += tempos[pc]
+            if no not in representante or profundidades[pc] > profundidades[representante[no]]:
+                representante[no] = pc
+    for no, pc in representante.items():
+        profile.counts[no] = contagens[pc]
+    for laco, _ in cabecas.values():
+        profile.counts[laco] = profile.entries[laco]
+    #O corpo de um laço trocado por escrita repetida só tinha escritas e o contador, sem desvios:
+    #cada comando dele rodou uma vez por volta
+    repetidos = {laco for laco, _ in repeticoes.values()}
+    for laco in repetidos:
+        profile.entries[laco] = profile.counts[laco]
+    for no, pai in enumerate(profile.parents):
+        if pai in repetidos and no not in representante:
+            profile.counts[no] = profile.iterations[pai]
+    profile.instructions = [(str(tac_code[origem]), tac_code[origem].position, execucoes, tempo)
+                            for origem, (execucoes, tempo) in sorted(por_instrucao.items()) if execucoes]
+    profile._inclusive_from_own()
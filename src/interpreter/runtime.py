@@ -0,0 +1,165 @@
+# Arquivo: src/interpreter/runtime.py
+
+# Runtime dos modos interpretados: a mesma semântica do código nativo (inteiros de 32 bits
+# com wraparound, divisão truncada, conversão de real para inteiro como o cvttsd2si) e a
+# mesma entrada/saída da biblioteca em C (src/runtime/arara_runtime.c). A entrada é lida em
+# blocos, como o read() da runtime em C, e cada leia converte só o próximo número do bloco.
+
+import io
+import math
+import re
+import sys
+
+INT_MIN = -2147483648
+INT_MAX = 2147483647
+#Somar DESLOCAMENTO, mascarar com MASCARA e subtrair de novo leva qualquer inteiro para 32 bits
+DESLOCAMENTO = 2147483648
+MASCARA = 0xFFFFFFFF
+
+#Tamanho dos buffers de saída e de entrada, como TAM_SAIDA e TAM_ENTRADA do runtime em C
+TAM_SAIDA = 65536
+TAM_ENTRADA = 65536
+
+#O próximo inteiro (espaços, sinal e dígitos, como o arara_read_int; um sinal sem dígitos é
+#consumido e o grupo fica None) e os até 63 caracteres que o arara_read_real junta para o
+#strtod, a partir de uma posição do buffer
+_INTEIRO = re.compile(r"[ \t\n\r\v\f]*(?:([+-]?[0-9]+)|[+-]?)")
+_CARACTERES_REAL = re.compile(r"[ \t\n\r\v\f]*([0-9.+\-eE]{0,63})")
+#Prefixo que o strtod aceitaria entre os caracteres que o leitor de reais junta
+_NUMERO_REAL = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+#O nan que o x86 produz em 0/0 e inf - inf tem o bit de sinal ligado
+NAN_PADRAO = -math.nan
+
+
+class InterpreterError(Exception):
+    pass
+
+
+def int32(valor):
+    return ((valor + DESLOCAMENTO) & MASCARA) - DESLOCAMENTO
+
+
+#Divisão inteira truncada para zero, como o sdiv; INT_MIN / -1 volta para INT_MIN
+def divisao_inteira(a, b):
+    if b == 0:
+        raise InterpreterError("divisão inteira por zero")
+    q = abs(a) // abs(b)
+    return int32(q if (a < 0) == (b < 0) else -q)
+
+
+#Divisão de reais com o resultado do IEEE 754 para divisor zero (inf ou nan)
+def divisao_real(a, b):
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a != a:
+            return a
+        if a == 0:
+            return NAN_PADRAO
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+#Real para inteiro truncando; fora do intervalo de 32 bits (ou nan) dá INT_MIN, como o cvttsd2si
+def para_inteiro(valor):
+    if valor != valor or not INT_MIN <= valor < DESLOCAMENTO:
+        return INT_MIN
+    return int(valor)
+
+
+#Como o printf("%f "), que escreve o sinal do nan
+def texto_real(valor):
+    if valor != valor:
+        return "-nan " if math.copysign(1.0, valor) < 0 else "nan "
+    return "%f " % valor
+
+
+def decodificar_string(literal):
+    return literal[1:-1].encode("latin1").decode("unicode_escape")
+
+
+class ProgramIO:
+    def __init__(self, entrada=None, saida=None):
+        self.entrada = entrada if entrada is not None else sys.stdin
+        self.saida = saida if saida is not None else sys.stdout
+        self.pendente = []
+        self.tamanho_pendente = 0
+        self.texto = ""
+        self.pos = 0
+        self._ler_bloco = self._leitor(self.entrada)
+
+    #Entrada já toda em memória (o conteúdo de um arquivo de entrada, repetido a cada execução)
+    @classmethod
+    def replay(cls, dados, saida=None):
+        programa_io = cls(io.StringIO(""), saida)
+        programa_io.texto = dados
+        return programa_io
+
+    #Função que devolve o próximo bloco da entrada ("" no fim). Num arquivo binário ou no
+    #stdin, o read1 devolve o que já está disponível, sem esperar o bloco encher (como o
+    #read da runtime em C num terminal ou pipe); os bytes viram caracteres um a um (latin-1),
+    #o que não muda dígitos, sinais e espaços
+    def _leitor(self, entrada):
+        binario = entrada if hasattr(entrada, "read1") else getattr(entrada, "buffer", None)
+        if binario is not None and hasattr(binario, "read1"):
+            return lambda: binario.read1(TAM_ENTRADA).decode("latin-1")
+        return lambda: entrada.read(TAM_ENTRADA)
+
+    def write(self, texto):
+        self.pendente.append(texto)
+        self.tamanho_pendente += len(texto)
+        if self.tamanho_pendente >= TAM_SAIDA:
+            self.flush()
+
+    def write_int(self, valor):
+        self.write("%d " % valor)
+
+    def write_real(self, valor):
+        self.write(texto_real(valor))
+
+    def flush(self):
+        if self.pendente:
+            self.saida.write("".join(self.pendente))
+            self.pendente.clear()
+            self.tamanho_pendente = 0
+        self.saida.flush()
+
+    #Junta o próximo bloco ao que falta consumir; a saída pendente é escrita antes de
+    #esperar por mais entrada, como no runtime em C. False no fim da entrada
+    def _refill(self):
+        self.flush()
+        bloco = self._ler_bloco()
+        if not bloco:
+            return False
+        self.texto = self.texto[self.pos:] + bloco
+        self.pos = 0
+        return True
+
+    #Casa o padrão na posição atual; se ele chega ao fim do buffer, o número pode continuar
+    #no próximo bloco, então lê mais e casa de novo
+    def _match(self, padrao):
+        m = padrao.match(self.texto, self.pos)
+        while m.end() == len(self.texto) and self._refill():
+            m = padrao.match(self.texto, self.pos)
+        self.pos = m.end()
+        return m
+
+    #Como o arara_read_int: sinal opcional e dígitos; sem número, fica o valor atual
+    def read_int(self, atual):
+        m = _INTEIRO.match(self.texto, self.pos)
+        if m.end() == len(self.texto):
+            m = self._match(_INTEIRO)
+        else:
+            self.pos = m.end()
+        numero = m.group(1)
+        if numero is None:
+            return atual
+        if len(numero) < 10:
+            return int(numero)
+        #10**32 é múltiplo de 2**32: os últimos 32 dígitos bastam para o valor em 32 bits
+        valor = int(numero.lstrip("+-")[-32:])
+        return int32(-valor if numero[0] == "-" else valor)
+
+    #Como o arara_read_real: junta dígitos, sinais, ponto e expoente e converte o prefixo válido
+    def read_real(self, atual):
+        numero = _NUMERO_REAL.match(self._match(_CARACTERES_REAL).group(1))
+        return float(numero.group(0)) if numero else atual
@@ -0,0 +1,373 @@
+# Arquivo: src/interpreter/transpiler.py
+
+# Tradução da árvore sintática para código-fonte Python, compilado uma vez com compile() e
+# executado com exec: o programa vira uma função em que as variáveis são variáveis locais
+# (LOAD_FAST/STORE_FAST) e enquanto/se viram while/if, então o laço de despacho é o do
+# próprio CPython. As contas inteiras dão a volta em 32 bits e a divisão trunca, com as
+# mesmas funções da runtime dos outros modos interpretados (src/interpreter/runtime.py).
+# O code object fica num cache em disco indexado pelo hash do fonte .arara, e uma execução
+# repetida do mesmo programa não passa mais pelo front-end.
+
+import hashlib
+import marshal
+import os
+from importlib.util import MAGIC_NUMBER
+
+from grammar.generated.AraraParser import AraraParser
+from src.interpreter.runtime import (ProgramIO, InterpreterError, DESLOCAMENTO as D, MASCARA as M, int32,
+                                     divisao_inteira, divisao_real, para_inteiro, texto_real,
+                                     decodificar_string)
+
+NOME_FUNCAO = "programa"
+#Nomes globais que o código gerado usa (viram argumentos com valor padrão, que são locais)
+AMBIENTE = {
+    "_div": divisao_inteira,
+    "_divr": divisao_real,
+    "_int": para_inteiro,
+    "_real": texto_real,
+}
+ARITMETICA_INT = {
+    "+": lambda a, b: int32(a + b),
+    "-": lambda a, b: int32(a - b),
+    "*": lambda a, b: int32(a * b),
+    "/": divisao_inteira,
+}
+COMPARACOES = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+LOGICAS = {"&&": "and", "||": "or"}
+
+with open(__file__, "rb") as _f:
+    #O código gerado muda com o tradutor e o code object, com a versão do bytecode do CPython
+    _VERSAO = hashlib.sha256(MAGIC_NUMBER + _f.read()).digest()
+
+
+#O programa é válido, mas passa de um limite do compilador do Python (o CPython aceita no
+#máximo 20 blocos aninhados numa função); os outros modos interpretados o executam
+class TranslationLimitError(InterpreterError):
+    pass
+
+
+class Transpiler:
+    def __init__(self, semantic_table={}):
+        self.semantic_table = semantic_table
+        self.linhas = []
+        self.nivel = 0
+
+    #Fonte Python de um módulo que define programa(io)
+    def translate(self, tree):
+        self.linhas = []
+        self.nivel = 1
+        self._emit_header()
+        comandos = len(self.linhas)
+        self._block(tree.comando())
+        if len(self.linhas) == comandos:
+            self._line("pass")
+        return "\n".join(self.linhas) + "\n"
+
+    def compile(self, tree, nome_arquivo="<arara>"):
+        fonte = self.translate(tree)
+        try:
+            return compile(fonte, nome_arquivo, "exec")
+        except (SyntaxError, RecursionError) as e:
+            motivo = e.msg if isinstance(e, SyntaxError) else "expressões aninhadas demais"
+            raise TranslationLimitError(f"o Python não compila o programa traduzido: {motivo}") from e
+
+    def _line(self, texto):
+        self.linhas.append("    " * self.nivel + texto)
+
+    def _emit_header(self):
+        padroes = "".join(f", {nome}={nome}" for nome in AMBIENTE)
+        self.linhas.append(f"def {NOME_FUNCAO}(io{padroes}):")
+        self._line("write = io.write")
+        self._line("read_int = io.read_int")
+        self._line("read_real = io.read_real")
+        for nome, tipo in self.semantic_table.items():
+            self._line(f"{self._name(nome)} = {'0.0' if tipo == 'real' else '0'}")
+
+    #Prefixo para um nome Arara não colidir com palavras reservadas e nomes do ambiente
+    def _name(self, nome):
+        return "v_" + nome
+
+    def _variable(self, ctx):
+        nome = ctx.ID().getText()
+        if nome not in self.semantic_table:
+            raise InterpreterError(f"variável '{nome}' não declarada (linha {ctx.start.line})")
+        return self._name(nome), self.semantic_table[nome]
+
+    #Comandos
+
+    def _block(self, comandos):
+        for comando in comandos:
+            self._command(comando)
+
+    def _body(self, comandos):
+        self.nivel += 1
+        inicio = len(self.linhas)
+        self._block(comandos)
+        if len(self.linhas) == inicio:
+            self._line("pass")
+        self.nivel -= 1
+
+    def _command(self, ctx):
+        if isinstance(ctx, AraraParser.ComandoAtribContext):
+            self._assign(ctx)
+        elif isinstance(ctx, AraraParser.ComandoEscrevaContext):
+            self._write(ctx)
+        elif isinstance(ctx, AraraParser.ComandoLeiaContext):
+            nome, tipo = self._variable(ctx)
+            self._line(f"{nome} = {'read_real' if tipo == 'real' else 'read_int'}({nome})")
+        elif isinstance(ctx, AraraParser.ComandoCondicionalContext):
+            self._if(ctx.condicional())
+        elif isinstance(ctx, AraraParser.ComandoRepeticaoContext):
+            self._while(ctx.repeticao())
+
+    def _assign(self, ctx):
+        nome, tipo = self._variable(ctx)
+        expr = self._expression(ctx.expressao())
+        if expr[1] == "string":
+            raise InterpreterError(f"string atribuída à variável '{ctx.ID().getText()}' (linha {ctx.start.line})")
+        codigo = self._code(expr)
+        if tipo == "real" and expr[1] != "real":
+            codigo = repr(float(expr[2])) if expr[2] is not None else f"float({self._strip(codigo)})"
+        elif tipo != "real" and expr[1] == "real":
+            codigo = f"_int({self._strip(codigo)})"
+        self._line(f"{nome} = {self._strip(codigo)}")
+
+    def _write(self, ctx):
+        expr = self._expression(ctx.expressao())
+        if expr[1] == "string" or expr[2] is not None:
+            texto = expr[2] if expr[1] == "string" else "%d " % expr[2]
+            self._line(f"write({texto!r})")
+        elif expr[1] == "real":
+            self._line(f"write(_real({self._strip(expr[0])}))")
+        else:
+            self._line(f"write('%d ' % {self._code(expr)})")
+
+    def _if(self, ctx):
+        self._line(f"if {self._condition(ctx.expressao())}:")
+        self._body(ctx.bloco().comando())
+        if ctx.cond_opc().SENAO():
+            self._line("else:")
+            self._body(ctx.cond_opc().bloco().comando())
+
+    def _while(self, ctx):
+        self._line(f"while {self._condition(ctx.expressao())}:")
+        self._body(ctx.bloco().comando())
+
+    def _condition(self, ctx):
+        expr = self._expression(ctx)
+        if expr[1] == "string":
+            raise InterpreterError(f"string usada como condição (linha {ctx.start.line})")
+        return repr(bool(expr[2])) if expr[2] is not None else self._strip(self._code(expr))
+
+    def _strip(self, codigo):
+        return codigo[1:-1] if codigo.startswith("(") and self._balanced(codigo[1:-1]) else codigo
+
+    def _balanced(self, codigo):
+        profundidade = 0
+        for c in codigo:
+            profundidade += (c == "(") - (c == ")")
+            if profundidade < 0:
+                return False
+        return profundidade == 0
+
+    #Expressões: cada uma vira (código, tipo, valor, forma, deslocamento), com valor a
+    #constante já calculada (None se não for constante) e todo código composto entre
+    #parênteses. Forma "bool" é código que já dá True/False; forma "bruto" é uma conta
+    #inteira ainda sem a volta em 32 bits, que vale código + deslocamento: soma, subtração
+    #e multiplicação são compatíveis com o resto módulo 2**32, então a volta só é feita
+    #onde o valor é usado (atribuição, escrita, comparação, divisão, conta com real)
+
+    def _code(self, expr):
+        if expr[3] != "bruto":
+            return expr[0]
+        return f"((({expr[0]} + {expr[4] + D}) & {M}) - {D})"
+
+    #Código sem a volta em 32 bits e constante a somar; base None para uma constante
+    def _parts(self, expr):
+        if expr[2] is not None:
+            return None, expr[2]
+        if expr[3] == "bruto":
+            return expr[0], expr[4]
+        return expr[0], 0
+
+    def _raw(self, expr):
+        base, deslocamento = self._parts(expr)
+        if base is None:
+            return self._constant(deslocamento)[0]
+        if deslocamento == 0:
+            return base
+        return f"({base} + {deslocamento})" if deslocamento > 0 else f"({base} - {-deslocamento})"
+
+    def _expression(self, ctx):
+        return self._logic(ctx.logica())
+
+    def _logic(self, ctx):
+        esquerda = self._comparison(ctx.comparacao())
+        suf = ctx.logica_suf()
+        while suf.OPLOG():
+            direita = self._comparison(suf.comparacao())
+            self._check_not_string(esquerda, suf)
+            self._check_not_string(direita, suf)
+            esquerda = self._logical(suf.OPLOG().getText(), esquerda, direita)
+            suf = suf.logica_suf()
+        return esquerda
+
+    def _logical(self, op, esquerda, direita):
+        if esquerda[2] is not None:
+            #Constante à esquerda decide o curto-circuito já na tradução
+            if bool(esquerda[2]) == (op == "||"):
+                return self._constant(int(op == "||"))
+            if direita[2] is not None:
+                return self._constant(int(bool(direita[2])))
+            return (self._as_bool(direita), "inteiro", None, "bool", 0)
+        return (f"({self._as_bool(esquerda)} {LOGICAS[op]} {self._as_bool(direita)})", "inteiro", None, "bool", 0)
+
+    def _as_bool(self, expr):
+        if expr[2] is not None:
+            return repr(bool(expr[2]))
+        return expr[0] if expr[3] == "bool" else f"bool({self._strip(self._code(expr))})"
+
+    def _comparison(self, ctx):
+        esquerda = self._sum(ctx.soma())
+        suf = ctx.comparacao_suf()
+        if not suf.OPCOMP():
+            return esquerda
+        op = suf.OPCOMP().getText()
+        direita = self._sum(suf.soma())
+        self._check_not_string(esquerda, suf)
+        self._check_not_string(direita, suf)
+        if esquerda[2] is not None and direita[2] is not None:
+            return self._constant(int(COMPARACOES[op](esquerda[2], direita[2])))
+        return (f"({self._code(esquerda)} {op} {self._code(direita)})", "inteiro", None, "bool", 0)
+
+    def _sum(self, ctx):
+        esquerda = self._term(ctx.termo())
+        suf = ctx.soma_suf()
+        while suf.OPSUM():
+            esquerda = self._arithmetic(suf.OPSUM().getText(), esquerda, self._term(suf.termo()), suf)
+            suf = suf.soma_suf()
+        return esquerda
+
+    def _term(self, ctx):
+        esquerda = self._factor(ctx.fator())
+        suf = ctx.termo_suf()
+        while suf.OPMULT():
+            esquerda = self._arithmetic(suf.OPMULT().getText(), esquerda, self._factor(suf.fator()), suf)
+            suf = suf.termo_suf()
+        return esquerda
+
+    def _factor(self, ctx):
+        if ctx.INT():
+            return self._constant(int32(int(ctx.INT().getText())))
+        if ctx.STRING():
+            return ("", "string", decodificar_string(ctx.STRING().getText()), "", 0)
+        if ctx.ID():
+            nome, tipo = self._variable(ctx)
+            return (nome, tipo, None, "", 0)
+        if ctx.expressao():
+            return self._expression(ctx.expressao())
+        operando = self._factor(ctx.fator())
+        self._check_not_string(operando, ctx)
+        if operando[2] is not None:
+            return self._constant(int(not operando[2]))
+        return (f"(not {self._code(operando)})", "inteiro", None, "bool", 0)
+
+    def _constant(self, valor):
+        return (f"({valor})" if valor < 0 else str(valor), "inteiro", valor, "", 0)
+
+    def _arithmetic(self, op, esquerda, direita, ctx):
+        self._check_not_string(esquerda, ctx)
+        self._check_not_string(direita, ctx)
+        c = direita[2]
+        if "real" in (esquerda[1], direita[1]):
+            a, b = self._code(esquerda), self._code(direita)
+            if op != "/":
+                return (f"({a} {op} {b})", "real", None, "", 0)
+            if c is not None and c != 0:
+                return (f"({a} / {float(c)!r})", "real", None, "", 0)
+            return (f"_divr({self._strip(a)}, {self._strip(b)})", "real", None, "", 0)
+        if esquerda[2] is not None and c is not None:
+            try:
+                return self._constant(ARITMETICA_INT[op](esquerda[2], c))
+            except InterpreterError:
+                pass    # divisão por zero fica para dar erro se for executada
+        if op == "/":
+            return self._division(esquerda, direita)
+        (base_a, k_a), (base_b, k_b) = self._parts(esquerda), self._parts(direita)
+        if op == "*":
+            #Com um lado constante, a constante multiplica também o deslocamento do outro
+            if base_a is None or base_b is None:
+                base, k = (base_b, k_a) if base_a is None else (base_a, k_b)
+                deslocamento = k_b if base_a is None else k_a
+                return (f"({base} * {k})", "inteiro", None, "bruto", deslocamento * k)
+            return (f"({self._raw(esquerda)} * {self._raw(direita)})", "inteiro", None, "bruto", 0)
+        if op == "+":
+            base = base_a if base_b is None else base_b if base_a is None else f"({base_a} + {base_b})"
+            return (base, "inteiro", None, "bruto", k_a + k_b)
+        base = base_a if base_b is None else f"(-{base_b})" if base_a is None else f"({base_a} - {base_b})"
+        return (base, "inteiro", None, "bruto", k_a - k_b)
+
+    #Divisão truncada: por constante positiva sobre uma variável, inline com //; senão, _div
+    def _division(self, esquerda, direita):
+        a, b = self._code(esquerda), self._code(direita)
+        c = direita[2]
+        if c == 1:
+            return (a, "inteiro", None, "", 0)
+        if c is not None and c > 0 and a.isidentifier():
+            return (f"({a} // {c} if {a} >= 0 else -(-{a} // {c}))", "inteiro", None, "", 0)
+        return (f"_div({self._strip(a)}, {self._strip(b)})", "inteiro", None, "", 0)
+
+    def _check_not_string(self, expr, ctx):
+        if expr[1] == "string":
+            raise InterpreterError(f"string usada numa operação (linha {ctx.start.line})")
+
+
+#Cache dos code objects: um arquivo por hash do fonte .arara, com o marshal do code object
+
+def chave(fonte):
+    h = hashlib.sha256(_VERSAO)
+    h.update(fonte.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _caminho_cache(fonte, pasta_cache):
+    return os.path.join(pasta_cache, f"py-{chave(fonte)}.marshal")
+
+
+def carregar_do_cache(fonte, pasta_cache):
+    if pasta_cache is None:
+        return None
+    try:
+        with open(_caminho_cache(fonte, pasta_cache), "rb") as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+#Gravado com nome temporário e renomeado no fim, como os objetos do --build
+def gravar_no_cache(fonte, codigo, pasta_cache):
+    if pasta_cache is None:
+        return
+    caminho = _caminho_cache(fonte, pasta_cache)
+    os.makedirs(pasta_cache, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        marshal.dump(codigo, f)
+    os.replace(temporario, caminho)
+
+
+def executar_codigo(codigo, io=None):
+    io = io if io is not None else ProgramIO()
+    ambiente = dict(AMBIENTE)
+    exec(codigo, ambiente)
+    try:
+        ambiente[NOME_FUNCAO](io)
+    finally:
+        io.flush()
@@ -0,0 +1,359 @@
+# Arquivo: src/interpreter/vm.py
+
+from array import array
+
+from src.tac.TACGenerator import TACInstruction
+from src.tac.cfg import ControlFlowGraph, PURE_OPCODES, instr_def, instr_uses, operand_types, real_names
+from src.interpreter.runtime import (ProgramIO, DESLOCAMENTO as D, MASCARA as M, divisao_inteira, divisao_real,
+                                     para_inteiro, texto_real, decodificar_string, int32)
+
+# Máquina virtual de registradores que executa o TAC sem ferramentas nativas. O TAC é
+# traduzido para bytecode: cada instrução tem um opcode inteiro e três operandos, que são
+# índices num vetor único de registradores (variáveis, temporárias e constantes, já
+# carregadas no vetor inicial) ou o destino de um salto, já resolvido para a posição
+# absoluta da instrução. A escolha entre inteiro e real é feita na tradução, como nos
+# geradores de código (operand_types), então o laço de despacho não testa tipos.
+
+#Opcodes, em grupos contíguos para o despacho testar primeiro o grupo e depois o opcode
+JUMP_LT, JUMP_LE, JUMP_GT, JUMP_GE, JUMP_EQ, JUMP_NE, JUMP_FALSE, JUMP_TRUE, JUMP = range(9)
+ADD_I, SUB_I, MUL_I, DIV_I, ADD_R, SUB_R, MUL_R, DIV_R = range(9, 17)
+MOVE, LT, LE, GT, GE, EQ, NE, AND, OR, NOT, TO_INT, TO_REAL = range(17, 29)
+WRITE_I, WRITE_R, WRITE_STR, WRITE_REPEAT, READ_I, READ_R, HALT = range(29, 36)
+#Fim dos grupos: desvios, aritmética e cópias/comparações
+FIM_DESVIOS = 9
+FIM_ARITMETICA = 17
+FIM_VALORES = 29
+
+OPCODE_NAMES = ["JUMP_LT", "JUMP_LE", "JUMP_GT", "JUMP_GE", "JUMP_EQ", "JUMP_NE", "JUMP_FALSE", "JUMP_TRUE", "JUMP",
+                "ADD_I", "SUB_I", "MUL_I", "DIV_I", "ADD_R", "SUB_R", "MUL_R", "DIV_R",
+                "MOVE", "LT", "LE", "GT", "GE", "EQ", "NE", "AND", "OR", "NOT", "TO_INT", "TO_REAL",
+                "WRITE_I", "WRITE_R", "WRITE_STR", "WRITE_REPEAT", "READ_I", "READ_R", "HALT"]
+
+ARITHMETIC = {"ADD": (ADD_I, ADD_R), "SUB": (SUB_I, SUB_R), "MUL": (MUL_I, MUL_R), "DIV": (DIV_I, DIV_R)}
+COMPARISONS = {"LT": LT, "LE": LE, "GT": GT, "GE": GE, "EQ": EQ, "NEQ": NE, "AND": AND, "OR": OR}
+#Desvio com a condição oposta; a troca de '<' por '>=' (e afins) só vale para inteiros, por causa do nan
+INVERSE_JUMP = {JUMP_LT: JUMP_GE, JUMP_GE: JUMP_LT, JUMP_LE: JUMP_GT, JUMP_GT: JUMP_LE, JUMP_EQ: JUMP_NE,
+                JUMP_NE: JUMP_EQ, JUMP_FALSE: JUMP_TRUE, JUMP_TRUE: JUMP_FALSE}
+JUMPS = {"IF_LT": JUMP_LT, "IF_LE": JUMP_LE, "IF_GT": JUMP_GT, "IF_GE": JUMP_GE, "IF_EQ": JUMP_EQ,
+         "IF_NE": JUMP_NE, "IF_FALSE_GOTO": JUMP_FALSE, "IF_TRUE_GOTO": JUMP_TRUE, "GOTO": JUMP}
+
+#Campos de cada instrução do bytecode
+LARGURA = 4
+
+
+class Bytecode:
+
+    def __init__(self, code, registers, strings, names, origins=None):
+        self.code = code
+        self.registers = registers
+        self.strings = strings
+        self.names = names
+        #Índice no TAC da instrução que gerou cada instrução do bytecode (só na tradução para perfil)
+        self.origins = origins
+
+    def __len__(self):
+        return len(self.code) // LARGURA
+
+    #Instruções como tuplas (opcode, a, b, c), a forma que o laço de despacho percorre
+    def instructions(self):
+        campos = iter(self.code)
+        return list(zip(campos, campos, campos, campos))
+
+    #Listagem legível do bytecode, uma instrução por linha
+    def disassemble(self):
+        linhas = []
+        for pos, (op, a, b, c) in enumerate(self.instructions()):
+            if op < JUMP_FALSE:
+                operandos = [self.names[b], self.names[c], f"-> {a}"]
+            elif op < FIM_DESVIOS:
+                operandos = ([self.names[b]] if op != JUMP else []) + [f"-> {a}"]
+            elif op == WRITE_STR:
+                operandos = [repr(self.strings[a])]
+            elif op == WRITE_REPEAT:
+                operandos = [repr(self.strings[a]), self.names[b]]
+            elif op == HALT:
+                operandos = []
+            elif op >= WRITE_I:
+                operandos = [self.names[a]]
+            elif op in (MOVE, NOT, TO_INT, TO_REAL):
+                operandos = [self.names[a], self.names[b]]
+            else:
+                operandos = [self.names[a], self.names[b], self.names[c]]
+            linhas.append(f"{pos:>5}  {OPCODE_NAMES[op]:<12} {', '.join(operandos)}")
+        return "\n".join(linhas)
+
+
+class BytecodeCompiler:
+
+    def __init__(self, semantic_table={}):
+        self.semantic_table = semantic_table
+        self.slots = {}
+        self.registers = []
+        self.names = []
+        self.strings = []
+        self.string_index = {}
+
+    #Com profiling, cada instrução do TAC vira a sua (sem juntar cópias nem girar laços) e o
+    #bytecode guarda de que instrução do TAC veio cada uma
+    def compile(self, tac_instructions, profiling=False):
+        tac_instructions = list(tac_instructions) if profiling else self._fold_moves(list(tac_instructions))
+        self.slots, self.registers, self.names = {}, [], []
+        self.strings, self.string_index = [], {}
+        real = real_names(tac_instructions, self.semantic_table)
+        #Variáveis primeiro, zeradas (0 ou 0.0), como nos executáveis gerados
+        for nome in self.semantic_table:
+            self._register(("ID", nome, nome in real), 0.0 if nome in real else 0, nome)
+        tipos = {(id(instr), slot): is_real for instr, slot, is_real in operand_types(tac_instructions,
+                                                                                         self.semantic_table)}
+        #Os desvios saem com o nome do label e são resolvidos para posições no fim
+        instrucoes = []
+        origens = []
+        labels = {}
+        for indice, instr in enumerate(tac_instructions):
+            if instr.opcode == "LABEL":
+                labels[instr.result.value] = len(instrucoes)
+            else:
+                instrucoes.extend(self._instruction(instr, tipos, real))
+                origens.extend([indice] * (len(instrucoes) - len(origens)))
+        instrucoes.append((HALT, 0, 0, 0))
+        origens.append(None)
+        instrucoes = [(op, labels[a], b, c) if op < FIM_DESVIOS else (op, a, b, c) for op, a, b, c in instrucoes]
+        if not profiling:
+            self._rotate_loops(instrucoes)
+        code = array("i")
+        for instrucao in instrucoes:
+            code.extend(instrucao)
+        return Bytecode(code, list(self.registers), self.strings, self.names, origens if profiling else None)
+
+    #'_t = a op b' seguido de 'x = _t', com _t morta depois da cópia, vira 'x = a op b': o
+    #TAC sai assim do gerador (e dos passes), e na VM cada instrução a menos é um despacho a menos
+    def _fold_moves(self, tac_instructions):
+        temps = {instr.result.value for instr in tac_instructions
+                 if instr_def(instr) is not None and instr.result.is_temp()}
+        cfg = ControlFlowGraph(tac_instructions)
+        _, live_out = cfg.liveness(temps)
+        resultado = []
+        for block in cfg.blocks:
+            instrucoes = block.instructions
+            vivas = set(live_out[block.index])
+            dobradas = []
+            k = len(instrucoes) - 1
+            while k >= 0:
+                instr = instrucoes[k]
+                anterior = instrucoes[k - 1] if k else None
+                if (instr.opcode == "ASSIGN" and instr.result.is_id() and instr.arg1.is_temp()
+                        and instr.arg1.value not in vivas and anterior is not None
+                        and anterior.opcode in PURE_OPCODES and anterior.result.is_temp()
+                        and anterior.result.value == instr.arg1.value):
+                    dobradas.append(TACInstruction(anterior.opcode, instr.result, anterior.arg1, anterior.arg2))
+                    vivas.discard(instr.result.value)
+                    vivas.update(name for name in instr_uses(anterior) if name in temps)
+                    k -= 2
+                    continue
+                dobradas.append(instr)
+                vivas.discard(instr_def(instr))
+                vivas.update(name for name in instr_uses(instr) if name in temps)
+                k -= 1
+            resultado.extend(reversed(dobradas))
+        return resultado
+
+    #Um 'JUMP' para o teste do laço, que sai do laço para a instrução logo depois do próprio
+    #JUMP, vira o teste invertido voltando para o corpo: um despacho a menos por volta
+    def _rotate_loops(self, instrucoes):
+        for pos, (op, destino, _, _) in enumerate(instrucoes):
+            if op != JUMP:
+                continue
+            teste, saida, b, c = instrucoes[destino]
+            if teste not in INVERSE_JUMP or saida != pos + 1:
+                continue
+            if teste < JUMP_FALSE and (isinstance(self.registers[b], float) or isinstance(self.registers[c], float)):
+                continue
+            instrucoes[pos] = (INVERSE_JUMP[teste], destino + 1, b, c)
+
+    def _register(self, chave, inicial, nome):
+        slot = self.slots.get(chave)
+        if slot is None:
+            slot = self.slots[chave] = len(self.registers)
+            self.registers.append(inicial)
+            self.names.append(nome)
+        return slot
+
+    #Registrador do operando; uma temporária reaproveitada para inteiro e real tem um registrador
+    #para cada tipo, como as duas locais do gerador de C. Constantes ganham registradores próprios,
+    #já reduzidas a 32 bits como nos outros backends (também quando usadas como real).
+    def _operand(self, instr, slot, tipos, real):
+        op = getattr(instr, slot)
+        if op.is_literal():
+            valor = int32(op.value)
+            return self._register(("LITERAL", valor, False), valor, str(valor))
+        if op.is_id():
+            is_real = op.value in real
+            return self._register(("ID", op.value, is_real), 0.0 if is_real else 0, op.value)
+        is_real = tipos[(id(instr), slot)]
+        return self._register(("TEMP", op.value, is_real), 0.0 if is_real else 0, op.value)
+
+    def _string(self, texto):
+        if texto not in self.string_index:
+            self.string_index[texto] = len(self.strings)
+            self.strings.append(texto)
+        return self.string_index[texto]
+
+    def _is_real(self, instr, slot, tipos, real):
+        op = getattr(instr, slot)
+        if op.is_id():
+            return op.value in real
+        return op.is_temp() and tipos[(id(instr), slot)]
+
+    def _instruction(self, instr, tipos, real):
+        opcode = instr.opcode
+        if opcode in JUMPS:
+            if opcode == "GOTO":
+                return [(JUMP, instr.result.value, 0, 0)]
+            a = self._operand(instr, "arg1", tipos, real)
+            b = self._operand(instr, "arg2", tipos, real) if instr.arg2 is not None else 0
+            return [(JUMPS[opcode], instr.result.value, a, b)]
+        if opcode == "WRITE":
+            op = instr.result
+            if op.is_literal():
+                texto = decodificar_string(op.value) if isinstance(op.value, str) else f"{int32(op.value)} "
+                return [(WRITE_STR, self._string(texto), 0, 0)]
+            a = self._operand(instr, "result", tipos, real)
+            return [(WRITE_R if tipos[(id(instr), "result")] else WRITE_I, a, 0, 0)]
+        if opcode == "WRITE_REPEAT":
+            texto = self._string(decodificar_string(instr.result.value))
+            return [(WRITE_REPEAT, texto, self._operand(instr, "arg1", tipos, real), 0)]
+        if opcode == "READ":
+            destino = self._operand(instr, "result", tipos, real)
+            return [(READ_R if instr.result.value in real else READ_I, destino, 0, 0)]
+
+        destino = self._operand(instr, "result", tipos, real)
+        destino_real = self._is_real(instr, "result", tipos, real)
+        a = self._operand(instr, "arg1", tipos, real)
+        if opcode == "ASSIGN":
+            origem_real = self._is_real(instr, "arg1", tipos, real)
+            if destino_real != origem_real:
+                return [(TO_REAL if destino_real else TO_INT, destino, a, 0)]
+            return [(MOVE, destino, a, 0)]
+        if opcode == "NOT":
+            op, calcula_real = NOT, False
+            b = 0
+        else:
+            b = self._operand(instr, "arg2", tipos, real)
+            if opcode in ARITHMETIC:
+                calcula_real = self._is_real(instr, "arg1", tipos, real) or self._is_real(instr, "arg2", tipos, real)
+                op = ARITHMETIC[opcode][calcula_real]
+            else:
+                op, calcula_real = COMPARISONS[opcode], False
+        if calcula_real == destino_real:
+            return [(op, destino, a, b)]
+        #Resultado gravado direto numa variável de outro tipo (depois dos passes): calcula num
+        #registrador auxiliar e converte
+        auxiliar = self._register(("AUX", calcula_real, None), 0.0 if calcula_real else 0, "aux")
+        return [(op, auxiliar, a, b), (TO_REAL if destino_real else TO_INT, destino, auxiliar, 0)]
+
+
+class VM:
+
+    def __init__(self, io=None):
+        self.io = io if io is not None else ProgramIO()
+
+    def run(self, bytecode):
+        try:
+            self._execute(bytecode.instructions(), list(bytecode.registers), bytecode.strings)
+        finally:
+            self.io.flush()
+
+    #Laço de despacho: o opcode escolhe primeiro o grupo (desvios, aritmética, valores, E/S),
+    #com os opcodes mais frequentes dos laços no começo de cada grupo
+    def _execute(self, code, r, strings):
+        write = self.io.write
+        read_int = self.io.read_int
+        read_real = self.io.read_real
+        pc = 0
+        while True:
+            op, a, b, c = code[pc]
+            pc += 1
+            if op < FIM_DESVIOS:
+                if op == JUMP_LT:
+                    if r[b] < r[c]:
+                        pc = a
+                elif op == JUMP_LE:
+                    if r[b] <= r[c]:
+                        pc = a
+                elif op == JUMP_GT:
+                    if r[b] > r[c]:
+                        pc = a
+                elif op == JUMP_GE:
+                    if r[b] >= r[c]:
+                        pc = a
+                elif op == JUMP_EQ:
+                    if r[b] == r[c]:
+                        pc = a
+                elif op == JUMP_NE:
+                    if r[b] != r[c]:
+                        pc = a
+                elif op == JUMP_FALSE:
+                    if not r[b]:
+                        pc = a
+                elif op == JUMP_TRUE:
+                    if r[b]:
+                        pc = a
+                else:
+                    pc = a
+            elif op < FIM_ARITMETICA:
+                if op == ADD_I:
+                    r[a] = ((r[b] + r[c] + D) & M) - D
+                elif op == SUB_I:
+                    r[a] = ((r[b] - r[c] + D) & M) - D
+                elif op == MUL_I:
+                    r[a] = ((r[b] * r[c] + D) & M) - D
+                elif op == DIV_I:
+                    r[a] = divisao_inteira(r[b], r[c])
+                elif op == ADD_R:
+                    r[a] = r[b] + r[c]
+                elif op == SUB_R:
+                    r[a] = r[b] - r[c]
+                elif op == MUL_R:
+                    r[a] = r[b] * r[c]
+                else:
+                    r[a] = divisao_real(r[b], r[c])
+            elif op < FIM_VALORES:
+                if op == MOVE:
+                    r[a] = r[b]
+                elif op == LT:
+                    r[a] = int(r[b] < r[c])
+                elif op == LE:
+                    r[a] = int(r[b] <= r[c])
+                elif op == GT:
+                    r[a] = int(r[b] > r[c])
+                elif op == GE:
+                    r[a] = int(r[b] >= r[c])
+                elif op == EQ:
+                    r[a] = int(r[b] == r[c])
+                elif op == NE:
+                    r[a] = int(r[b] != r[c])
+                elif op == AND:
+                    r[a] = int(bool(r[b]) and bool(r[c]))
+                elif op == OR:
+                    r[a] = int(bool(r[b]) or bool(r[c]))
+                elif op == NOT:
+                    r[a] = int(not r[b])
+                elif op == TO_INT:
+                    r[a] = para_inteiro(r[b])
+                else:
+                    r[a] = float(r[b])
+            elif op == WRITE_I:
+                write("%d " % r[a])
+            elif op == WRITE_STR:
+                write(strings[a])
+            elif op == WRITE_R:
+                write(texto_real(r[a]))
+            elif op == WRITE_REPEAT:
+                if r[b] > 0:
+                    write(strings[a] * r[b])
+            elif op == READ_I:
+                r[a] = read_int(r[a])
+            elif op == READ_R:
+                r[a] = read_real(r[a])
+            else:
+                return
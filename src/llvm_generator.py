@@ -1,22 +1,157 @@
 # Arquivo: src/llvm_generator.py
 
+import io
 import json
+import struct
+from collections import Counter
 from src.tac.TACGenerator import TACOperand, TACInstruction 
+from src.tac.cfg import ControlFlowGraph, instr_def, instr_uses, real_names, COMPARE_BRANCH, JUMP_OPCODES
+from src.tac.write_coalescing import SWAPPED, NEGATED
+
+#Linhas acumuladas antes de escrever no destino, mesmo no meio de um bloco longo
+FLUSH_LINES = 512
+
+#Programas com mais instruções TAC que isto são divididos em funções internas de ao menos
+#OUTLINE_SIZE instruções: os passes do LLVM crescem mais que linearmente com o tamanho da função
+OUTLINE_THRESHOLD = 2000
+OUTLINE_SIZE = 1000
+
+INT32_MIN = -2 ** 31
+
+LLVM_OPS = {"ADD": "add",
+            "SUB": "sub",
+            "MUL": "mul",
+            "DIV": "sdiv",
+            "EQ": "icmp eq",
+            "NEQ": "icmp ne",
+            "LT": "icmp slt",
+            "LE": "icmp sle",
+            "GT": "icmp sgt",
+            "GE": "icmp sge",
+            "AND": "and",
+            "OR": "or"}
+
+#Operações com algum operando real: em double, que no x86-64 vira instruções escalares SSE2.
+#Comparações ordenadas (falsas com NaN), menos '!=' (verdadeira com NaN, como em C)
+FLOAT_OPS = {"ADD": "fadd",
+             "SUB": "fsub",
+             "MUL": "fmul",
+             "DIV": "fdiv",
+             "EQ": "fcmp oeq",
+             "NEQ": "fcmp une",
+             "LT": "fcmp olt",
+             "LE": "fcmp ole",
+             "GT": "fcmp ogt",
+             "GE": "fcmp oge"}
+
+#Alinhamento das variáveis em memória por tipo LLVM (4 bytes se não estiver aqui)
+ALIGN = {"double": 8}
+
+#Valor inicial das variáveis, no quadro global (programas divididos em funções) ou na entrada do main
+ZERO = {"i32": "0", "double": "0.0", "i1": "false"}
+
+#Entradas da biblioteca de runtime (src/runtime/arara_runtime.c), com saída e entrada em buffer.
+#Nenhuma lança exceção (#1 = nounwind). Só os textos constantes são marcados como sempre definidos
+#(noundef); a leitura sem número devolve o valor atual
+RUNTIME_DECLARATIONS = ['declare void @arara_write_str(i8* noundef, i32 noundef) #1',
+                        'declare void @arara_write_int(i32) #1',
+                        'declare void @arara_write_repeat(i8* noundef, i32 noundef, i32) #1',
+                        'declare i32 @arara_read_int(i32) #1',
+                        'declare void @arara_write_real(double) #1',
+                        'declare double @arara_read_real(double) #1',
+                        'declare void @arara_flush() #1']
+
+#main não lança exceção nem chama a si mesma; as funções declaradas (runtime, printf, scanf) não lançam.
+#Os trechos de um programa dividido (#2) não podem ser embutidos de volta no main.
+#Sem 'mustprogress' (nem metadado '!llvm.loop' com ele): um laço infinito sem efeitos é um programa válido em Arara
+FUNCTION_ATTRIBUTES = ['attributes #0 = { nounwind norecurse }',
+                       'attributes #1 = { nounwind }',
+                       'attributes #2 = { noinline nounwind norecurse }']
+
+#Sem a runtime, a escrita repetida (WRITE_REPEAT) copia o texto várias vezes num buffer de 4 KiB e escreve
+#o buffer inteiro de uma vez, em vez de um printf por repetição
+REPEAT_WRITE_FUNCTION = """@.fmt.repetido = private unnamed_addr constant [5 x i8] c"%.*s\\00", align 1
+
+define internal void @arara_escreva_repetido(i8* %s, i32 %len, i32 %n) #1 {
+entry:
+  %buf = alloca [4096 x i8], align 16
+  %base = getelementptr inbounds [4096 x i8], [4096 x i8]* %buf, i64 0, i64 0
+  %fmt = getelementptr inbounds [5 x i8], [5 x i8]* @.fmt.repetido, i64 0, i64 0
+  %sem_vezes = icmp sle i32 %n, 0
+  %sem_texto = icmp sle i32 %len, 0
+  %nada = or i1 %sem_vezes, %sem_texto
+  br i1 %nada, label %fim, label %tamanho
+tamanho:
+  %grande = icmp sgt i32 %len, 4096
+  br i1 %grande, label %direto, label %preenche
+preenche:
+  %cabem = sdiv i32 4096, %len
+  %menor = icmp slt i32 %n, %cabem
+  %k = select i1 %menor, i32 %n, i32 %cabem
+  %len64 = sext i32 %len to i64
+  br label %copia
+copia:
+  %c = phi i32 [ 0, %preenche ], [ %c.prox, %copia ]
+  %off = mul i32 %c, %len
+  %off64 = sext i32 %off to i64
+  %dst = getelementptr inbounds i8, i8* %base, i64 %off64
+  %r0 = call i8* @memcpy(i8* %dst, i8* %s, i64 %len64)
+  %c.prox = add i32 %c, 1
+  %mais = icmp slt i32 %c.prox, %k
+  br i1 %mais, label %copia, label %escreve
+escreve:
+  %resta = phi i32 [ %n, %copia ], [ %resta.prox, %escreve ]
+  %pouco = icmp slt i32 %resta, %k
+  %vez = select i1 %pouco, i32 %resta, i32 %k
+  %bytes = mul i32 %vez, %len
+  %r1 = call i32 (i8*, ...) @printf(i8* %fmt, i32 %bytes, i8* %base)
+  %resta.prox = sub i32 %resta, %vez
+  %ainda = icmp sgt i32 %resta.prox, 0
+  br i1 %ainda, label %escreve, label %fim
+direto:
+  %d = phi i32 [ 0, %tamanho ], [ %d.prox, %direto ]
+  %r2 = call i32 (i8*, ...) @printf(i8* %fmt, i32 %len, i8* %s)
+  %d.prox = add i32 %d, 1
+  %mais.d = icmp slt i32 %d.prox, %n
+  br i1 %mais.d, label %direto, label %fim
+fim:
+  ret void
+}
+"""
 
 
 class LLVMGenerator:
-    def __init__(self, semantic_table={}): 
+    def __init__(self, semantic_table={}, cache_values=True, runtime=True, outline_threshold=OUTLINE_THRESHOLD,
+                 outline_size=OUTLINE_SIZE):
         self.module_header_lines = ['; ModuleID = "arara_program"',
                                      'source_filename = "arara.arara"',
                                      'target datalayout = "e-m:e-p270:32:32-p271:32:32-p272:64:64-i64:64-f80:128-n8:16:32:64-S128"',
                                      'target triple = "x86_64-pc-linux-gnu"']
         self.global_strings_defs = []
-        self.function_declarations = ['declare i32 @printf(i8*, ...)', 'declare i32 @scanf(i8*, ...)']
+        if runtime:
+            self.function_declarations = list(RUNTIME_DECLARATIONS)
+        else:
+            self.function_declarations = ['declare i32 @printf(i8* noundef, ...) #1', 'declare i32 @scanf(i8* noundef, ...) #1']
         self.function_body = []
         self.string_literals = {}
         self.temp_map = {}
+        self.temp_defs = {}
         self.var_map = {}
+        self.real = set()
         self.semantic_table = semantic_table
+        self.cache_values = cache_values
+        self.runtime = runtime
+        self.outline_threshold = outline_threshold
+        self.outline_size = outline_size
+        #Valores das variáveis conhecidos no bloco atual, variáveis ainda não gravadas na
+        #memória e, por bloco já emitido, os valores na saída e os blocos que saltam para ele
+        self.values = {}
+        self.dirty = {}
+        self.exit_values = {}
+        self.incoming = {}
+        self.current_block = None
+        #Somas/subtrações sem transbordo (nsw)
+        self.no_wrap = set()
         self.temp_count = 0
         self.string_count = 0
         self.label_count = 0
@@ -46,6 +181,26 @@ class LLVMGenerator:
             self.string_literals[s_content] = (name, array_type)
         return self.string_literals[s_content]
 
+    #Ponteiro para o início da string global, como expressão constante (sem getelementptr no corpo)
+    def _string_pointer(self, s_content):
+        name, array_type = self._add_string_literal(s_content)
+        return f'getelementptr inbounds ({array_type}, {array_type}* {name}, i64 0, i64 0)'
+
+    #Constante double em hexadecimal, a forma que o LLVM aceita para qualquer valor
+    def _double_constant(self, value):
+        return "0x" + struct.pack(">d", float(value)).hex().upper()
+
+    #Tipo LLVM de uma variável ou temporária em memória
+    def _llvm_type(self, name):
+        arara_type = self.semantic_table.get(name)
+        if name in self.real or arara_type == "real":
+            return "double"
+        return "i32" if arara_type in (None, "inteiro") else "i1"
+
+    #Texto de um literal de string do TAC
+    def _literal_text(self, tac_operand):
+        return tac_operand.value[1:-1].encode('latin1').decode('unicode_escape')
+
     def _get_llvm_operand_value(self, tac_operand: 'TACOperand', target_llvm_type=None):
         val_type, val = tac_operand.type, tac_operand.value
         
@@ -58,118 +213,485 @@ class LLVMGenerator:
                 self.function_body.append(f'    {ptr_reg} = getelementptr inbounds {array_type}, {array_type}* {name}, i64 0, i64 0')
                 return ptr_reg
             else:
+                #Literais inteiros valem o que valem em 32 bits, também num contexto real
+                val = (int(val) - INT32_MIN) % 2 ** 32 + INT32_MIN
                 if target_llvm_type == "i1":
-                    return "true" if int(val) != 0 else "false"
+                    return "true" if val != 0 else "false"
+                if target_llvm_type == "double":
+                    return self._double_constant(val)
                 return str(val)
         
-        elif val_type == 'ID':
-            ptr_reg, llvm_type = self.var_map[val]
-            load_reg = self.next_llvm_reg()
-            self.function_body.append(f'    {load_reg} = load {llvm_type}, {llvm_type}* {ptr_reg}, align 4')
-            return load_reg
+        elif val_type == 'ID' or val in self.var_map:
+            value, llvm_type = self._load_var(val)
+            return self._convert(value, llvm_type, target_llvm_type)
             
         elif val_type == 'TEMP':
-            return f'%{val}'
+            reg, llvm_type = self.temp_map.get(val, (f'%{val}', target_llvm_type))
+            return self._convert(reg, llvm_type, target_llvm_type)
             
         return "ERROR_OPERAND"
 
-    #bloco principal, responsavel por executar a tradução feita (clang)
-    def generate(self, tac_instructions: list['TACInstruction']):
-        self.__init__(self.semantic_table)
+    #Valor atual da variável: reaproveitado se já foi lido ou gravado neste bloco
+    def _load_var(self, name):
+        if name in self.values:
+            return self.values[name]
+        ptr_reg, llvm_type = self.var_map[name]
+        load_reg = self.next_llvm_reg()
+        self.function_body.append(f'    {load_reg} = load {llvm_type}, {llvm_type}* {ptr_reg}, align {ALIGN.get(llvm_type, 4)}')
+        if self.cache_values:
+            self.values[name] = (load_reg, llvm_type)
+        return load_reg, llvm_type
 
-        self._add_string_literal("%d")
-        self._add_string_literal("%d ")
+    #Grava na variável; com o cache, o store só sai no fim do bloco (e só o último de cada variável)
+    def _store_var(self, name, value):
+        ptr_reg, llvm_type = self.var_map[name]
+        if self.cache_values:
+            self.values[name] = (value, llvm_type)
+            self.dirty[name] = True
+        else:
+            self.function_body.append(f'    store {llvm_type} {value}, {llvm_type}* {ptr_reg}, align {ALIGN.get(llvm_type, 4)}')
 
-        entry_block = ['entry:']
-        variables_to_allocate = sorted(list({arg.value for instr in tac_instructions for arg in [instr.result, instr.arg1, instr.arg2] if arg and arg.type == 'ID'}))
-        
-        for var_name in variables_to_allocate:
-            arara_type = self.semantic_table.get(var_name, "inteiro")
-            llvm_type = "i32" if arara_type == "inteiro" else "i1"
-            ptr_reg = f'%{var_name}_ptr'
-            entry_block.append(f'    {ptr_reg} = alloca {llvm_type}, align 4')
-            self.var_map[var_name] = (ptr_reg, llvm_type)
+    #Fecha o bloco atual antes do salto: grava as variáveis pendentes e registra os valores
+    #na saída para os blocos de destino. No 'ret' final os stores pendentes são dispensáveis.
+    def _end_block(self, targets, store=True):
+        for name in self.dirty if store else []:
+            ptr_reg, llvm_type = self.var_map[name]
+            value, _ = self.values[name]
+            self.function_body.append(f'    store {llvm_type} {value}, {llvm_type}* {ptr_reg}, align {ALIGN.get(llvm_type, 4)}')
+        self.dirty = {}
+        if self.cache_values and targets:
+            self.exit_values[self.current_block] = self.values
+            for target in targets:
+                self.incoming.setdefault(target, []).append(self.current_block)
+        self.values = {}
 
-        first_code_label = "start_code" 
-        if not tac_instructions or tac_instructions[0].opcode != "LABEL":
-             tac_instructions.insert(0, TACInstruction("LABEL", TACOperand("LABEL", first_code_label)))
+    #Abre um bloco. Se todos os predecessores já foram emitidos (não há laço voltando para ele),
+    #os valores que eles deixaram continuam valendo: iguais são herdados e diferentes viram phi.
+    def _begin_block(self, label, tac_block):
+        self.function_body.append(f'{label}:')
+        self.current_block = label
+        preds = self.incoming.get(label, [])
+        if tac_block is None or not preds or len(set(preds)) != len(self.cfg.blocks[tac_block].preds):
+            return
+        exits = [self.exit_values[p] for p in preds]
+        for name in sorted(self.live_in[tac_block]):
+            incoming = [values.get(name) for values in exits]
+            if None in incoming:
+                continue
+            if len(set(incoming)) == 1:
+                self.values[name] = incoming[0]
+                continue
+            llvm_type = self.var_map[name][1]
+            reg = self.next_llvm_reg()
+            pairs = ", ".join(f"[ {value}, %{pred} ]" for (value, _), pred in zip(incoming, preds))
+            self.function_body.append(f'    {reg} = phi {llvm_type} {pairs}')
+            self.values[name] = (reg, llvm_type)
+
+    #Converte entre booleano (i1), inteiro (i32) e real (double) quando o uso pede outro tipo;
+    #real para inteiro trunca em direção a zero, como em C
+    def _convert(self, value, from_type, to_type):
+        if to_type is None or from_type == to_type:
+            return value
+        reg = self.next_llvm_reg()
+        if from_type == "i1" and to_type == "i32":
+            self.function_body.append(f'    {reg} = zext i1 {value} to i32')
+        elif from_type == "i32" and to_type == "i1":
+            self.function_body.append(f'    {reg} = icmp ne i32 {value}, 0')
+        elif from_type == "i1" and to_type == "double":
+            self.function_body.append(f'    {reg} = uitofp i1 {value} to double')
+        elif from_type == "i32" and to_type == "double":
+            self.function_body.append(f'    {reg} = sitofp i32 {value} to double')
+        elif from_type == "double" and to_type == "i32":
+            self.function_body.append(f'    {reg} = fptosi double {value} to i32')
+        elif from_type == "double" and to_type == "i1":
+            self.function_body.append(f'    {reg} = fcmp une double {value}, 0.0')
         else:
-             first_code_label = tac_instructions[0].result.value
-             
-        entry_block.append(f'    br label %{first_code_label}')
-        
-        for i, instr in enumerate(tac_instructions):
+            return value
+        return reg
+
+    #Temporárias definidas mais de uma vez (resultado de '&&'/'||' em contexto de valor,
+    #nomes reaproveitados pelo alocador de temporárias) são renomeadas a cada definição.
+    #Só ficam em memória, como as variáveis, as que chegam a algum bloco por mais de uma
+    #definição (precisariam de phi) ou por uma definição que vem depois na ordem linear.
+    def _memory_temps(self, tac_instructions, cfg=None):
+        defs = Counter(instr_def(instr) for instr in tac_instructions if instr_def(instr) is not None)
+        multi_def = {instr.result.value for instr in tac_instructions
+                     if instr_def(instr) is not None and instr.result.is_temp() and defs[instr.result.value] > 1}
+        if not multi_def:
+            return []
+        cfg = cfg or ControlFlowGraph(tac_instructions)
+        live_in, _ = cfg.liveness(multi_def)
+        reach_in = cfg.reaching_definitions(multi_def)
+        memory = set()
+        block_start = 0
+        for block in cfg.blocks:
+            for name in live_in[block.index] & multi_def:
+                reaching = [p for n, p in reach_in[block.index] if n == name]
+                if len(reaching) != 1 or reaching[0] >= block_start:
+                    memory.add(name)
+            block_start += len(block.instructions)
+        return sorted(memory)
+
+    #Passos de laço que não transbordam: com o teste 'v < b' no cabeçalho, v <= 2^31 - 2 e
+    #'v + 1' cabe em i32 (e 'v - 1' com 'v > b'), desde que seja calculado no bloco que
+    #define v, antes da definição, e que v só seja definido ali. As demais somas continuam
+    #com transbordo circular, como no gerador de C (-fwrapv) e no de assembly.
+    def _no_wrap_steps(self, loops):
+        safe = set()
+        #Laço mais interno de cada bloco (a lista vem dos internos para os externos)
+        innermost = {}
+        for loop in loops:
+            for b in loop.body:
+                innermost.setdefault(b, loop)
+        for loop in loops:
+            for var, step in self._stay_relations(loop):
+                if var in self.real:
+                    continue
+                defs = [(b, instr) for b in loop.body for instr in self.cfg.blocks[b].instructions
+                        if instr_def(instr) == var]
+                if len(defs) != 1 or defs[0][0] == loop.header:
+                    continue
+                block, definition = defs[0]
+                if innermost[block] is not loop:
+                    continue
+                code = self.cfg.blocks[block].instructions
+                for instr in code[:code.index(definition) + 1]:
+                    if instr.opcode == ("ADD" if step == 1 else "SUB") and self._is_step(instr, var):
+                        safe.add(id(instr))
+        return safe
+
+    #Variáveis que o cabeçalho do laço mantém estritamente abaixo (passo 1) ou acima (passo -1)
+    #de outro valor para continuar no laço: [(v, passo), ...]
+    def _stay_relations(self, loop):
+        header = self.cfg.blocks[loop.header]
+        branch = header.terminator
+        if branch is None or branch.opcode == "GOTO" or len([s for s in header.succs if s in loop.body]) != 1:
+            return []
+        if branch.opcode in COMPARE_BRANCH:
+            relation, args = COMPARE_BRANCH[branch.opcode], (branch.arg1, branch.arg2)
+        else:
+            compare = header.instructions[-2] if len(header.instructions) > 1 else None
+            if compare is None or instr_def(compare) != branch.arg1.value or compare.opcode not in SWAPPED:
+                return []
+            relation, args = compare.opcode, (compare.arg1, compare.arg2)
+            if branch.opcode == "IF_FALSE_GOTO":
+                relation = NEGATED[relation]
+        #A condição acima é a de saltar; fica no laço quando o salto não sai dele
+        if self.cfg.label_block[branch.result.value] not in loop.body:
+            relation = NEGATED[relation]
+        first, second = args
+        found = []
+        for v, other, rel in [(first, second, relation), (second, first, SWAPPED[relation])]:
+            if (v.is_id() and rel in ("LT", "GT") and other.value not in self.real
+                    and not (other.is_literal() and not isinstance(other.value, int))):
+                found.append((v.value, 1 if rel == "LT" else -1))
+        return found
+
+    def _is_step(self, instr, var):
+        pairs = [(instr.arg1, instr.arg2)] + ([(instr.arg2, instr.arg1)] if instr.opcode == "ADD" else [])
+        return any(v.is_id() and v.value == var and c.is_literal() and c.value == 1 for v, c in pairs)
+
+    #Tipo das operações aritméticas e comparações: double se algum operando é real
+    def _numeric_type(self, arg1, arg2):
+        return "double" if "double" in (self._operand_type(arg1), self._operand_type(arg2)) else "i32"
+
+    def _operand_type(self, tac_operand):
+        if tac_operand.value in self.var_map:
+            return self.var_map[tac_operand.value][1]
+        if tac_operand.is_temp() and tac_operand.value in self.temp_map:
+            return self.temp_map[tac_operand.value][1]
+        return "i32"
+
+    #Registrador para uma nova definição da temporária: %_t3, depois %_t3.1, %_t3.2, ...
+    def _def_reg(self, result):
+        if result.value in self.var_map:
+            return self.next_llvm_reg()
+        count = self.temp_defs.get(result.value, 0)
+        self.temp_defs[result.value] = count + 1
+        return f'%{result.value}' if count == 0 else f'%{result.value}.{count}'
+
+    #Registra o valor de uma temporária SSA ou grava na memória das temporárias não-SSA
+    def _set_result(self, result, reg, llvm_type):
+        if result.value in self.var_map:
+            _, dest_type = self.var_map[result.value]
+            self._store_var(result.value, self._convert(reg, llvm_type, dest_type))
+        else:
+            self.temp_map[result.value] = (reg, llvm_type)
+
+    #Escreve o que já foi gerado, mantendo só a última linha (usada para saber se o bloco
+    #já terminou em br/ret); 'final' escreve tudo
+    def _flush(self, out, final=False):
+        keep = 0 if final else 1
+        if len(self.function_body) > keep:
+            out.write("\n".join(self.function_body[:len(self.function_body) - keep]) + "\n")
+            self.function_body = self.function_body[len(self.function_body) - keep:]
+
+    #Trecho [start, end) de um programa dividido, como função interna sem argumentos. Os saltos
+    #para o label logo depois do trecho (o início do próximo) viram saídas para um bloco com ret.
+    def _emit_region(self, n, tac_instructions, start, end, block_starts, out):
+        self.values, self.dirty, self.exit_values, self.incoming = {}, {}, {}, {}
+        out.write(f"define internal void @arara.parte.{n}() #2 {{\n")
+        self.function_body.append('entry:')
+        self.current_block = "entry"
+        if tac_instructions[start].opcode == "LABEL":
+            self.function_body.append(f'    br label %{tac_instructions[start].result.value}')
+        self._emit_instructions(tac_instructions, start, end, block_starts, out)
+        if not self.function_body or not self.function_body[-1].strip().startswith(('br ', 'ret ')):
+            self._end_block([])
+            self.function_body.append('    ret void')
+        if end < len(tac_instructions) and tac_instructions[end].opcode == "LABEL":
+            self.function_body.append(f'{tac_instructions[end].result.value}:')
+            self.function_body.append('    ret void')
+        self._flush(out, final=True)
+        out.write("}\n\n")
+
+    #Divide um programa grande em trechos de nível superior, cada um numa função interna.
+    #Um corte antes da instrução p vale se nenhum salto o atravessa (saltar para o label em p
+    #é sair do trecho) e nenhuma temporária está viva nele; as variáveis ficam num quadro global.
+    #None quando o programa é pequeno demais ou não tem cortes.
+    def _outline_regions(self, tac_instructions):
+        n = len(tac_instructions)
+        if not self.outline_threshold or n <= self.outline_threshold:
+            return None
+        labels = {instr.result.value: i for i, instr in enumerate(tac_instructions) if instr.opcode == "LABEL"}
+        crossing = [0] * (n + 1)
+        for j, instr in enumerate(tac_instructions):
+            if instr.opcode in JUMP_OPCODES:
+                target = labels[instr.result.value]
+                low, high = (j + 1, target - 1) if target > j else (target + 1, j)
+                if low <= high:
+                    crossing[low] += 1
+                    crossing[high + 1] -= 1
+
+        temps = {instr.result.value for instr in tac_instructions if instr_def(instr) is not None and instr.result.is_temp()}
+        _, live_out = self.cfg.liveness(temps)
+        busy = set()
+        position = 0
+        for block in self.cfg.blocks:
+            live = set(live_out[block.index])
+            for k in range(len(block.instructions) - 1, -1, -1):
+                instr = block.instructions[k]
+                live.discard(instr_def(instr))
+                live.update(name for name in instr_uses(instr) if name in temps)
+                if live:
+                    busy.add(position + k)
+            position += len(block.instructions)
+
+        regions, start, open_jumps = [], 0, 0
+        for p in range(1, n):
+            open_jumps += crossing[p]
+            if p - start >= self.outline_size and not open_jumps and p not in busy:
+                regions.append((start, p))
+                start = p
+        regions.append((start, n))
+        return regions if len(regions) > 1 else None
+
+    #Traduz as instruções [start, end) para o corpo da função atual
+    def _emit_instructions(self, tac_instructions, start, end, block_starts, out):
+        for i in range(start, end):
+            instr = tac_instructions[i]
             op, result, arg1, arg2 = instr.opcode, instr.result, instr.arg1, instr.arg2
+            if len(self.function_body) >= FLUSH_LINES:
+                self._flush(out)
 
             if op == "LABEL":
                 if self.function_body and not self.function_body[-1].strip().startswith(('br ', 'ret ')):
+                    self._end_block([result.value])
                     self.function_body.append(f'    br label %{result.value}')
-                self.function_body.append(f'{result.value}:')
+                self._flush(out)
+                self._begin_block(result.value, block_starts.get(id(instr)))
             
             elif op in ["ADD", "SUB", "MUL", "DIV", "EQ", "NEQ", "LT", "LE", "GT", "GE", "AND", "OR"]:
-                target_reg = f'%{result.value}'
-                llvm_type = "i1" if op in ["AND", "OR"] else "i32"
+                llvm_type = "i1" if op in ["AND", "OR"] else self._numeric_type(arg1, arg2)
                 val1 = self._get_llvm_operand_value(arg1, llvm_type)
                 val2 = self._get_llvm_operand_value(arg2, llvm_type)
-                op_map = {"ADD":"add",
-                          "SUB":"sub",
-                          "MUL":"mul",
-                          "DIV":"sdiv",
-                          "EQ":"icmp eq",
-                          "NEQ":"icmp ne",
-                          "LT":"icmp slt",
-                          "LE":"icmp sle",
-                          "GT":"icmp sgt",
-                          "GE":"icmp sge",
-                          "AND":"and",
-                           "OR":"or"}
-                op_str = op_map[op]
+                op_str = FLOAT_OPS[op] if llvm_type == "double" else LLVM_OPS[op]
+                if llvm_type == "i32" and id(instr) in self.no_wrap:
+                    op_str += " nsw"
+                result_type = "i1" if "cmp" in op_str or op in ["AND", "OR"] else llvm_type
+                target_reg = self._def_reg(result)
                 self.function_body.append(f'    {target_reg} = {op_str} {llvm_type} {val1}, {val2}')
-                self.temp_map[result.value] = (target_reg, "i1" if "icmp" in op_str or op in ["AND", "OR"] else "i32")
+                self._set_result(result, target_reg, result_type)
+
+            elif op == "NOT":
+                val = self._get_llvm_operand_value(arg1, "i1")
+                target_reg = self._def_reg(result)
+                self.function_body.append(f'    {target_reg} = xor i1 {val}, true')
+                self._set_result(result, target_reg, "i1")
+
+            elif op == "ASSIGN" and result.value not in self.var_map:
+                # Temporária SSA recebendo uma cópia: basta apontar para o mesmo valor
+                src_type = self._operand_type(arg1)
+                self._set_result(result, self._get_llvm_operand_value(arg1, src_type), src_type)
 
             elif op == "ASSIGN":
-                dest_ptr, dest_type = self.var_map[result.value]
-                src_val = self._get_llvm_operand_value(arg1, dest_type)
-                self.function_body.append(f'    store {dest_type} {src_val}, {dest_type}* {dest_ptr}, align 4')
+                _, dest_type = self.var_map[result.value]
+                self._store_var(result.value, self._get_llvm_operand_value(arg1, dest_type))
 
             elif op == "GOTO":
+                self._end_block([result.value])
                 self.function_body.append(f'    br label %{result.value}')
 
-            elif op == "IF_FALSE_GOTO":
-                cond_val = self._get_llvm_operand_value(arg1, "i1")
-                false_label = result.value
-                true_label_block_name = self.next_llvm_label_name()
-                self.function_body.append(f'    br i1 {cond_val}, label %{true_label_block_name}, label %{false_label}')
-                self.function_body.append(f'{true_label_block_name}:')
+            elif op in ["IF_FALSE_GOTO", "IF_TRUE_GOTO"] or op in COMPARE_BRANCH:
+                if op in COMPARE_BRANCH:
+                    llvm_type = self._numeric_type(arg1, arg2)
+                    ops = FLOAT_OPS if llvm_type == "double" else LLVM_OPS
+                    val1 = self._get_llvm_operand_value(arg1, llvm_type)
+                    val2 = self._get_llvm_operand_value(arg2, llvm_type)
+                    cond_val = self.next_llvm_reg()
+                    self.function_body.append(f'    {cond_val} = {ops[COMPARE_BRANCH[op]]} {llvm_type} {val1}, {val2}')
+                else:
+                    cond_val = self._get_llvm_operand_value(arg1, "i1")
+                # Se a próxima instrução já é um label, ele serve de destino do caminho que segue;
+                # senão é preciso abrir um bloco novo
+                next_instr = tac_instructions[i + 1] if i + 1 < len(tac_instructions) else None
+                if next_instr is not None and next_instr.opcode == "LABEL":
+                    fallthrough_label = next_instr.result.value
+                else:
+                    fallthrough_label = self.next_llvm_label_name()
+                self._end_block([result.value, fallthrough_label])
+                # IF_TRUE_GOTO e os desvios fundidos saltam quando a condição é verdadeira
+                if op == "IF_FALSE_GOTO":
+                    self.function_body.append(f'    br i1 {cond_val}, label %{fallthrough_label}, label %{result.value}')
+                else:
+                    self.function_body.append(f'    br i1 {cond_val}, label %{result.value}, label %{fallthrough_label}')
+                if next_instr is None or next_instr.opcode != "LABEL":
+                    self._flush(out)
+                    self._begin_block(fallthrough_label, block_starts.get(id(next_instr)))
+
+            elif op == "READ" and self.runtime:
+                # A runtime devolve o valor lido, ou o atual se não havia número na entrada
+                llvm_type = self._operand_type(result)
+                function = "@arara_read_real" if llvm_type == "double" else "@arara_read_int"
+                llvm_type = "double" if llvm_type == "double" else "i32"
+                current = self._get_llvm_operand_value(result, llvm_type)
+                read_reg = self.next_llvm_reg()
+                self.function_body.append(f'    {read_reg} = call {llvm_type} {function}({llvm_type} {current})')
+                self._set_result(result, read_reg, llvm_type)
 
             elif op == "READ":
+                # scanf grava direto na memória: o valor conhecido e o store pendente deixam de valer
+                self.values.pop(result.value, None)
+                self.dirty.pop(result.value, None)
                 dest_ptr, dest_type = self.var_map[result.value]
-                fmt_name, fmt_type = self.string_literals["%d"]
-                fmt_ptr_reg = self.next_llvm_reg()
-                self.function_body.append(f'    {fmt_ptr_reg} = getelementptr inbounds {fmt_type}, {fmt_type}* {fmt_name}, i64 0, i64 0')
+                fmt = "%lf" if dest_type == "double" else "%d"
                 call_reg = self.next_llvm_reg()
-                self.function_body.append(f'    {call_reg} = call i32 (i8*, ...) @scanf(i8* {fmt_ptr_reg}, {dest_type}* {dest_ptr})')
+                self.function_body.append(f'    {call_reg} = call i32 (i8*, ...) @scanf(i8* {self._string_pointer(fmt)}, {dest_type}* {dest_ptr})')
+
+            elif op == "WRITE" and self.runtime:
+                if result.is_literal() and isinstance(result.value, str) and result.value.startswith('"'):
+                    text = self._literal_text(result)
+                    self.function_body.append(f'    call void @arara_write_str(i8* {self._string_pointer(text)}, '
+                                              f'i32 {len(text.encode("utf-8"))})')
+                elif self._operand_type(result) == "double":
+                    llvm_val = self._get_llvm_operand_value(result, "double")
+                    self.function_body.append(f'    call void @arara_write_real(double {llvm_val})')
+                else:
+                    llvm_val = self._get_llvm_operand_value(result, "i32")
+                    self.function_body.append(f'    call void @arara_write_int(i32 {llvm_val})')
 
             elif op == "WRITE":
                 if result.is_literal() and isinstance(result.value, str) and result.value.startswith('"'):
-                    llvm_val_ptr = self._get_llvm_operand_value(result)
+                    # O texto é o próprio formato do printf: '%' precisa sair dobrado
+                    text_ptr = self._string_pointer(self._literal_text(result).replace('%', '%%'))
                     call_reg = self.next_llvm_reg()
-                    self.function_body.append(f'    {call_reg} = call i32 (i8*, ...) @printf(i8* {llvm_val_ptr})')
+                    self.function_body.append(f'    {call_reg} = call i32 (i8*, ...) @printf(i8* {text_ptr})')
+                elif self._operand_type(result) == "double":
+                    llvm_val = self._get_llvm_operand_value(result, "double")
+                    call_reg = self.next_llvm_reg()
+                    self.function_body.append(f'    {call_reg} = call i32 (i8*, ...) @printf(i8* {self._string_pointer("%f ")}, double {llvm_val})')
                 else: 
                     llvm_val = self._get_llvm_operand_value(result, "i32")
-                    fmt_name, fmt_type = self.string_literals["%d "]
-                    fmt_ptr_reg = self.next_llvm_reg()
-                    self.function_body.append(f'    {fmt_ptr_reg} = getelementptr inbounds {fmt_type}, {fmt_type}* {fmt_name}, i64 0, i64 0')
                     call_reg = self.next_llvm_reg()
-                    self.function_body.append(f'    {call_reg} = call i32 (i8*, ...) @printf(i8* {fmt_ptr_reg}, i32 {llvm_val})')
+                    self.function_body.append(f'    {call_reg} = call i32 (i8*, ...) @printf(i8* {self._string_pointer("%d ")}, i32 {llvm_val})')
 
-        if not self.function_body or not self.function_body[-1].strip().startswith(('br ', 'ret ')):
-             self.function_body.append('    ret i32 0')
+            elif op == "WRITE_REPEAT":
+                text = self._literal_text(result)
+                count = self._get_llvm_operand_value(arg1, "i32")
+                function = "@arara_write_repeat" if self.runtime else "@arara_escreva_repetido"
+                self.function_body.append(f'    call void {function}(i8* {self._string_pointer(text)}, '
+                                          f'i32 {len(text.encode("utf-8"))}, i32 {count})')
 
-        final_code = ["define i32 @main() {"]
-        final_code.extend(entry_block)
-        final_code.extend(self.function_body)
-        final_code.append("}")
-        
-        final_llvm_output = ["\n".join(self.module_header_lines), "\n".join(self.global_strings_defs), "\n".join(self.function_declarations), "\n".join(final_code)]
-        return "\n\n".join(filter(None, final_llvm_output))
\ No newline at end of file
+    #bloco principal, responsavel por executar a tradução feita (clang)
+    def generate(self, tac_instructions: list['TACInstruction']):
+        buffer = io.StringIO()
+        self.generate_to(tac_instructions, buffer)
+        return buffer.getvalue()
+
+    #Gera o LLVM IR escrevendo direto em 'out' (arquivo ou qualquer objeto com write), aos poucos.
+    #As strings globais só são todas conhecidas no fim, então ficam depois da função
+    #(a ordem das definições no módulo não importa para o LLVM).
+    def generate_to(self, tac_instructions: list['TACInstruction'], out):
+        self.__init__(self.semantic_table, self.cache_values, self.runtime, self.outline_threshold, self.outline_size)
+
+        first_code_label = "start_code"
+        if not tac_instructions or tac_instructions[0].opcode != "LABEL":
+             tac_instructions.insert(0, TACInstruction("LABEL", TACOperand("LABEL", first_code_label)))
+        else:
+             first_code_label = tac_instructions[0].result.value
+        self.cfg = ControlFlowGraph(tac_instructions)
+        block_starts = {id(block.instructions[0]): block.index for block in self.cfg.blocks if block.instructions}
+
+        repeat_write = not self.runtime and any(instr.opcode == "WRITE_REPEAT" for instr in tac_instructions)
+        if not self.runtime:
+            self._add_string_literal("%d")
+            self._add_string_literal("%d ")
+        if repeat_write:
+            self.function_declarations.append('declare i8* @memcpy(i8*, i8*, i64) #1')
+
+        regions = self._outline_regions(tac_instructions)
+        entry_block = ['entry:']
+        frame = []
+        variables_to_allocate = sorted(list({arg.value for instr in tac_instructions for arg in [instr.result, instr.arg1, instr.arg2] if arg and arg.type == 'ID'}))
+        self.real = real_names(tac_instructions, self.semantic_table)
+
+        for var_name in variables_to_allocate + self._memory_temps(tac_instructions, self.cfg):
+            llvm_type = self._llvm_type(var_name)
+            if regions:
+                # Dividido em funções, o programa guarda as variáveis num quadro global compartilhado
+                ptr_reg = f'@{var_name}_ptr'
+                frame.append(f'{ptr_reg} = internal global {llvm_type} {ZERO[llvm_type]}, align {ALIGN.get(llvm_type, 4)}')
+            else:
+                ptr_reg = f'%{var_name}_ptr'
+                entry_block.append(f'    {ptr_reg} = alloca {llvm_type}, align {ALIGN.get(llvm_type, 4)}')
+                # Como nos outros backends, toda variável começa em zero
+                entry_block.append(f'    store {llvm_type} {ZERO[llvm_type]}, {llvm_type}* {ptr_reg}, align {ALIGN.get(llvm_type, 4)}')
+            self.var_map[var_name] = (ptr_reg, llvm_type)
+
+        if self.cache_values:
+            self.live_in, _ = self.cfg.liveness(set(self.var_map))
+
+        self.no_wrap = self._no_wrap_steps(self.cfg.loops())
+
+        entry_block.append(f'    br label %{first_code_label}')
+
+        out.write("\n".join(self.module_header_lines) + "\n\n")
+        out.write("\n".join(self.function_declarations) + "\n\n")
+        if regions:
+            out.write("\n".join(frame) + "\n\n")
+            for n, (start, end) in enumerate(regions):
+                self._emit_region(n, tac_instructions, start, end, block_starts, out)
+            self.function_body = [f'    call void @arara.parte.{n}()' for n in range(len(regions))]
+            if self.runtime:
+                self.function_body.append('    call void @arara_flush()')
+            self.function_body.append('    ret i32 0')
+            out.write("define noundef i32 @main() #0 {\nentry:\n")
+        else:
+            out.write("define noundef i32 @main() #0 {\n")
+            out.write("\n".join(entry_block) + "\n")
+
+            self._emit_instructions(tac_instructions, 0, len(tac_instructions), block_starts, out)
+
+            if not self.function_body or not self.function_body[-1].strip().startswith(('br ', 'ret ')):
+                 self._end_block([], store=False)
+                 if self.runtime:
+                     self.function_body.append('    call void @arara_flush()')
+                 self.function_body.append('    ret i32 0')
+
+        self._flush(out, final=True)
+        out.write("}\n\n")
+        out.write("\n".join(self.global_strings_defs) + "\n")
+        if repeat_write:
+            out.write("\n" + REPEAT_WRITE_FUNCTION)
+        #O #2 só existe quando o programa foi dividido em trechos
+        out.write("\n" + "\n".join(FUNCTION_ATTRIBUTES[:3 if regions else 2]) + "\n")
@@ -0,0 +1,160 @@
+# Arquivo: src/llvm_jit.py
+
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+
+# Execução do LLVM IR gerado dentro do próprio processo, com o JIT do llvmlite.
+# O llvmlite é opcional: sem ele, jit_disponivel() devolve False e quem chama
+# segue sem executar.
+try:
+    import llvmlite.binding as llvm
+except ImportError:
+    llvm = None
+
+
+class JITError(Exception):
+    pass
+
+
+_iniciado = False
+_libc = None
+_processo = None
+
+
+def jit_disponivel():
+    return llvm is not None
+
+
+def _inicializar():
+    global _iniciado, _libc, _processo
+    if _iniciado:
+        return
+    try:
+        llvm.initialize()
+    except RuntimeError:
+        pass    # versões novas do llvmlite inicializam o LLVM sozinhas
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+    _iniciado = True
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"))
+    _processo = ctypes.CDLL(None) if os.name != "nt" else _libc
+
+
+def _otimizar(modulo, maquina, nivel):
+    if nivel <= 0:
+        return
+    if hasattr(llvm, "create_pass_builder"):
+        opcoes = llvm.create_pipeline_tuning_options(speed_level=nivel)
+        pass_builder = llvm.create_pass_builder(maquina, opcoes)
+        pass_builder.getModulePassManager().run(modulo, pass_builder)
+    else:
+        builder = llvm.create_pass_manager_builder()
+        builder.opt_level = nivel
+        pass_manager = llvm.create_module_pass_manager()
+        builder.populate(pass_manager)
+        pass_manager.run(modulo)
+
+
+#Compila o IR (parse, verificação, otimização e JIT) e devolve o motor de execução
+def compilar(llvm_ir, nivel=2):
+    if llvm is None:
+        raise JITError("llvmlite não está instalado")
+    _inicializar()
+    try:
+        modulo = llvm.parse_assembly(llvm_ir)
+        modulo.verify()
+    except RuntimeError as e:
+        raise JITError(f"LLVM IR inválido: {e}") from None
+    # Função externa que o processo não tem faria o MCJIT abortar o processo inteiro
+    for funcao in modulo.functions:
+        if funcao.is_declaration and not funcao.name.startswith("llvm.") and not _simbolo_existe(funcao.name):
+            raise JITError(f"função externa '{funcao.name}' não encontrada no processo "
+                           "(gere o IR com LLVMGenerator(runtime=False))")
+    # O motor de execução fica com a máquina alvo e a libera junto com ele: cada
+    # compilação usa uma nova. O IR traz o triple e o datalayout fixos de x86-64;
+    # o JIT exige os da máquina atual
+    maquina = llvm.Target.from_default_triple().create_target_machine()
+    modulo.triple = maquina.triple
+    modulo.data_layout = str(maquina.target_data)
+    _otimizar(modulo, maquina, nivel)
+    motor = llvm.create_mcjit_compiler(modulo, maquina)
+    motor.finalize_object()
+    return motor
+
+
+def _simbolo_existe(nome):
+    return bool(llvm.address_of_symbol(nome)) or hasattr(_processo, nome)
+
+
+#Executa 'main' do IR. Sem 'entrada', o programa usa o stdin/stdout do processo;
+#com 'entrada', ela é ligada ao stdin e a saída do programa é capturada e devolvida
+#em vez de impressa. Devolve (código de saída, saída capturada ou None).
+def executar(llvm_ir, entrada=None, nivel=2):
+    return executar_compilado(compilar(llvm_ir, nivel), entrada)
+
+
+#Executa de novo um programa já compilado: as variáveis vivem na pilha de 'main',
+#então cada execução começa do zero sem recompilar
+def executar_compilado(motor, entrada=None):
+    main = ctypes.CFUNCTYPE(ctypes.c_int)(motor.get_function_address("main"))
+    if entrada is None:
+        sys.stdout.flush()
+        codigo = main()
+        _libc.fflush(None)
+        return codigo, None
+    return _executar_redirecionado(main, entrada)
+
+
+#O printf/scanf do programa usam os descritores 0 e 1 do processo: eles são trocados
+#por pipes durante a execução e restaurados depois
+def _executar_redirecionado(main, entrada):
+    sys.stdout.flush()
+    _libc.fflush(None)
+    stdin_salvo, stdout_salvo = os.dup(0), os.dup(1)
+    leitura_entrada, escrita_entrada = os.pipe()
+    leitura_saida, escrita_saida = os.pipe()
+    partes = []
+
+    def alimentar():
+        with os.fdopen(escrita_entrada, "wb") as f:
+            try:
+                f.write(entrada.encode("utf-8"))
+            except BrokenPipeError:
+                pass
+
+    def coletar():
+        with os.fdopen(leitura_saida, "rb") as f:
+            partes.append(f.read())
+
+    threads = [threading.Thread(target=alimentar), threading.Thread(target=coletar)]
+    for thread in threads:
+        thread.start()
+    try:
+        os.dup2(leitura_entrada, 0)
+        os.dup2(escrita_saida, 1)
+        os.close(leitura_entrada)
+        os.close(escrita_saida)
+        _descartar_stdin()
+        codigo = main()
+        _libc.fflush(None)
+    finally:
+        os.dup2(stdin_salvo, 0)
+        os.dup2(stdout_salvo, 1)
+        os.close(stdin_salvo)
+        os.close(stdout_salvo)
+        _descartar_stdin()
+    for thread in threads:
+        thread.join()
+    return codigo, b"".join(partes).decode("utf-8", errors="replace")
+
+
+#Descarta o que o stdin do C guardou em buffer e o indicador de fim de arquivo,
+#para a próxima execução não ler restos da anterior
+def _descartar_stdin():
+    stdin = ctypes.c_void_p.in_dll(_libc, "stdin")
+    if hasattr(_libc, "__fpurge"):
+        _libc.__fpurge(stdin)
+    _libc.clearerr(stdin)
@@ -15,15 +15,37 @@ from grammar.generated.AraraParser import AraraParser
 from src.error_handler import CustomErrorListener
 from src.ast_generator import ASTDotVisitor
 from src.tac.TACGenerator import TACGenerator
+from src.tac.pass_manager import PassManager
+from src.tac.tac_file import read_tac, write_text, write_binary, TACFileError
 from src.llvm_generator import LLVMGenerator
+from src.c_generator import CGenerator
+from src.x86_generator import X86Generator
+from src.llvm_jit import executar, jit_disponivel, JITError
+from src.interpreter.Interpreter import Interpreter
+from src.interpreter.vm import BytecodeCompiler, VM
+from src.interpreter.runtime import InterpreterError, ProgramIO
+from src.interpreter.transpiler import (Transpiler, TranslationLimitError, carregar_do_cache, gravar_no_cache,
+                                        executar_codigo)
+from src.interpreter.profiler import Profile, profile_interpreter, profile_vm
+from src.native_build import compilar_varios, ferramentas, CACHE_PADRAO
 
 logging.basicConfig(filename="analisador.log", filemode='w', encoding="utf-8", level=logging.WARNING,
                     format="%(levelname)s: %(message)s")
 
-def analisar_arquivo(caminho, gerar_tac=False, gerar_llvm=False):
+def analisar_arquivo(caminho, gerar_tac=False, gerar_llvm=False, nivel_otimizacao=0, tac_binario=False,
+                     estatisticas_passes=False, executar_programa=False, gerar_c=False, gerar_asm=False,
+                     interpretar=False, executar_vm=False, executar_python=False, pasta_cache=CACHE_PADRAO,
+                     dados_entrada=None, perfilar=False):
     with open(caminho, encoding="utf-8") as f:
         entrada = f.read()
 
+    # Programa já traduzido para Python: sem nada mais a gerar, nem passa pelo front-end
+    codigo_python = carregar_do_cache(entrada, pasta_cache) if executar_python else None
+    if codigo_python is not None:
+        executar_python_compilado(codigo_python, "do cache", dados_entrada)
+        if not (gerar_tac or interpretar):
+            return None
+
     print("-"*40)
     print("Código de entrada:\n" + "-"*40)
     print(entrada)
@@ -86,22 +108,34 @@ def analisar_arquivo(caminho, gerar_tac=False, gerar_llvm=False):
     else:
         print("✅ AST gerada com sucesso como 'docs/ast.png'!\n")
 
+    if interpretar:
+        perfil = Profile(arvore, entrada, os.path.basename(caminho)) if perfilar else None
+        interpretar_programa(arvore, semantico.tabela_simbolos, dados_entrada, perfil)
+        if perfil:
+            gravar_perfil(caminho, perfil, "interpretador")
+    if executar_python and codigo_python is None:
+        traduzir_para_python(caminho, entrada, arvore, semantico.tabela_simbolos, pasta_cache, dados_entrada)
+
     print("-"*40)
     tac_code = []
     if gerar_tac:
         print("Iniciando a geração de Código de Três Endereços (TAC)...")
-        tac_generator = TACGenerator()
+        # Com otimização, o reaproveitamento de temporárias fica para depois dos passes
+        tac_generator = TACGenerator(reuse_temps=nivel_otimizacao == 0, symbols=semantico.tabela_simbolos)
         try:
             tac_generator.visit(arvore)
             tac_code = tac_generator.tac_instructions
 
+            tac_code = otimizar_tac(tac_code, nivel_otimizacao, estatisticas_passes, semantico.tabela_simbolos)
+
             output_filename = os.path.splitext(os.path.basename(caminho))[0] + ".tac"
             output_filepath = os.path.join(os.path.dirname(caminho), output_filename)
 
-            with open(output_filepath, "w", encoding="utf-8") as f:
-                for instruction in tac_code:
-                    f.write(str(instruction) + "\n")
+            write_text(output_filepath, tac_code)
             print(f"✅ Código TAC gerado com sucesso em '{output_filepath}'!")
+            if tac_binario:
+                write_binary(output_filepath + "b", tac_code, semantico.tabela_simbolos)
+                print(f"✅ Código TAC binário gerado em '{output_filepath}b'!")
             print("\nCódigo TAC gerado:\n" + "-"*40)
             for instruction in tac_code:
                 print(instruction)
@@ -112,39 +146,304 @@ def analisar_arquivo(caminho, gerar_tac=False, gerar_llvm=False):
             logging.error(f"Erro na geração de TAC: {e}")
             sys.exit(1)
 
+    if executar_vm and tac_code:
+        perfil = Profile(arvore, entrada, os.path.basename(caminho)) if perfilar else None
+        executar_bytecode(tac_code, semantico.tabela_simbolos, dados_entrada, perfil)
+        if perfil:
+            gravar_perfil(caminho, perfil, "vm")
+
+    llvm_filepath = None
     if gerar_llvm and tac_code:
-        print("Iniciando a geração de Código Final (LLVM IR)...")
-        try:
-            # LINHA CORRIGIDA AQUI: Passa apenas semantico.tabela_simbolos para o construtor
-            llvm_generator = LLVMGenerator(semantico.tabela_simbolos) 
-            # Chama generate_llvm_ir com as instruções TAC
-            llvm_ir_code = llvm_generator.generate(tac_generator.tac_instructions)
+        llvm_filepath = gerar_llvm_ir(caminho, tac_code, semantico.tabela_simbolos)
+        if executar_programa:
+            executar_llvm(tac_code, semantico.tabela_simbolos, nivel_otimizacao)
+    elif gerar_llvm and not tac_code:
+        print("⚠️ Aviso: A geração de LLVM IR foi solicitada, mas o Código de Três Endereços (TAC) não foi gerado ou está vazio. Certifique-se de usar --gerar-tac.")
+    fonte = llvm_filepath
+    if gerar_c and tac_code:
+        fonte = gerar_codigo_c(caminho, tac_code, semantico.tabela_simbolos)
+    if gerar_asm and tac_code:
+        fonte = gerar_assembly(caminho, tac_code, semantico.tabela_simbolos)
+    return fonte
 
-            output_filename = os.path.splitext(os.path.basename(caminho))[0] + ".ll"
-            output_filepath = os.path.join(os.path.dirname(caminho), output_filename)
 
-            with open(output_filepath, "w", encoding="utf-8") as f:
-                f.write(llvm_ir_code)
-            print(f"✅ Código LLVM IR gerado com sucesso em '{output_filepath}'!")
-            print("\nCódigo LLVM IR gerado:\n" + "-"*40)
-            print(llvm_ir_code)
-            print("-"*40)
+def otimizar_tac(tac_code, nivel_otimizacao, estatisticas_passes=False, tabela_simbolos=None):
+    pass_manager = PassManager.for_level(nivel_otimizacao, tabela_simbolos)
+    tac_code = pass_manager.run(tac_code)
+    if estatisticas_passes:
+        print(f"Estatísticas dos passes (-O{nivel_otimizacao}):\n" + "-"*40)
+        print(pass_manager.report())
+        print("-"*40)
+    return tac_code
 
-        except Exception as e:
-            print(f"❌ Erro na geração do código final (LLVM IR): {e}")
-            logging.error(f"Erro na geração de LLVM IR: {e}")
-            sys.exit(1)
-    elif gerar_llvm and not tac_code:
-        print("⚠️ Aviso: A geração de LLVM IR foi solicitada, mas o Código de Três Endereços (TAC) não foi gerado ou está vazio. Certifique-se de usar --gerar-tac.")
+
+def gerar_llvm_ir(caminho, tac_code, tabela_simbolos):
+    print("Iniciando a geração de Código Final (LLVM IR)...")
+    try:
+        llvm_generator = LLVMGenerator(tabela_simbolos)
+
+        output_filename = os.path.splitext(os.path.basename(caminho))[0] + ".ll"
+        output_filepath = os.path.join(os.path.dirname(caminho), output_filename)
+
+        # O IR vai direto para o arquivo, sem montar o módulo inteiro em memória
+        with open(output_filepath, "w", encoding="utf-8") as f:
+            llvm_generator.generate_to(tac_code, f)
+        print(f"✅ Código LLVM IR gerado com sucesso em '{output_filepath}'!")
+        print("\nCódigo LLVM IR gerado:\n" + "-"*40)
+        with open(output_filepath, encoding="utf-8") as f:
+            for linha in f:
+                print(linha, end="")
+        print("-"*40)
+        return output_filepath
+
+    except Exception as e:
+        print(f"❌ Erro na geração do código final (LLVM IR): {e}")
+        logging.error(f"Erro na geração de LLVM IR: {e}")
+        sys.exit(1)
+
+
+#Gera o programa em C a partir do TAC, para compilar com qualquer compilador C
+def gerar_codigo_c(caminho, tac_code, tabela_simbolos):
+    return gravar_codigo_final(caminho, tac_code, CGenerator(tabela_simbolos), ".c", "C")
+
+
+#Gera o assembly x86-64 a partir do TAC, para montar com o 'as' do sistema, sem LLVM
+def gerar_assembly(caminho, tac_code, tabela_simbolos):
+    return gravar_codigo_final(caminho, tac_code, X86Generator(tabela_simbolos), ".s", "assembly x86-64")
+
+
+def gravar_codigo_final(caminho, tac_code, gerador, extensao, nome):
+    print(f"Iniciando a geração de Código Final ({nome})...")
+    try:
+        output_filepath = os.path.splitext(caminho)[0] + extensao
+        with open(output_filepath, "w", encoding="utf-8") as f:
+            gerador.generate_to(tac_code, f)
+        print(f"✅ Código {nome} gerado com sucesso em '{output_filepath}'!")
+        print(f"\nCódigo {nome} gerado:\n" + "-"*40)
+        with open(output_filepath, encoding="utf-8") as f:
+            for linha in f:
+                print(linha, end="")
+        print("-"*40)
+        return output_filepath
+
+    except Exception as e:
+        print(f"❌ Erro na geração do código final ({nome}): {e}")
+        logging.error(f"Erro na geração de {nome}: {e}")
+        sys.exit(1)
 
 
+#Compila o programa com o JIT do llvmlite e executa no próprio processo. O IR do JIT usa o
+#printf/scanf da libc já carregada no processo, em vez da biblioteca de runtime em C.
+def executar_llvm(tac_code, tabela_simbolos, nivel_otimizacao=0):
+    if not jit_disponivel():
+        print("⚠️ Aviso: llvmlite não está instalado; a execução (--run) foi ignorada.")
+        return
+    llvm_ir = LLVMGenerator(tabela_simbolos, runtime=False).generate(list(tac_code))
+    print(f"Executando o programa (JIT, -O{nivel_otimizacao}):\n" + "-"*40)
+    try:
+        codigo, _ = executar(llvm_ir, nivel=nivel_otimizacao)
+    except JITError as e:
+        print(f"❌ Erro na execução do LLVM IR: {e}")
+        logging.error(f"Erro no JIT: {e}")
+        sys.exit(1)
+    print("\n" + "-"*40)
+    print(f"Programa terminou com código {codigo}.")
+
+
+#E/S dos modos interpretados: o stdin, ou o conteúdo do arquivo do --entrada (o mesmo para cada programa)
+def io_do_programa(dados_entrada):
+    return ProgramIO.replay(dados_entrada) if dados_entrada is not None else ProgramIO()
+
+
+#Executa o programa direto da árvore sintática, com o interpretador compilado para closures
+def interpretar_programa(arvore, tabela_simbolos, dados_entrada=None, perfil=None):
+    print("-"*40)
+    print(f"Executando o programa (interpretador{' com perfil' if perfil else ''}):\n" + "-"*40)
+    try:
+        if perfil:
+            profile_interpreter(perfil, tabela_simbolos, arvore, io_do_programa(dados_entrada))
+        else:
+            Interpreter(tabela_simbolos).run(arvore, io_do_programa(dados_entrada))
+    except InterpreterError as e:
+        print(f"\n❌ Erro na execução do programa: {e}")
+        logging.error(f"Erro no interpretador: {e}")
+        sys.exit(1)
+    print("\n" + "-"*40)
+    print("Programa terminou.")
+
+
+#Traduz a árvore sintática para Python, guarda o code object no cache e executa
+def traduzir_para_python(caminho, entrada, arvore, tabela_simbolos, pasta_cache, dados_entrada=None):
+    try:
+        codigo = Transpiler(tabela_simbolos).compile(arvore, caminho)
+    except TranslationLimitError as e:
+        # Fica com o interpretador de closures, que não tem esse limite
+        print(f"⚠️ Aviso: {e}; o programa roda no interpretador.")
+        logging.warning(f"Tradução para Python: {e}")
+        interpretar_programa(arvore, tabela_simbolos, dados_entrada)
+        return
+    except InterpreterError as e:
+        print(f"❌ Erro na tradução para Python: {e}")
+        logging.error(f"Erro na tradução para Python: {e}")
+        sys.exit(1)
+    try:
+        gravar_no_cache(entrada, codigo, pasta_cache)
+    except OSError as e:
+        print(f"⚠️ Aviso: não foi possível gravar o programa Python no cache: {e}")
+    executar_python_compilado(codigo, "traduzido", dados_entrada)
+
+
+def executar_python_compilado(codigo, origem, dados_entrada=None):
+    print("-"*40)
+    print(f"Executando o programa (Python, {origem}):\n" + "-"*40)
+    try:
+        executar_codigo(codigo, io_do_programa(dados_entrada))
+    except InterpreterError as e:
+        print(f"\n❌ Erro na execução do programa: {e}")
+        logging.error(f"Erro no programa traduzido para Python: {e}")
+        sys.exit(1)
+    print("\n" + "-"*40)
+    print("Programa terminou.")
+
+
+#Executa o TAC (já otimizado) na máquina virtual de bytecode
+#Com perfil, o bytecode sai sem fundir cópias nem girar laços, e cada instrução aponta para a do TAC
+def executar_bytecode(tac_code, tabela_simbolos, dados_entrada=None, perfil=None):
+    try:
+        if perfil:
+            print("Executando o programa (VM com perfil):\n" + "-"*40)
+            profile_vm(perfil, tac_code, tabela_simbolos, io_do_programa(dados_entrada))
+        else:
+            bytecode = BytecodeCompiler(tabela_simbolos).compile(tac_code)
+            print(f"Executando o programa (VM, {len(bytecode)} instruções de bytecode):\n" + "-"*40)
+            VM(io_do_programa(dados_entrada)).run(bytecode)
+    except InterpreterError as e:
+        print(f"\n❌ Erro na execução do programa: {e}")
+        logging.error(f"Erro na VM: {e}")
+        sys.exit(1)
+    print("\n" + "-"*40)
+    print("Programa terminou.")
+
+
+#Grava o relatório do perfil (SEU_EXEMPLO.<modo>.perfil.txt) e as pilhas colapsadas para
+#flame graph (SEU_EXEMPLO.<modo>.perfil.folded) ao lado do fonte e mostra o relatório
+def gravar_perfil(caminho, perfil, modo):
+    base = os.path.splitext(caminho)[0] + f".{modo}.perfil"
+    relatorio = perfil.report()
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(relatorio)
+    with open(base + ".folded", "w", encoding="utf-8") as f:
+        f.write(perfil.collapsed())
+    print(relatorio)
+    print(f"✅ Perfil gravado em '{base}.txt' e pilhas para flame graph em '{base}.folded'.")
+
+
+#Retoma o pipeline a partir de um TAC já gerado (.tac em texto ou .tacb binário)
+def retomar_tac(caminho, gerar_llvm=False, nivel_otimizacao=0, estatisticas_passes=False, executar_programa=False,
+                gerar_c=False, gerar_asm=False, interpretar=False, executar_vm=False, executar_python=False,
+                dados_entrada=None, perfilar=False):
+    if interpretar:
+        print("⚠️ Aviso: o interpretador (--interpretar) precisa do código-fonte .arara; ignorado para o TAC.")
+    if executar_python:
+        print("⚠️ Aviso: a tradução para Python (--python) precisa do código-fonte .arara; ignorada para o TAC.")
+    if perfilar:
+        print("⚠️ Aviso: o perfil (--perfil) atribui o tempo às linhas do código-fonte .arara; ignorado para o TAC.")
+    try:
+        tac_code, tabela_simbolos = read_tac(caminho)
+    except (OSError, TACFileError) as e:
+        print(f"❌ Erro ao ler o TAC de '{caminho}': {e}")
+        logging.error(f"Erro ao ler TAC: {e}")
+        sys.exit(1)
+    print(f"✅ {len(tac_code)} instruções TAC lidas de '{caminho}'.")
+
+    tac_code = otimizar_tac(tac_code, nivel_otimizacao, estatisticas_passes, tabela_simbolos)
+    if executar_vm:
+        executar_bytecode(tac_code, tabela_simbolos, dados_entrada)
+
+    if gerar_llvm or gerar_c or gerar_asm:
+        fonte = None
+        if gerar_llvm:
+            fonte = gerar_llvm_ir(caminho, tac_code, tabela_simbolos)
+            if executar_programa:
+                executar_llvm(tac_code, tabela_simbolos, nivel_otimizacao)
+        if gerar_c:
+            fonte = gerar_codigo_c(caminho, tac_code, tabela_simbolos)
+        if gerar_asm:
+            fonte = gerar_assembly(caminho, tac_code, tabela_simbolos)
+        return fonte
+    if executar_vm:
+        return None
+    for instruction in tac_code:
+        print(instruction)
+
+
+#Compila os .ll (ou .c, ou .s) gerados para executáveis nativos, em paralelo e com cache pelo hash do fonte
+def compilar_executaveis(fontes, nivel_otimizacao=0, pasta_cache=CACHE_PADRAO):
+    print(f"Compilando {len(fontes)} programa(s) para código nativo (-O{nivel_otimizacao})...")
+    falhou = False
+    for resultado in compilar_varios(fontes, nivel_otimizacao, pasta_cache):
+        if resultado.erro:
+            falhou = True
+            print(f"❌ Erro ao compilar '{resultado.origem}': {resultado.erro}")
+            logging.error(f"Erro na compilação nativa: {resultado.erro}")
+        else:
+            origem = "do cache" if resultado.em_cache else "compilado"
+            print(f"✅ Executável '{resultado.executavel}' {origem} em {resultado.segundos:.3f} s.")
+    if falhou:
+        sys.exit(1)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Compilador Arara - Análise Léxica, Sintática, Semântica, Geração de TAC e LLVM IR.")
-    parser.add_argument("arquivo", help="Caminho para o arquivo .arara a ser compilado.")
+    parser.add_argument("arquivos", nargs="+", metavar="arquivo", help="Caminho para o arquivo .arara a ser compilado (ou um .tac/.tacb já gerado, para retomar a partir do TAC). Aceita vários arquivos.")
     parser.add_argument("--gerar-tac", action="store_true", help="Ativa a geração do Código de Três Endereços (TAC).")
     parser.add_argument("--gerar-llvm", action="store_true", help="Ativa a geração do Código Final (LLVM IR). Requer --gerar-tac.")
+    parser.add_argument("-O", dest="nivel_otimizacao", type=int, choices=[0, 1, 2], default=0, help="Nível de otimização do TAC: -O0 nenhum passe, -O1 junção de escritas constantes, peephole de saltos e reaproveitamento de temporárias, -O2 também código invariante de laço e redução de força.")
+    parser.add_argument("--otimizar", action="store_true", help="O mesmo que -O2.")
+    parser.add_argument("--print-pass-stats", action="store_true", help="Mostra o tempo e a variação de instruções de cada passe de otimização.")
+
+    parser.add_argument("--tac-binario", action="store_true", help="Grava também o TAC no formato binário (.tacb), que carrega mais rápido.")
+    parser.add_argument("--run", "--executar", dest="executar", action="store_true", help="Executa o programa gerado no próprio processo, com o JIT do llvmlite (se instalado). Implica --gerar-tac e --gerar-llvm.")
+    parser.add_argument("--gerar-c", action="store_true", help="Gera também o programa em C (.c) a partir do TAC; com --build, o executável é compilado a partir dele, só com um compilador C. Implica --gerar-tac.")
+    parser.add_argument("--gerar-asm", action="store_true", help="Gera também o assembly x86-64 (.s, Linux) a partir do TAC, com alocação de registradores própria; com --build, o executável é montado a partir dele com o as, sem LLVM nem compilador C. Implica --gerar-tac.")
+    parser.add_argument("--build", action="store_true", help="Compila o LLVM IR para executável nativo (clang, ou opt/llc e cc) no nível de -O, com os arquivos em paralelo. Implica --gerar-tac e --gerar-llvm. Com --gerar-c, ou sem llc/clang, compila o C gerado; com --gerar-asm, monta o assembly gerado.")
+    parser.add_argument("--interpretar", action="store_true", help="Executa o programa direto da árvore sintática, sem gerar código, com o interpretador compilado para closures.")
+    parser.add_argument("--vm", action="store_true", help="Executa o TAC (depois dos passes de -O) numa máquina virtual de bytecode, sem ferramentas nativas. Funciona também com .tac/.tacb. Implica --gerar-tac.")
+    parser.add_argument("--entrada", metavar="ARQUIVO", help="Nos modos interpretados (--interpretar, --vm e --python), lê a entrada do programa deste arquivo em vez do stdin; com vários programas, cada um lê o arquivo desde o começo.")
+    parser.add_argument("--perfil", action="store_true", help="Com --interpretar e --vm, mede execuções e tempo de cada linha, de cada laço enquanto e (na VM) de cada instrução do TAC, e grava o relatório (.perfil.txt) e as pilhas colapsadas para flame graph (.perfil.folded) ao lado do fonte.")
+    parser.add_argument("--python", action="store_true", help="Traduz o programa para uma função Python, compilada uma vez com compile() e executada com exec. O code object fica no cache pelo hash do fonte, e rodar de novo o mesmo programa pula o front-end.")
+    parser.add_argument("--build-cache", default=CACHE_PADRAO, help=f"Pasta do cache de objetos e executáveis do --build e dos programas do --python (padrão: {CACHE_PADRAO}).")
 
     args = parser.parse_args()
-    CustomErrorListener.has_errors = False
-    CustomSemanticErrorListener.has_errors = False
-    analisar_arquivo(args.arquivo, args.gerar_tac, args.gerar_llvm)
\ No newline at end of file
+    nivel_otimizacao = 2 if args.otimizar else args.nivel_otimizacao
+    # Sem LLVM para o --build, mas com um compilador C, o executável sai do C gerado
+    gerar_c = args.gerar_c
+    if args.build and not gerar_c and not args.gerar_asm and ferramentas() is None and ferramentas(".c") is not None:
+        print("⚠️ Aviso: llc/clang não encontrados; o --build vai usar o C gerado (--gerar-c).")
+        gerar_c = True
+    gerar_tac = args.gerar_tac or args.executar or args.build or gerar_c or args.gerar_asm or args.vm
+    gerar_llvm = args.gerar_llvm or args.executar or (args.build and not gerar_c and not args.gerar_asm)
+    if args.perfil and not (args.interpretar or args.vm):
+        print("⚠️ Aviso: o --perfil vale para --interpretar e --vm; ignorado.")
+    elif args.perfil and args.python:
+        print("⚠️ Aviso: o --perfil mede só o --interpretar e a --vm; o programa do --python roda sem perfil.")
+    dados_entrada = None
+    if args.entrada:
+        # Como o read da runtime em C, os bytes viram caracteres um a um
+        with open(args.entrada, "rb") as f:
+            dados_entrada = f.read().decode("latin-1")
+    fontes = []
+    for arquivo in args.arquivos:
+        CustomErrorListener.has_errors = False
+        CustomSemanticErrorListener.has_errors = False
+        if arquivo.endswith((".tac", ".tacb")):
+            fonte = retomar_tac(arquivo, gerar_llvm, nivel_otimizacao, args.print_pass_stats, args.executar, gerar_c,
+                                args.gerar_asm, args.interpretar, args.vm, args.python, dados_entrada,
+                                args.perfil)
+        else:
+            fonte = analisar_arquivo(arquivo, gerar_tac, gerar_llvm, nivel_otimizacao, args.tac_binario,
+                                     args.print_pass_stats, args.executar, gerar_c, args.gerar_asm, args.interpretar,
+                                     args.vm, args.python, args.build_cache, dados_entrada, args.perfil)
+        if fonte:
+            fontes.append(fonte)
+    if args.build and fontes:
+        compilar_executaveis(fontes, nivel_otimizacao, args.build_cache)
\ No newline at end of file
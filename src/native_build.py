@@ -0,0 +1,189 @@
+# Arquivo: src/native_build.py
+
+import atexit
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Compilação nativa do LLVM IR gerado: clang quando disponível, senão opt (se houver)
+# + llc + cc, ligando a biblioteca de runtime (src/runtime). O C do gerador de C (.c)
+# passa só pelo compilador C, e o assembly x86-64 (.s) pelo 'as' do sistema. Objetos e executáveis ficam num cache indexado pelo hash
+# do fonte, do nível de otimização, da runtime e das versões das ferramentas, então um
+# programa que não mudou não passa de novo pelo compilador.
+
+#No Windows, o printf/scanf do IR precisam das definições legadas do stdio da Microsoft
+LIGACAO_EXTRA = ["-Wl,/DEFAULTLIB:legacy_stdio_definitions.lib"] if os.name == "nt" else []
+EXTENSAO = ".exe" if os.name == "nt" else ""
+
+RUNTIME_C = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runtime", "arara_runtime.c")
+
+CACHE_PADRAO = os.environ.get("ARARA_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "arara"))
+
+
+class BuildError(Exception):
+    pass
+
+
+class ResultadoBuild:
+
+    def __init__(self, origem, executavel=None, segundos=0.0, em_cache=False, erro=None):
+        self.origem = origem
+        self.executavel = executavel
+        self.segundos = segundos
+        self.em_cache = em_cache
+        self.erro = erro
+
+
+_versoes = {}
+_versoes_lock = threading.Lock()
+_runtime_lock = threading.Lock()
+_pasta_runtime = None
+
+
+#Ferramentas usadas na compilação de um fonte com a extensão dada, na ordem em que são
+#chamadas (a última também liga); None se não houver nenhuma
+def ferramentas(extensao=".ll"):
+    if extensao == ".s" and shutil.which("as") and shutil.which("cc"):
+        return ["as", "cc"]
+    if extensao in (".c", ".s"):
+        compilador = next((nome for nome in ("clang", "cc", "gcc") if shutil.which(nome)), None)
+        return [compilador] if compilador else None
+    if shutil.which("clang"):
+        return ["clang"]
+    if shutil.which("llc") and shutil.which("cc"):
+        return ["opt", "llc", "cc"] if shutil.which("opt") else ["llc", "cc"]
+    return None
+
+
+def _versao(ferramenta):
+    with _versoes_lock:
+        if ferramenta not in _versoes:
+            result = subprocess.run([ferramenta, "--version"], capture_output=True, text=True)
+            linhas = (result.stdout or result.stderr).strip().splitlines()
+            _versoes[ferramenta] = linhas[0] if linhas else ferramenta
+        return _versoes[ferramenta]
+
+
+def _hash_ferramentas(h, cadeia):
+    for ferramenta in cadeia:
+        h.update(_versao(ferramenta).encode("utf-8") + b"\0")
+    with open(RUNTIME_C, "rb") as f:
+        h.update(f.read())
+
+
+def chave(llvm_ir, nivel, cadeia):
+    h = hashlib.sha256()
+    _hash_ferramentas(h, cadeia)
+    h.update(f"-O{nivel}\0".encode("ascii"))
+    h.update(llvm_ir)
+    return h.hexdigest()
+
+
+def _rodar(comando):
+    try:
+        subprocess.run(comando, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        raise BuildError(f"{os.path.basename(comando[0])} falhou: {e.stderr.strip()}") from None
+
+
+#O C gerado conta com soma e multiplicação inteiras circulares, como o LLVM IR (-fwrapv)
+def _compilar_objeto(fonte, obj_path, nivel, cadeia):
+    if fonte.endswith(".c"):
+        _rodar([cadeia[0], f"-O{nivel}", "-fwrapv", "-c", fonte, "-o", obj_path])
+        return
+    if fonte.endswith(".s"):
+        _rodar(["as", fonte, "-o", obj_path] if cadeia[0] == "as" else [cadeia[0], "-c", fonte, "-o", obj_path])
+        return
+    if cadeia[0] == "clang":
+        _rodar(["clang", f"-O{nivel}", "-c", fonte, "-o", obj_path])
+        return
+    entrada = fonte
+    if "opt" in cadeia and nivel > 0:
+        entrada = obj_path + ".bc"
+        _rodar(["opt", f"-O{nivel}", fonte, "-o", entrada])
+    try:
+        _rodar(["llc", f"-O{nivel}", "-filetype=obj", entrada, "-o", obj_path])
+    finally:
+        if entrada != fonte and os.path.exists(entrada):
+            os.remove(entrada)
+
+
+#Objeto da runtime, compilado sempre com -O2 e uma vez só por versão da runtime e das
+#ferramentas; sem cache, fica numa pasta temporária do processo, apagada quando ele termina
+def _objeto_runtime(cadeia, pasta_cache):
+    global _pasta_runtime
+    with _runtime_lock:
+        if pasta_cache is None:
+            if _pasta_runtime is None:
+                _pasta_runtime = tempfile.mkdtemp(prefix="arara_runtime_")
+                atexit.register(shutil.rmtree, _pasta_runtime, ignore_errors=True)
+            pasta_cache = _pasta_runtime
+        h = hashlib.sha256(b"runtime\0")
+        _hash_ferramentas(h, cadeia)
+        obj_path = os.path.join(pasta_cache, f"runtime-{h.hexdigest()}.o")
+        if not os.path.exists(obj_path):
+            os.makedirs(pasta_cache, exist_ok=True)
+            _rodar([cadeia[-1], "-O2", "-c", RUNTIME_C, "-o", obj_path + ".tmp"])
+            os.replace(obj_path + ".tmp", obj_path)
+        return obj_path
+
+
+def _ligar(obj_path, exe_path, cadeia, pasta_cache):
+    runtime = _objeto_runtime(cadeia, pasta_cache)
+    if cadeia[0] == "clang":
+        _rodar(["clang", obj_path, runtime, "-o", exe_path] + LIGACAO_EXTRA)
+    else:
+        _rodar([cadeia[-1], "-no-pie", obj_path, runtime, "-o", exe_path])
+
+
+#Compila um .ll, .c ou .s para executável (por padrão ao lado dele, com o mesmo nome). Com
+#pasta_cache None o cache não é usado. Os arquivos do cache são escritos com nome temporário e
+#renomeados no fim, para builds paralelos do mesmo programa não verem arquivos pela metade.
+def compilar_nativo(fonte, exe_path=None, nivel=0, pasta_cache=CACHE_PADRAO):
+    base_fonte, extensao = os.path.splitext(fonte)
+    cadeia = ferramentas(extensao)
+    if cadeia is None and extensao == ".c":
+        raise BuildError("nenhum compilador C encontrado (clang, cc ou gcc)")
+    if cadeia is None and extensao == ".s":
+        raise BuildError("nenhum montador encontrado (as e cc, clang ou gcc)")
+    if cadeia is None:
+        raise BuildError("nenhum compilador nativo encontrado (clang, ou llc e cc)")
+    exe_path = exe_path or base_fonte + EXTENSAO
+    inicio = time.perf_counter()
+
+    if pasta_cache is None:
+        obj_path = exe_path + ".o"
+        _compilar_objeto(fonte, obj_path, nivel, cadeia)
+        _ligar(obj_path, exe_path, cadeia, None)
+        return ResultadoBuild(fonte, exe_path, time.perf_counter() - inicio)
+
+    with open(fonte, "rb") as f:
+        base = os.path.join(pasta_cache, chave(f.read(), nivel, cadeia))
+    em_cache = os.path.exists(base)
+    if not em_cache:
+        os.makedirs(pasta_cache, exist_ok=True)
+        temporario = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        if not os.path.exists(base + ".o"):
+            _compilar_objeto(fonte, base + ".o" + temporario, nivel, cadeia)
+            os.replace(base + ".o" + temporario, base + ".o")
+        _ligar(base + ".o", base + temporario, cadeia, pasta_cache)
+        os.replace(base + temporario, base)
+    shutil.copy2(base, exe_path)
+    return ResultadoBuild(fonte, exe_path, time.perf_counter() - inicio, em_cache)
+
+
+#Compila vários .ll/.c/.s independentes em paralelo; um erro num deles fica no seu resultado
+def compilar_varios(fontes, nivel=0, pasta_cache=CACHE_PADRAO, paralelos=None):
+    def compilar(fonte):
+        try:
+            return compilar_nativo(fonte, None, nivel, pasta_cache)
+        except (BuildError, OSError) as e:
+            return ResultadoBuild(fonte, erro=str(e))
+
+    with ThreadPoolExecutor(max_workers=paralelos or os.cpu_count()) as executor:
+        return list(executor.map(compilar, fontes))
@@ -0,0 +1,167 @@
+// Arquivo: src/runtime/arara_runtime.c
+
+// Biblioteca de runtime ligada aos executáveis gerados pelo compilador Arara.
+// A saída vai para um buffer que só é escrito (com write) quando enche, antes de
+// uma leitura que precisa esperar a entrada e no fim do programa. A entrada também
+// é lida em blocos e os inteiros são convertidos à mão, sem printf/scanf; os reais
+// passam por snprintf/strtod, mas também pelos buffers.
+// O formato é o mesmo do printf("%d ")/("%f ") e do scanf("%d")/("%lf") usados antes.
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#ifdef _WIN32
+#include <io.h>
+#define write _write
+#define read _read
+#else
+#include <unistd.h>
+#endif
+
+#define TAM_SAIDA 65536
+#define TAM_ENTRADA 65536
+// Maior inteiro escrito: '-2147483648' e o espaço
+#define TAM_INTEIRO 12
+// Maior real escrito com "%f " (1e308 tem 309 dígitos antes da vírgula) e maior número lido
+#define TAM_REAL 320
+#define TAM_NUMERO 64
+
+static char saida[TAM_SAIDA];
+static int usado_saida = 0;
+
+static char entrada[TAM_ENTRADA];
+static int pos_entrada = 0;
+static int fim_entrada = 0;
+
+
+static void escrever_tudo(const char *dados, int tamanho) {
+    while (tamanho > 0) {
+        int n = write(1, dados, tamanho);
+        if (n <= 0) {
+            return;
+        }
+        dados += n;
+        tamanho -= n;
+    }
+}
+
+void arara_flush(void) {
+    escrever_tudo(saida, usado_saida);
+    usado_saida = 0;
+}
+
+void arara_write_str(const char *texto, int tamanho) {
+    if (tamanho > TAM_SAIDA - usado_saida) {
+        arara_flush();
+        if (tamanho > TAM_SAIDA) {
+            escrever_tudo(texto, tamanho);
+            return;
+        }
+    }
+    memcpy(saida + usado_saida, texto, tamanho);
+    usado_saida += tamanho;
+}
+
+// Escreve o inteiro seguido de um espaço; os dígitos saem do fim para o começo
+void arara_write_int(int valor) {
+    char digitos[TAM_INTEIRO];
+    int i = TAM_INTEIRO;
+    unsigned int v = valor < 0 ? 0u - (unsigned int) valor : (unsigned int) valor;
+
+    if (TAM_SAIDA - usado_saida < TAM_INTEIRO) {
+        arara_flush();
+    }
+    digitos[--i] = ' ';
+    do {
+        digitos[--i] = (char) ('0' + v % 10);
+        v /= 10;
+    } while (v != 0);
+    if (valor < 0) {
+        digitos[--i] = '-';
+    }
+    memcpy(saida + usado_saida, digitos + i, TAM_INTEIRO - i);
+    usado_saida += TAM_INTEIRO - i;
+}
+
+void arara_write_real(double valor) {
+    char texto[TAM_REAL];
+    int n = snprintf(texto, sizeof texto, "%f ", valor);
+
+    arara_write_str(texto, n < (int) sizeof texto ? n : (int) sizeof texto - 1);
+}
+
+void arara_write_repeat(const char *texto, int tamanho, int vezes) {
+    for (int i = 0; i < vezes; i++) {
+        arara_write_str(texto, tamanho);
+    }
+}
+
+// Próximo byte da entrada sem consumi-lo, ou -1 no fim. Antes de esperar por mais
+// entrada a saída pendente é escrita, para as mensagens aparecerem antes da leitura.
+static int espiar(void) {
+    if (pos_entrada == fim_entrada) {
+        int n;
+        arara_flush();
+        n = read(0, entrada, TAM_ENTRADA);
+        if (n <= 0) {
+            return -1;
+        }
+        pos_entrada = 0;
+        fim_entrada = n;
+    }
+    return (unsigned char) entrada[pos_entrada];
+}
+
+static int pular_espacos(void) {
+    int c = espiar();
+
+    while (c == ' ' || c == '\n' || c == '\t' || c == '\r' || c == '\v' || c == '\f') {
+        pos_entrada++;
+        c = espiar();
+    }
+    return c;
+}
+
+// Lê um inteiro como scanf("%d"): pula espaços, aceita sinal e para no primeiro
+// caractere que não é dígito. Sem número na entrada, a variável fica com o valor atual.
+int arara_read_int(int atual) {
+    int c = pular_espacos();
+    int negativo = 0;
+    unsigned int valor = 0;
+
+    if (c == '-' || c == '+') {
+        negativo = c == '-';
+        pos_entrada++;
+        c = espiar();
+    }
+    if (c < '0' || c > '9') {
+        return atual;
+    }
+    while (c >= '0' && c <= '9') {
+        valor = valor * 10 + (unsigned int) (c - '0');
+        pos_entrada++;
+        c = espiar();
+    }
+    return negativo ? (int) (0u - valor) : (int) valor;
+}
+
+// Lê um real como scanf("%lf"): junta os caracteres que podem fazer parte do número
+// (dígitos, sinais, ponto e expoente) e converte com strtod
+double arara_read_real(double atual) {
+    char texto[TAM_NUMERO];
+    char *fim;
+    int n = 0;
+    int c = pular_espacos();
+    double valor;
+
+    while (n < TAM_NUMERO - 1 && ((c >= '0' && c <= '9') || c == '.' || c == '-' || c == '+'
+                                  || c == 'e' || c == 'E')) {
+        texto[n++] = (char) c;
+        pos_entrada++;
+        c = espiar();
+    }
+    texto[n] = '\0';
+    valor = strtod(texto, &fim);
+    return fim == texto ? atual : valor;
+}
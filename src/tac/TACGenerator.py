@@ -3,6 +3,9 @@
 from antlr4.tree.Tree import ParseTreeVisitor
 from grammar.generated.AraraParser import AraraParser
 
+SYMBOLS = {"ADD": "+", "SUB": "-", "MUL": "*", "DIV": "/", "EQ": "==", "NEQ": "!=",
+           "LT": "<", "LE": "<=", "GT": ">", "GE": ">=", "AND": "&&", "OR": "||"}
+
 class TACOperand:
 
     def __init__(self, type, value):
@@ -26,11 +29,13 @@ class TACOperand:
 
 class TACInstruction:
 
-    def __init__(self, opcode, result=None, arg1=None, arg2=None):
+    def __init__(self, opcode, result=None, arg1=None, arg2=None, position=None):
         self.opcode = opcode 
         self.result = result 
         self.arg1 = arg1    
         self.arg2 = arg2     
+        # (linha, coluna) do comando do .arara que gerou a instrução, para o perfil de execução
+        self.position = position
    
 
     def __str__(self):
@@ -46,34 +51,38 @@ class TACInstruction:
             return f"{self.result.value} = ! {self.arg1.value}"
         elif self.opcode == "IF_FALSE_GOTO":
             return f"IF_FALSE {self.arg1.value} GOTO {self.result.value}"
+        elif self.opcode == "IF_TRUE_GOTO":
+            return f"IF_TRUE {self.arg1.value} GOTO {self.result.value}"
+        elif self.opcode in ["IF_EQ", "IF_NE", "IF_LT", "IF_LE", "IF_GT", "IF_GE"]:
+            return f"{self.opcode} {self.arg1.value} {self.arg2.value} GOTO {self.result.value}"
         elif self.opcode == "GOTO":
             return f"GOTO {self.result.value}"
         elif self.opcode == "READ":
             return f"READ {self.result.value}"
         elif self.opcode == "WRITE":
             return f"WRITE {self.result.value}"
+        elif self.opcode == "WRITE_REPEAT":
+            return f"WRITE_REPEAT {self.result.value} {self.arg1.value}"
         else:
             return f"{self.opcode} {self.result} {self.arg1} {self.arg2}"
 
     def _get_symbol(self, opcode):
-        if opcode == "ADD": return "+"
-        if opcode == "SUB": return "-"
-        if opcode == "MUL": return "*"
-        if opcode == "DIV": return "/"
-        if opcode == "EQ": return "=="
-        if opcode == "NEQ": return "!="
-        if opcode == "LT": return "<"
-        if opcode == "LE": return "<="
-        if opcode == "GT": return ">"
-        if opcode == "GE": return ">="
-        if opcode == "AND": return "&&"
-        if opcode == "OR": return "||"
-        return ""
+        return SYMBOLS.get(opcode, "")
 
     #Herda a AST, executa intruções com base nos nós
 class TACGenerator(ParseTreeVisitor):
-    def __init__(self):
+    BRANCH_ON_TRUE = {'==': 'IF_EQ', '!=': 'IF_NE', '<': 'IF_LT', '<=': 'IF_LE', '>': 'IF_GT', '>=': 'IF_GE'}
+    BRANCH_ON_FALSE = {'==': 'IF_NE', '!=': 'IF_EQ', '<': 'IF_GE', '<=': 'IF_GT', '>': 'IF_LE', '>=': 'IF_LT'}
+    COMPARISONS = {'==': 'EQ', '!=': 'NEQ', '<': 'LT', '<=': 'LE', '>': 'GT', '>=': 'GE'}
+
+    #symbols: tabela de símbolos do programa (nome -> tipo Arara), para saber que comparações são de reais
+    def __init__(self, short_circuit=True, fuse_branches=True, reuse_temps=True, symbols=None):
         self.tac_instructions = []
+        self.short_circuit = short_circuit
+        self.fuse_branches = fuse_branches
+        self.reuse_temps = reuse_temps
+        self.symbols = symbols or {}
+        self.real_temps = set()
         self.temp_count = 0
         self.label_count = 0
         self.scope_manager = {} 
@@ -91,10 +100,28 @@ class TACGenerator(ParseTreeVisitor):
     def get_tac_code(self):
         return [str(instr) for instr in self.tac_instructions]
 
+    #Cada instrução fica com a posição do comando mais interno que a gerou; as do teste e do
+    #salto de volta de um laço (e do teste de um se) ficam com a posição do próprio enquanto (ou se)
+    def visit(self, tree):
+        if not isinstance(tree, AraraParser.ComandoContext):
+            return tree.accept(self)
+        inicio = len(self.tac_instructions)
+        result = tree.accept(self)
+        position = (tree.start.line, tree.start.column)
+        for instr in self.tac_instructions[inicio:]:
+            if instr.position is None:
+                instr.position = position
+        return result
+
     #Visits que percorrem a AST e convertem a expressão do nó em uma instrução
     def visitPrograma(self, ctx: AraraParser.ProgramaContext):
         for comando in ctx.comando():
             self.visit(comando)
+        # Temporárias mortas são reaproveitadas; quem for otimizar o TAC desliga isto
+        # e aplica o TempAllocator depois dos passes
+        if self.reuse_temps:
+            from src.tac.temp_allocator import TempAllocator
+            self.tac_instructions = TempAllocator().run(self.tac_instructions)
         return None
 
     def visitComandoLeia(self, ctx: AraraParser.ComandoLeiaContext):
@@ -113,6 +140,11 @@ class TACGenerator(ParseTreeVisitor):
         self.tac_instructions.append(TACInstruction('ASSIGN', TACOperand('ID', var_name), expr_result_operand))
         return None
 
+    def visitBloco(self, ctx: AraraParser.BlocoContext):
+        for comando in ctx.comando():
+            self.visit(comando)
+        return None
+
     def visitDeclaracao(self, ctx: AraraParser.DeclaracaoContext):
         
         return None
@@ -122,11 +154,9 @@ class TACGenerator(ParseTreeVisitor):
         label_else = self.next_label()
         label_fimse = self.next_label()
 
-      
-        condition_operand = self.visit(ctx.expressao())
 
-        # IF_FALSE_GOTO para o label_else se a condição for falsa
-        self.tac_instructions.append(TACInstruction('IF_FALSE_GOTO', label_else, condition_operand))
+        # Desvia para o label_else se a condição for falsa
+        self._branch_if_false(ctx.expressao(), label_else)
 
         # Visita o bloco THEN
         self.visit(ctx.bloco()) 
@@ -154,11 +184,8 @@ class TACGenerator(ParseTreeVisitor):
         # Adiciona o rótulo de início do loop
         self.tac_instructions.append(TACInstruction('LABEL', label_loop_start))
 
-        # Visita a expressão da condição do loop
-        condition_operand = self.visit(ctx.expressao())
-
-        # IF_FALSE_GOTO para o final do loop se a condição for falsa
-        self.tac_instructions.append(TACInstruction('IF_FALSE_GOTO', label_loop_end, condition_operand))
+        # Desvia para o final do loop se a condição for falsa
+        self._branch_if_false(ctx.expressao(), label_loop_end)
 
         # Visita o bloco do loop
         self.visit(ctx.bloco())
@@ -175,20 +202,123 @@ class TACGenerator(ParseTreeVisitor):
     def visitExpressao(self, ctx: AraraParser.ExpressaoContext):
         return self.visit(ctx.logica())
 
-    #bloco responsavel por constituir a logica 
+    #bloco responsavel por constituir a logica
+    #Em contexto de valor, '&&' e '||' produzem 0 ou 1 e só avaliam o lado direito quando necessário
     def visitLogica(self, ctx: AraraParser.LogicaContext):
+        if not ctx.logica_suf().OPLOG():
+            return self.visit(ctx.comparacao())
+
+        if self.short_circuit:
+            temp = self.next_temp()
+            label_fim = self.next_label()
+            self.tac_instructions.append(TACInstruction('ASSIGN', temp, TACOperand('LITERAL', 0)))
+            self._jump(ctx, label_fim, False)
+            self.tac_instructions.append(TACInstruction('ASSIGN', temp, TACOperand('LITERAL', 1)))
+            self.tac_instructions.append(TACInstruction('LABEL', label_fim))
+            return temp
+
+        # Avaliação completa dos dois lados, associando da esquerda para a direita
         left_operand = self.visit(ctx.comparacao())
-        if ctx.logica_suf() and ctx.logica_suf().OPLOG():
-            op = ctx.logica_suf().OPLOG().getText()
-            right_operand = self.visit(ctx.logica_suf().comparacao())
+        suf = ctx.logica_suf()
+        while suf.OPLOG():
+            op = suf.OPLOG().getText()
+            right_operand = self.visit(suf.comparacao())
             temp = self.next_temp()
             if op == '&&':
                 self.tac_instructions.append(TACInstruction('AND', temp, left_operand, right_operand))
             elif op == '||':
                 self.tac_instructions.append(TACInstruction('OR', temp, left_operand, right_operand))
-            return temp
+            left_operand = temp
+            suf = suf.logica_suf()
         return left_operand
 
+    #Código de desvio (jumping code) para condições de se/enquanto
+    def _branch_if_false(self, ctx: AraraParser.ExpressaoContext, label):
+        if self.short_circuit:
+            self._jump(ctx.logica(), label, False)
+        else:
+            condition_operand = self.visit(ctx)
+            self.tac_instructions.append(TACInstruction('IF_FALSE_GOTO', label, condition_operand))
+
+    #Salta para 'label' quando o valor da expressão lógica for igual a 'when'; senão segue em frente
+    def _jump(self, ctx: AraraParser.LogicaContext, label, when):
+        operandos = [ctx.comparacao()]
+        operadores = []
+        suf = ctx.logica_suf()
+        while suf.OPLOG():
+            operadores.append(suf.OPLOG().getText())
+            operandos.append(suf.comparacao())
+            suf = suf.logica_suf()
+        self._jump_chain(operandos, operadores, label, when)
+
+    #A cadeia 'a op b op c' associa à esquerda: ((a op b) op c)
+    def _jump_chain(self, operandos, operadores, label, when):
+        if not operadores:
+            self._jump_comparacao(operandos[0], label, when)
+            return
+        op = operadores[-1]
+        # '&&' falso ou '||' verdadeiro: qualquer lado decide e os dois saltam para o mesmo label
+        if (op == '&&') != when:
+            self._jump_chain(operandos[:-1], operadores[:-1], label, when)
+            self._jump_comparacao(operandos[-1], label, when)
+        else:
+            label_pula = self.next_label()
+            self._jump_chain(operandos[:-1], operadores[:-1], label_pula, not when)
+            self._jump_comparacao(operandos[-1], label, when)
+            self.tac_instructions.append(TACInstruction('LABEL', label_pula))
+
+    def _jump_comparacao(self, ctx: AraraParser.ComparacaoContext, label, when):
+        fator = self._single_fator(ctx)
+        if fator is not None:
+            self._jump_fator(fator, label, when)
+            return
+        if self.fuse_branches and ctx.comparacao_suf().OPCOMP():
+            # Comparação e desvio numa só instrução: 'IF_GE a b GOTO L' no lugar de '_t = a < b; IF_FALSE _t GOTO L'
+            op = ctx.comparacao_suf().OPCOMP().getText()
+            left_operand = self.visit(ctx.soma())
+            right_operand = self.visit(ctx.comparacao_suf().soma())
+            # Com NaN, 'a < b' falso não é 'a >= b': entre reais, o desvio no falso testa a própria comparação
+            if not when and (self._is_real(left_operand) or self._is_real(right_operand)):
+                temp = self.next_temp()
+                self.tac_instructions.append(TACInstruction(self.COMPARISONS[op], temp, left_operand, right_operand))
+                self._emit_branch(temp, label, when)
+                return
+            opcode = self.BRANCH_ON_TRUE[op] if when else self.BRANCH_ON_FALSE[op]
+            self.tac_instructions.append(TACInstruction(opcode, label, left_operand, right_operand))
+            return
+        self._emit_branch(self.visit(ctx), label, when)
+
+    #Parênteses e '!' são atravessados sem materializar valores
+    def _jump_fator(self, ctx: AraraParser.FatorContext, label, when):
+        if ctx.expressao():
+            self._jump(ctx.expressao().logica(), label, when)
+        elif ctx.NOT():
+            self._jump_fator(ctx.fator(), label, not when)
+        else:
+            self._emit_branch(self.visit(ctx), label, when)
+
+    def _emit_branch(self, condition_operand, label, when):
+        opcode = 'IF_TRUE_GOTO' if when else 'IF_FALSE_GOTO'
+        self.tac_instructions.append(TACInstruction(opcode, label, condition_operand))
+
+    #Variável declarada real ou temporária calculada a partir de um real (não há literais reais)
+    def _is_real(self, operand):
+        if operand.is_id():
+            return self.symbols.get(operand.value) == "real"
+        return operand.is_temp() and operand.value in self.real_temps
+
+    #Fator isolado de uma comparação sem operadores, ou None
+    def _single_fator(self, ctx: AraraParser.ComparacaoContext):
+        if ctx.comparacao_suf().OPCOMP():
+            return None
+        soma = ctx.soma()
+        if soma.soma_suf().getChildCount() != 0:
+            return None
+        termo = soma.termo()
+        if termo.termo_suf().getChildCount() != 0:
+            return None
+        return termo.fator()
+
     def visitComparacao(self, ctx: AraraParser.ComparacaoContext):
         left_operand = self.visit(ctx.soma())
         if ctx.comparacao_suf() and ctx.comparacao_suf().OPCOMP():
@@ -222,6 +352,8 @@ class TACGenerator(ParseTreeVisitor):
             self.tac_instructions.append(TACInstruction('ADD', temp, current_operand, next_operand))
         elif op == '-':
             self.tac_instructions.append(TACInstruction('SUB', temp, current_operand, next_operand))
+        if self._is_real(current_operand) or self._is_real(next_operand):
+            self.real_temps.add(temp.value)
         return self.visitar_soma_suf(ctx.soma_suf(), temp)
 
     def visitTermo(self, ctx: AraraParser.TermoContext):
@@ -240,6 +372,8 @@ class TACGenerator(ParseTreeVisitor):
             self.tac_instructions.append(TACInstruction('MUL', temp, current_operand, next_operand))
         elif op == '/':
             self.tac_instructions.append(TACInstruction('DIV', temp, current_operand, next_operand))
+        if self._is_real(current_operand) or self._is_real(next_operand):
+            self.real_temps.add(temp.value)
         return self.visitar_termo_suf(ctx.termo_suf(), temp)
 
     def _handle_arithmetic_suf(self, ctx, initial_operand):
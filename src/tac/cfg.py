@@ -0,0 +1,439 @@
+# Arquivo: src/tac/cfg.py
+
+import re
+
+from src.tac.TACGenerator import TACOperand, TACInstruction
+
+# Grafo de fluxo de controle (CFG) sobre a lista de instruções TAC,
+# com as análises usadas pelos passes de otimização: dominadores,
+# laços naturais e vivacidade (liveness) de variáveis e temporárias.
+
+DEF_OPCODES = ["ASSIGN", "ADD", "SUB", "MUL", "DIV", "EQ", "NEQ", "LT", "LE", "GT", "GE", "AND", "OR", "NOT", "READ"]
+PURE_OPCODES = ["ADD", "SUB", "MUL", "DIV", "EQ", "NEQ", "LT", "LE", "GT", "GE", "AND", "OR", "NOT"]
+#Operações cujo resultado é real quando algum operando é real (as demais dão inteiro ou booleano)
+ARITHMETIC_OPCODES = ["ADD", "SUB", "MUL", "DIV"]
+#Desvios de comparação fundidos: 'IF_LT a b GOTO L' salta quando a < b
+COMPARE_BRANCH = {"IF_EQ": "EQ", "IF_NE": "NEQ", "IF_LT": "LT", "IF_LE": "LE", "IF_GT": "GT", "IF_GE": "GE"}
+BRANCH_OPCODES = ["IF_FALSE_GOTO", "IF_TRUE_GOTO"] + list(COMPARE_BRANCH)
+JUMP_OPCODES = ["GOTO"] + BRANCH_OPCODES
+INVERSE_BRANCH = {"IF_FALSE_GOTO": "IF_TRUE_GOTO", "IF_TRUE_GOTO": "IF_FALSE_GOTO",
+                  "IF_EQ": "IF_NE", "IF_NE": "IF_EQ", "IF_LT": "IF_GE", "IF_GE": "IF_LT",
+                  "IF_LE": "IF_GT", "IF_GT": "IF_LE"}
+#Conjunto vazio compartilhado pelas análises, que guardam um conjunto por bloco
+EMPTY = frozenset()
+
+
+#Nome definido pela instrução (ID ou TEMP), ou None
+def instr_def(instr):
+    if instr.opcode in DEF_OPCODES:
+        return instr.result.value
+    return None
+
+#Nomes lidos pela instrução (IDs e TEMPs; literais e labels ficam de fora)
+def instr_uses(instr):
+    if instr.opcode == "WRITE":
+        operands = [instr.result]
+    elif instr.opcode in ["LABEL", "GOTO", "READ"]:
+        operands = []
+    else:
+        operands = [instr.arg1, instr.arg2]
+    return [op.value for op in operands if op is not None and (op.is_id() or op.is_temp())]
+
+
+class BasicBlock:
+
+    def __init__(self, index, instructions):
+        self.index = index
+        self.instructions = instructions
+        self.succs = []
+        self.preds = []
+
+    @property
+    def label(self):
+        if self.instructions and self.instructions[0].opcode == "LABEL":
+            return self.instructions[0].result.value
+        return None
+
+    @property
+    def terminator(self):
+        if self.instructions and self.instructions[-1].opcode in JUMP_OPCODES:
+            return self.instructions[-1]
+        return None
+
+    def falls_through(self):
+        term = self.terminator
+        return term is None or term.opcode != "GOTO"
+
+
+class Loop:
+
+    def __init__(self, header, body, latches):
+        self.header = header
+        self.body = body
+        self.latches = latches
+
+    #Blocos do laço com algum sucessor fora dele
+    def exiting_blocks(self, cfg):
+        return [b for b in sorted(self.body) if any(s not in self.body for s in cfg.blocks[b].succs)]
+
+    def exit_blocks(self, cfg):
+        return sorted({s for b in self.body for s in cfg.blocks[b].succs if s not in self.body})
+
+
+class ControlFlowGraph:
+
+    def __init__(self, tac_instructions):
+        self.blocks = []
+        self.label_block = {}
+        self._dominators = None
+        self._idom = None
+        self._liveness = None
+        self._build(tac_instructions)
+
+    #Divide a lista em blocos básicos: um bloco começa num LABEL e termina após um salto
+    def _build(self, tac_instructions):
+        current = []
+        for instr in tac_instructions:
+            if instr.opcode == "LABEL" and current:
+                self._new_block(current)
+                current = []
+            current.append(instr)
+            if instr.opcode in JUMP_OPCODES:
+                self._new_block(current)
+                current = []
+        if current or not self.blocks:
+            self._new_block(current)
+
+        for block in self.blocks:
+            for instr in block.instructions:
+                if instr.opcode == "LABEL":
+                    self.label_block[instr.result.value] = block.index
+
+        for block in self.blocks:
+            term = block.terminator
+            if term is not None:
+                self._add_edge(block.index, self.label_block[term.result.value])
+            if block.falls_through() and block.index + 1 < len(self.blocks):
+                self._add_edge(block.index, block.index + 1)
+
+    def _new_block(self, instructions):
+        self.blocks.append(BasicBlock(len(self.blocks), instructions))
+
+    def _add_edge(self, src, dst):
+        if dst not in self.blocks[src].succs:
+            self.blocks[src].succs.append(dst)
+            self.blocks[dst].preds.append(src)
+
+    def instructions(self):
+        return [instr for block in self.blocks for instr in block.instructions]
+
+    def reachable(self):
+        seen = {0}
+        pilha = [0]
+        while pilha:
+            for s in self.blocks[pilha.pop()].succs:
+                if s not in seen:
+                    seen.add(s)
+                    pilha.append(s)
+        return seen
+
+    #Dominador imediato de cada bloco pelo algoritmo de Cooper, Harvey e Kennedy, iterando em
+    #pós-ordem reversa, e a numeração de entrada/saída da árvore de dominadores (a domina b
+    #quando o intervalo de b está dentro do de a). Blocos inalcançáveis ficam sem entrada
+    def _dominator_tree(self):
+        if self._idom is not None:
+            return self._idom
+        postorder = []
+        seen = {0}
+        pilha = [(0, iter(self.blocks[0].succs))]
+        while pilha:
+            node, succs = pilha[-1]
+            for s in succs:
+                if s not in seen:
+                    seen.add(s)
+                    pilha.append((s, iter(self.blocks[s].succs)))
+                    break
+            else:
+                pilha.pop()
+                postorder.append(node)
+        number = {b: i for i, b in enumerate(postorder)}
+        order = postorder[::-1]
+        idom = {0: 0}
+        changed = True
+        while changed:
+            changed = False
+            for b in order[1:]:
+                new = None
+                for p in self.blocks[b].preds:
+                    if p not in idom:
+                        continue
+                    x, y = p, new if new is not None else p
+                    while x != y:
+                        while number[x] < number[y]:
+                            x = idom[x]
+                        while number[y] < number[x]:
+                            y = idom[y]
+                    new = x
+                if idom.get(b) != new:
+                    idom[b] = new
+                    changed = True
+        children = {b: [] for b in order}
+        for b in order[1:]:
+            children[idom[b]].append(b)
+        self._dom_interval = {}
+        contador = 0
+        pilha = [(0, False)]
+        while pilha:
+            node, fim = pilha.pop()
+            if fim:
+                self._dom_interval[node] = (self._dom_interval[node], contador)
+                continue
+            self._dom_interval[node] = contador
+            contador += 1
+            pilha.append((node, True))
+            pilha.extend((c, False) for c in children[node])
+        self._idom = idom
+        return idom
+
+    #Conjunto de dominadores de cada bloco: o do dominador imediato mais ele mesmo
+    def dominators(self):
+        if self._dominators is not None:
+            return self._dominators
+        idom = self._dominator_tree()
+        dom = {0: {0}}
+        for b in sorted(idom, key=lambda b: self._dom_interval[b][0])[1:]:
+            dom[b] = dom[idom[b]] | {b}
+        self._dominators = dom
+        return dom
+
+    def dominates(self, a, b):
+        self._dominator_tree()
+        if a not in self._dom_interval or b not in self._dom_interval:
+            return False
+        (a_in, a_out), (b_in, b_out) = self._dom_interval[a], self._dom_interval[b]
+        return a_in <= b_in and b_out <= a_out
+
+    #Laços naturais: uma aresta n -> h é de retorno quando h domina n.
+    #Laços com o mesmo cabeçalho são unidos; a lista sai dos mais internos para os externos.
+    def loops(self):
+        by_header = {}
+        for block in self.blocks:
+            for s in block.succs:
+                if self.dominates(s, block.index):
+                    body, latches = by_header.setdefault(s, ({s}, []))
+                    latches.append(block.index)
+                    pilha = [block.index]
+                    while pilha:
+                        n = pilha.pop()
+                        if n not in body:
+                            body.add(n)
+                            pilha.extend(self.blocks[n].preds)
+        loops = [Loop(h, body, latches) for h, (body, latches) in by_header.items()]
+        return sorted(loops, key=lambda loop: len(loop.body))
+
+    #Vivacidade por blocos (fluxo de dados para trás); devolve (live_in, live_out).
+    #Com 'names', só esses nomes são acompanhados (e o resultado não vai para o cache).
+    def liveness(self, names=None):
+        if names is None and self._liveness is not None:
+            return self._liveness
+        use, defs = [], []
+        for block in self.blocks:
+            u, d = set(), set()
+            for instr in block.instructions:
+                u.update(name for name in instr_uses(instr) if name not in d and (names is None or name in names))
+                name = instr_def(instr)
+                if name is not None and (names is None or name in names):
+                    d.add(name)
+            use.append(u or EMPTY)
+            defs.append(d or EMPTY)
+
+        live_in = [EMPTY] * len(self.blocks)
+        live_out = [EMPTY] * len(self.blocks)
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(self.blocks):
+                b = block.index
+                # Conjuntos que não mudam de um bloco para o vizinho são compartilhados, não copiados
+                if len(block.succs) == 1:
+                    out = live_in[block.succs[0]]
+                else:
+                    out = set()
+                    for s in block.succs:
+                        out |= live_in[s]
+                new_in = use[b] | (out - defs[b]) if use[b] or defs[b] else out
+                if out != live_out[b] or new_in != live_in[b]:
+                    live_out[b] = out or EMPTY
+                    live_in[b] = new_in or EMPTY
+                    changed = True
+        if names is not None:
+            return live_in, live_out
+        self._liveness = (live_in, live_out)
+        return self._liveness
+
+    #Definições que alcançam a entrada de cada bloco, restritas aos nomes dados.
+    #Cada definição é identificada pela posição da instrução na ordem linear.
+    def reaching_definitions(self, names):
+        gen, kill_names, pos = [], [], 0
+        for block in self.blocks:
+            last = {}
+            for instr in block.instructions:
+                name = instr_def(instr)
+                if name in names:
+                    last[name] = pos
+                pos += 1
+            gen.append({(name, p) for name, p in last.items()} or EMPTY)
+            kill_names.append(set(last) or EMPTY)
+
+        reach_in = [EMPTY] * len(self.blocks)
+        reach_out = list(gen)
+        changed = True
+        while changed:
+            changed = False
+            for block in self.blocks:
+                b = block.index
+                if len(block.preds) == 1:
+                    new_in = reach_out[block.preds[0]]
+                else:
+                    new_in = set()
+                    for p in block.preds:
+                        new_in |= reach_out[p]
+                new_out = gen[b] | {d for d in new_in if d[0] not in kill_names[b]} if gen[b] else new_in
+                if new_in != reach_in[b] or new_out != reach_out[b]:
+                    reach_in[b] = new_in or EMPTY
+                    reach_out[b] = new_out or EMPTY
+                    changed = True
+        return reach_in
+
+
+#CFG da lista, vindo do cache de análises do gerenciador de passes quando houver
+def build_cfg(tac_instructions, analyses=None):
+    if analyses is not None:
+        return analyses.cfg(tac_instructions)
+    return ControlFlowGraph(tac_instructions)
+
+
+#Nomes (IDs e TEMPs) que guardam valores do tipo real: as variáveis declaradas 'real' e o que
+#é calculado a partir delas por aritmética ou cópia, até um ponto fixo. Variáveis declaradas
+#'inteiro' continuam inteiras mesmo recebendo um real; uma temporária reaproveitada para os
+#dois tipos conta como real.
+def real_names(tac_instructions, symbols=None):
+    symbols = symbols or {}
+    real = {name for name, tipo in symbols.items() if tipo == "real"}
+    changed = True
+    while changed:
+        changed = False
+        for instr in tac_instructions:
+            name = instr_def(instr)
+            if (name is None or name in real or name in symbols
+                    or instr.opcode not in ARITHMETIC_OPCODES + ["ASSIGN"]):
+                continue
+            if any(use in real for use in instr_uses(instr)):
+                real.add(name)
+                changed = True
+    return real
+
+#Tipo de cada operando ID ou TEMP, lido ou definido, em ordem: (instrução, campo, é real).
+#Variáveis têm um tipo só (o de real_names); uma temporária reaproveitada para inteiros e
+#reais pelo alocador de temporárias tem, em cada uso, o tipo da última definição na ordem
+#linear, como no gerador de LLVM IR.
+def operand_types(tac_instructions, symbols=None):
+    real = real_names(tac_instructions, symbols)
+    current = {}
+    for instr in tac_instructions:
+        uses = {}
+        for slot in ["arg1", "arg2"] + (["result"] if instr.opcode in ["WRITE", "READ"] else []):
+            op = getattr(instr, slot)
+            if op is not None and (op.is_id() or op.is_temp()):
+                uses[slot] = op.value in real if op.is_id() else current.get(op.value, False)
+                yield instr, slot, uses[slot]
+        name = instr_def(instr)
+        if name is None or instr.opcode == "READ":
+            continue
+        if instr.result.is_id():
+            is_real = name in real
+        elif instr.opcode in ARITHMETIC_OPCODES:
+            is_real = any(uses.values())
+        elif instr.opcode == "ASSIGN":
+            is_real = uses.get("arg1", False)
+        else:
+            is_real = False
+        if instr.result.is_temp():
+            current[name] = is_real
+        yield instr, "result", is_real
+
+#Nomes reais do TAC, com a tabela de símbolos que o gerenciador de passes recebeu (se houver)
+def analysis_real_names(tac_instructions, analyses=None):
+    return real_names(tac_instructions, analyses.symbols if analyses is not None else None)
+
+
+#Gera nomes novos (temporárias, labels e variáveis internas) que não colidem com os já usados no TAC
+class NameFactory:
+
+    def __init__(self, tac_instructions):
+        self.used = {op.value for instr in tac_instructions for op in [instr.result, instr.arg1, instr.arg2]
+                     if op is not None and not op.is_literal()}
+        temps = [int(m.group(1)) for m in (re.fullmatch(r'_t(\d+)', name) for name in self.used) if m]
+        self.temp_count = max(temps) + 1 if temps else 0
+        self.counters = {}
+
+    def next_temp(self):
+        self.temp_count += 1
+        return TACOperand('TEMP', f'_t{self.temp_count-1}')
+
+    def _next(self, type, prefix):
+        n = self.counters.get(prefix, 0)
+        while f'{prefix}{n}' in self.used:
+            n += 1
+        self.counters[prefix] = n + 1
+        self.used.add(f'{prefix}{n}')
+        return TACOperand(type, f'{prefix}{n}')
+
+    def next_label(self, prefix='P'):
+        return self._next('LABEL', prefix)
+
+    #Variáveis criadas pelos passes levam '.' no nome, que não é válido em identificadores Arara
+    def next_var(self, prefix):
+        return self._next('ID', f'{prefix}.')
+
+
+#Insere as instruções num pré-cabeçalho logo antes do cabeçalho do laço e devolve a nova lista linear.
+#Saltos vindos de fora do laço passam a entrar pelo pré-cabeçalho.
+def insert_preheader(cfg, loop, instructions, names):
+    return insert_preheaders(cfg, {loop.header: (loop, instructions)}, names)
+
+#Vários pré-cabeçalhos de uma vez, sobre o mesmo CFG: 'preheaders' vai do cabeçalho de cada
+#laço para (laço, instruções); listas vazias não geram pré-cabeçalho
+def insert_preheaders(cfg, preheaders, names):
+    before = {}
+    for header, (loop, instructions) in preheaders.items():
+        if not instructions:
+            continue
+        header_label = cfg.blocks[header].label
+        preheader = list(instructions)
+        outside_jumps = [cfg.blocks[p].terminator for p in cfg.blocks[header].preds
+                         if p not in loop.body and cfg.blocks[p].terminator is not None
+                         and cfg.blocks[p].terminator.result.value == header_label]
+        if outside_jumps:
+            label = names.next_label('P')
+            preheader.insert(0, TACInstruction('LABEL', label))
+            for jump in outside_jumps:
+                jump.result = label
+        before[header] = preheader
+
+    result = []
+    for block in cfg.blocks:
+        result.extend(before.get(block.index, []))
+        result.extend(block.instructions)
+    return result
+
+#O pré-cabeçalho só pode ser colocado antes do cabeçalho se o bloco anterior não
+#pertencer ao laço e cair nele
+def has_preheader_slot(cfg, loop):
+    if cfg.blocks[loop.header].label is None:
+        return False
+    if loop.header > 0:
+        previous = cfg.blocks[loop.header - 1]
+        if previous.falls_through() and previous.index in loop.body:
+            return False
+    return True
@@ -0,0 +1,120 @@
+# Arquivo: src/tac/compact.py
+
+from array import array
+
+from src.tac.TACGenerator import TACOperand, TACInstruction, SYMBOLS
+
+# Representação compacta do TAC (struct-of-arrays) para programas grandes.
+# Cada instrução ocupa um byte de opcode e três índices numa tabela de operandos
+# internados: operandos iguais (mesmo tipo e valor) são guardados uma única vez.
+# A iteração devolve TACInstruction comuns, então os passes existentes continuam
+# funcionando sobre list(store) e o resultado volta com CompactTAC.from_instructions.
+# A posição no fonte de cada instrução fica em duas colunas (linha 0 = sem posição).
+
+OPCODES = ["LABEL", "ASSIGN", "ADD", "SUB", "MUL", "DIV", "EQ", "NEQ", "LT", "LE", "GT", "GE", "AND", "OR",
+           "NOT", "IF_FALSE_GOTO", "IF_TRUE_GOTO", "IF_EQ", "IF_NE", "IF_LT", "IF_LE", "IF_GT", "IF_GE",
+           "GOTO", "READ", "WRITE", "WRITE_REPEAT"]
+OPCODE_INDEX = {opcode: i for i, opcode in enumerate(OPCODES)}
+
+#Formato textual de cada opcode, igual ao de TACInstruction.__str__ ({0} = result, {1} = arg1, {2} = arg2)
+FORMATS = {"LABEL": "{0}:", "ASSIGN": "{0} = {1}", "NOT": "{0} = ! {1}",
+           "IF_FALSE_GOTO": "IF_FALSE {1} GOTO {0}", "IF_TRUE_GOTO": "IF_TRUE {1} GOTO {0}",
+           "GOTO": "GOTO {0}", "READ": "READ {0}", "WRITE": "WRITE {0}",
+           "WRITE_REPEAT": "WRITE_REPEAT {0} {1}"}
+for _opcode, _symbol in SYMBOLS.items():
+    FORMATS[_opcode] = "{0} = {1} " + _symbol + " {2}"
+for _opcode in ["IF_EQ", "IF_NE", "IF_LT", "IF_LE", "IF_GT", "IF_GE"]:
+    FORMATS[_opcode] = _opcode + " {1} {2} GOTO {0}"
+FORMAT_TABLE = [FORMATS[opcode] for opcode in OPCODES]
+
+NO_OPERAND = 0
+NO_LINE = 0
+
+
+#Tabela de operandos internados; o índice 0 representa a ausência de operando
+class OperandTable:
+
+    def __init__(self):
+        self.operands = [None]
+        self.texts = [""]
+        self.index = {}
+
+    def intern(self, operand):
+        if operand is None:
+            return NO_OPERAND
+        key = (operand.type, operand.value)
+        i = self.index.get(key)
+        if i is None:
+            i = len(self.operands)
+            self.index[key] = i
+            self.operands.append(TACOperand(operand.type, operand.value))
+            self.texts.append(str(operand.value))
+        return i
+
+    def __len__(self):
+        return len(self.operands) - 1
+
+
+class CompactTAC:
+
+    def __init__(self):
+        self.operands = OperandTable()
+        self.opcodes = array('B')
+        self.results = array('I')
+        self.args1 = array('I')
+        self.args2 = array('I')
+        self.position_lines = array('I')
+        self.position_columns = array('I')
+
+    @classmethod
+    def from_instructions(cls, tac_instructions):
+        store = cls()
+        for instr in tac_instructions:
+            store.append(instr)
+        return store
+
+    def append(self, instr):
+        intern = self.operands.intern
+        self.opcodes.append(OPCODE_INDEX[instr.opcode])
+        self.results.append(intern(instr.result))
+        self.args1.append(intern(instr.arg1))
+        self.args2.append(intern(instr.arg2))
+        line, column = instr.position or (NO_LINE, 0)
+        self.position_lines.append(line)
+        self.position_columns.append(column)
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def __getitem__(self, i):
+        table = self.operands.operands
+        line = self.position_lines[i]
+        return TACInstruction(OPCODES[self.opcodes[i]], table[self.results[i]],
+                              table[self.args1[i]], table[self.args2[i]],
+                              (line, self.position_columns[i]) if line != NO_LINE else None)
+
+    #Visão iterável: cada instrução é materializada como TACInstruction, com os operandos
+    #compartilhados da tabela (os passes trocam operandos, nunca os alteram)
+    def __iter__(self):
+        table = self.operands.operands
+        for op, r, a, b, line, column in zip(self.opcodes, self.results, self.args1, self.args2,
+                                             self.position_lines, self.position_columns):
+            yield TACInstruction(OPCODES[op], table[r], table[a], table[b],
+                                 (line, column) if line != NO_LINE else None)
+
+    def to_instructions(self):
+        return list(self)
+
+    def format(self, i):
+        texts = self.operands.texts
+        return FORMAT_TABLE[self.opcodes[i]].format(texts[self.results[i]], texts[self.args1[i]], texts[self.args2[i]])
+
+    def lines(self):
+        texts = self.operands.texts
+        for op, r, a, b in zip(self.opcodes, self.results, self.args1, self.args2):
+            yield FORMAT_TABLE[op].format(texts[r], texts[a], texts[b])
+
+    #Bytes ocupados pelos arrays de instruções (sem a tabela de operandos)
+    def nbytes(self):
+        return sum(len(a) * a.itemsize for a in [self.opcodes, self.results, self.args1, self.args2,
+                                                  self.position_lines, self.position_columns])
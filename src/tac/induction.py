@@ -0,0 +1,294 @@
+# Arquivo: src/tac/induction.py
+
+from collections import Counter
+
+from src.tac.TACGenerator import TACOperand, TACInstruction
+from src.tac.cfg import (build_cfg, NameFactory, instr_def, instr_uses, analysis_real_names,
+                         insert_preheaders, has_preheader_slot, COMPARE_BRANCH)
+
+INT32_LIMIT = 2 ** 31
+#Desvio equivalente com os operandos trocados ('a < b' é 'b > a'); multiplicar por k < 0 também troca
+SWAPPED_BRANCH = {"IF_EQ": "IF_EQ", "IF_NE": "IF_NE", "IF_LT": "IF_GT", "IF_GT": "IF_LT",
+                  "IF_LE": "IF_GE", "IF_GE": "IF_LE"}
+#Saída do laço que, com passo positivo (negativo), para a primeira vez que 'i' passa do limite
+UPWARD_EXITS = {"IF_GE": 0, "IF_GT": 1}
+DOWNWARD_EXITS = {"IF_LE": 0, "IF_LT": -1}
+
+
+#Variável de indução básica: só é alterada no laço por 'v = v + c' / 'v = v - c'
+class BasicInduction:
+
+    def __init__(self, name):
+        self.name = name
+        self.updates = []   # pares (instrução da soma, ASSIGN que grava em v)
+
+    @property
+    def step(self):
+        steps = {self._step(add) for add, _ in self.updates}
+        return steps.pop() if len(steps) == 1 else None
+
+    def _step(self, add):
+        literal = add.arg2 if add.arg2.is_literal() else add.arg1
+        return literal.value if add.opcode == "ADD" else -literal.value
+
+
+#Redução de força sobre variáveis de indução.
+#Multiplicações 'i * k' (k constante ou invariante) de uma variável de indução básica 'i'
+#viram uma variável derivada atualizada por somas a cada incremento de 'i'.
+#Quando o teste de saída pode passar para a derivada sem estouro, a variável básica fica só
+#com o próprio incremento e é removida.
+#Valores reais ficam de fora: somar k a cada passo não dá o mesmo arredondamento que 'i * k'.
+#Cada construção do CFG serve a todos os laços; um laço que contém outro já reescrito na
+#mesma rodada fica para a rodada seguinte.
+class InductionVariableStrengthReduction:
+    name = "ivsr"
+
+    def __init__(self):
+        self.real = set()
+
+    def run(self, tac_instructions, analyses=None):
+        names = NameFactory(tac_instructions)
+        self.real = analysis_real_names(tac_instructions, analyses)
+        changed = True
+        while changed:
+            changed = False
+            cfg = build_cfg(tac_instructions, analyses)
+            preheaders = {}
+            touched = set()
+            # A vivacidade do começo da rodada só perde usos com as reescritas, então continua
+            # valendo (de forma conservadora) para os laços seguintes
+            for loop in cfg.loops():
+                if touched & loop.body or not has_preheader_slot(cfg, loop):
+                    continue
+                preheader = self._reduce(cfg, loop, names)
+                removed = self._remove_dead(cfg, loop)
+                if preheader is not None or removed:
+                    preheaders[loop.header] = (loop, preheader or [])
+                    touched |= loop.body
+                    changed = True
+            if changed:
+                tac_instructions = insert_preheaders(cfg, preheaders, names)
+        return tac_instructions
+
+    def _loop_defs(self, cfg, loop):
+        return Counter(instr_def(instr) for b in loop.body for instr in cfg.blocks[b].instructions)
+
+    #Encontra as variáveis de indução básicas do laço
+    def _basic_inductions(self, cfg, loop, defs):
+        candidates = {}
+        for b in loop.body:
+            instructions = cfg.blocks[b].instructions
+            for pos, instr in enumerate(instructions):
+                name = instr_def(instr)
+                if name is None or not instr.result.is_id():
+                    continue
+                iv = candidates.setdefault(name, BasicInduction(name))
+                if iv is None:
+                    continue
+                add = instructions[pos - 1] if pos > 0 else None
+                if (instr.opcode == "ASSIGN" and instr.arg1.is_temp() and add is not None
+                        and instr_def(add) == instr.arg1.value and defs[instr.arg1.value] == 1
+                        and self._is_step(add, name)):
+                    iv.updates.append((add, instr))
+                else:
+                    candidates[name] = None
+        return {name: iv for name, iv in candidates.items() if iv is not None and iv.step is not None}
+
+    def _is_step(self, instr, name):
+        if instr.opcode == "ADD":
+            pairs = [(instr.arg1, instr.arg2), (instr.arg2, instr.arg1)]
+        elif instr.opcode == "SUB":
+            pairs = [(instr.arg1, instr.arg2)]
+        else:
+            return False
+        return any(v.is_id() and v.value == name and c.is_literal() and isinstance(c.value, int) for v, c in pairs)
+
+    #Fator k de 'i * k': literal inteiro ou nome sem definições no laço
+    def _derived_factor(self, instr, inductions, defs):
+        if instr.opcode != "MUL" or not instr.result.is_temp():
+            return None
+        for v, k in [(instr.arg1, instr.arg2), (instr.arg2, instr.arg1)]:
+            if not (v.is_id() and v.value in inductions) or k.value in self.real:
+                continue
+            if k.is_literal() and isinstance(k.value, int):
+                return v.value, k
+            if (k.is_id() or k.is_temp()) and k.value not in defs:
+                return v.value, k
+        return None
+
+    #Todos os usos da temporária ficam no mesmo bloco, depois da definição e antes de 'i' mudar
+    def _uses_are_local(self, instructions, pos, temp, induction, live_out):
+        if temp in live_out:
+            return False
+        redefined = False
+        for instr in instructions[pos + 1:]:
+            if redefined and temp in instr_uses(instr):
+                return False
+            if instr_def(instr) == induction:
+                redefined = True
+        return True
+
+    def _reduce(self, cfg, loop, names):
+        defs = self._loop_defs(cfg, loop)
+        inductions = {name: iv for name, iv in self._basic_inductions(cfg, loop, defs).items()
+                      if name not in self.real}
+        if not inductions:
+            return None
+        live_in, live_out = cfg.liveness()
+
+        derived = {}    # (i, k) -> lista de (bloco, instrução MUL)
+        for b in sorted(loop.body):
+            instructions = cfg.blocks[b].instructions
+            for pos, instr in enumerate(instructions):
+                found = self._derived_factor(instr, inductions, defs)
+                if found is None or defs[instr.result.value] != 1:
+                    continue
+                induction, factor = found
+                if not self._uses_are_local(instructions, pos, instr.result.value, induction, live_out[b]):
+                    continue
+                if factor.is_literal() and abs(inductions[induction].step * factor.value) >= INT32_LIMIT:
+                    continue
+                key = (induction, factor.type, factor.value)
+                derived.setdefault(key, []).append((b, instr))
+
+        if not derived:
+            return None
+
+        preheader = []
+        literal_derived = {}
+        for (induction, factor_type, factor_value), muls in derived.items():
+            factor = TACOperand(factor_type, factor_value)
+            iv = inductions[induction]
+            derived_var = names.next_var('iv')
+            if factor.is_literal() and factor.value != 0:
+                literal_derived.setdefault(induction, (derived_var, factor.value))
+
+            # Valor inicial no pré-cabeçalho: iv = i * k (no fonte, onde estava a multiplicação)
+            position = muls[0][1].position
+            initial = names.next_temp()
+            preheader.append(TACInstruction('MUL', initial, TACOperand('ID', induction), factor, position=position))
+            preheader.append(TACInstruction('ASSIGN', derived_var, initial, position=position))
+
+            # Incremento da derivada: passo * k, calculado em tempo de compilação quando possível
+            if factor.is_literal():
+                increment = TACOperand('LITERAL', iv.step * factor.value)
+            elif iv.step == 1:
+                increment = factor
+            else:
+                increment = names.next_temp()
+                preheader.append(TACInstruction('MUL', increment, factor, TACOperand('LITERAL', iv.step),
+                                                position=position))
+
+            # Após cada atualização de i, atualiza a derivada
+            for b in loop.body:
+                instructions = cfg.blocks[b].instructions
+                for _, assign in iv.updates:
+                    if assign in instructions:
+                        temp = names.next_temp()
+                        pos = instructions.index(assign) + 1
+                        instructions[pos:pos] = [TACInstruction('ADD', temp, derived_var, increment,
+                                                                position=assign.position),
+                                                 TACInstruction('ASSIGN', derived_var, temp,
+                                                                position=assign.position)]
+
+            # Os usos de cada 'i * k' passam a ler a derivada e a multiplicação sai
+            for b, mul in muls:
+                instructions = cfg.blocks[b].instructions
+                temp = mul.result.value
+                for instr in instructions:
+                    for slot in ['result', 'arg1', 'arg2']:
+                        op = getattr(instr, slot)
+                        if op is not None and op.is_temp() and op.value == temp and instr is not mul:
+                            setattr(instr, slot, derived_var)
+                instructions.remove(mul)
+
+        for induction, (derived_var, factor) in literal_derived.items():
+            self._rewrite_exit(cfg, loop, inductions[induction], derived_var, factor, live_in)
+        return preheader
+
+    #Troca o teste de saída 'i < n' (no cabeçalho) por 'iv < n * k' quando 'i' só é usado no
+    #teste e no incremento e não é lido depois do laço. Com inteiros de 32 bits que dão a volta,
+    #os testes só são equivalentes sem estouro: o valor inicial de 'i', o limite e k precisam ser
+    #literais e todos os valores de 'i * k' e 'n * k' caber em 32 bits
+    def _rewrite_exit(self, cfg, loop, iv, derived_var, factor, live_in):
+        branch = cfg.blocks[loop.header].terminator
+        if branch is None or branch.opcode not in COMPARE_BRANCH or len(iv.updates) != 1:
+            return
+        if cfg.label_block[branch.result.value] in loop.body:
+            return
+        if any(instr_def(instr) is not None for instr in cfg.blocks[loop.header].instructions):
+            return
+        name = iv.name
+        if branch.arg1.is_id() and branch.arg1.value == name:
+            opcode, bound = branch.opcode, branch.arg2
+        elif branch.arg2.is_id() and branch.arg2.value == name:
+            opcode, bound = SWAPPED_BRANCH[branch.opcode], branch.arg1
+        else:
+            return
+        if not (bound.is_literal() and isinstance(bound.value, int)):
+            return
+        if any(name in live_in[e] for e in loop.exit_blocks(cfg)):
+            return
+        update_instrs = [instr for pair in iv.updates for instr in pair]
+        if any(name in instr_uses(instr) for b in loop.body for instr in cfg.blocks[b].instructions
+               if instr not in update_instrs and instr is not branch):
+            return
+        start = self._initial_value(cfg, loop, name)
+        if start is None:
+            return
+
+        # Valores de 'i' no cabeçalho: do inicial até o primeiro que sai do laço ('i >= limite'
+        # subindo, 'i <= limite' descendo)
+        step, n = iv.step, bound.value
+        if step > 0 and opcode in UPWARD_EXITS:
+            limit = n + UPWARD_EXITS[opcode]
+            last = start if start >= limit else start + ((limit - 1 - start) // step + 1) * step
+        elif step < 0 and opcode in DOWNWARD_EXITS:
+            limit = n + DOWNWARD_EXITS[opcode]
+            last = start if start <= limit else start + ((start - limit - 1) // -step + 1) * step
+        else:
+            return
+        if not all(-INT32_LIMIT <= value < INT32_LIMIT for value in (last, start * factor, last * factor, n * factor)):
+            return
+        branch.opcode = opcode if factor > 0 else SWAPPED_BRANCH[opcode]
+        branch.arg1 = derived_var
+        branch.arg2 = TACOperand('LITERAL', n * factor)
+
+    #Literal atribuído a 'name' antes do laço, seguindo para trás os blocos com um só antecessor
+    def _initial_value(self, cfg, loop, name):
+        outside = [p for p in cfg.blocks[loop.header].preds if p not in loop.body]
+        if len(outside) != 1:
+            return None
+        b, seen = outside[0], set()
+        while b not in seen:
+            seen.add(b)
+            for instr in reversed(cfg.blocks[b].instructions):
+                if instr_def(instr) == name:
+                    if instr.opcode == "ASSIGN" and instr.arg1.is_literal() and isinstance(instr.arg1.value, int):
+                        return instr.arg1.value
+                    return None
+            if len(cfg.blocks[b].preds) != 1:
+                return None
+            b = cfg.blocks[b].preds[0]
+        return None
+
+    #Remove variáveis de indução básicas cujo único uso no laço é o próprio incremento
+    #e que não são lidas depois do laço
+    def _remove_dead(self, cfg, loop):
+        defs = self._loop_defs(cfg, loop)
+        inductions = self._basic_inductions(cfg, loop, defs)
+        live_in, _ = cfg.liveness()
+        exits = loop.exit_blocks(cfg)
+        removed = False
+        for name, iv in inductions.items():
+            if any(name in live_in[e] for e in exits):
+                continue
+            update_instrs = [instr for pair in iv.updates for instr in pair]
+            if any(name in instr_uses(instr) for b in loop.body for instr in cfg.blocks[b].instructions
+                   if instr not in update_instrs):
+                continue
+            for b in loop.body:
+                instructions = cfg.blocks[b].instructions
+                instructions[:] = [instr for instr in instructions if instr not in update_instrs]
+            removed = True
+        return removed
@@ -0,0 +1,73 @@
+# Arquivo: src/tac/licm.py
+
+from collections import Counter
+
+from src.tac.cfg import (build_cfg, NameFactory, PURE_OPCODES, instr_def, instr_uses,
+                         insert_preheaders, has_preheader_slot)
+
+
+#Movimentação de código invariante de laço (LICM).
+#Cálculos puros cujos operandos não mudam dentro do laço são retirados do corpo
+#e colocados num pré-cabeçalho, executado uma única vez antes da entrada do laço.
+#Uma construção do CFG serve a todos os laços: o que sai de um laço interno fica no pré-cabeçalho
+#dele, que é parte do corpo do laço externo e pode seguir subindo na mesma rodada.
+class LoopInvariantCodeMotion:
+    name = "licm"
+    #Cada rodada já tira tudo o que puder; outra só pega o que dependia de algo que apareceu depois
+    #na ordem dos blocos
+    MAX_ROUNDS = 3
+
+    def run(self, tac_instructions, analyses=None):
+        names = NameFactory(tac_instructions)
+        for _ in range(self.MAX_ROUNDS):
+            cfg = build_cfg(tac_instructions, analyses)
+            preheaders = {}
+            # Laços internos primeiro: o que sai deles pode seguir subindo para o laço externo
+            for loop in cfg.loops():
+                preheaders[loop.header] = (loop, self._hoist(cfg, loop, preheaders))
+            if not any(hoisted for _, hoisted in preheaders.values()):
+                break
+            tac_instructions = insert_preheaders(cfg, preheaders, names)
+        return tac_instructions
+
+    #Instruções do laço, bloco a bloco; antes de cada cabeçalho de laço interno vem o pré-cabeçalho dele
+    def _body(self, cfg, loop, preheaders):
+        for b in sorted(loop.body):
+            if b != loop.header and b in preheaders:
+                yield b, preheaders[b][1]
+            yield b, cfg.blocks[b].instructions
+
+    def _hoist(self, cfg, loop, preheaders):
+        if not has_preheader_slot(cfg, loop):
+            return []
+
+        live_in, _ = cfg.liveness()
+        defs_in_loop = Counter(instr_def(instr) for _, instructions in self._body(cfg, loop, preheaders)
+                               for instr in instructions)
+        exiting = loop.exiting_blocks(cfg)
+        exits = loop.exit_blocks(cfg)
+
+        hoisted = []
+        hoisted_names = set()
+        for b, instructions in self._body(cfg, loop, preheaders):
+            # O pré-cabeçalho de um laço interno roda sempre que o cabeçalho dele é alcançado de fora
+            always_runs = all(cfg.dominates(b, e) for e in exiting)
+            for instr in list(instructions):
+                if instr.opcode not in PURE_OPCODES or not instr.result.is_temp():
+                    continue
+                temp = instr.result.value
+                if defs_in_loop[temp] != 1 or temp in live_in[loop.header]:
+                    continue
+                if any(name in defs_in_loop and name not in hoisted_names for name in instr_uses(instr)):
+                    continue
+                if not always_runs:
+                    # Executar especulativamente só é seguro se não houver divisão
+                    # (pode falhar) e se o valor não for observado na saída do laço
+                    if instr.opcode == "DIV" and not (instr.arg2.is_literal() and instr.arg2.value != 0):
+                        continue
+                    if any(temp in live_in[e] for e in exits):
+                        continue
+                instructions.remove(instr)
+                hoisted.append(instr)
+                hoisted_names.add(temp)
+        return hoisted
@@ -0,0 +1,102 @@
+# Arquivo: src/tac/pass_manager.py
+
+import time
+
+from src.tac.cfg import ControlFlowGraph
+from src.tac.licm import LoopInvariantCodeMotion
+from src.tac.induction import InductionVariableStrengthReduction
+from src.tac.peephole import PeepholeOptimizer
+from src.tac.temp_allocator import TempAllocator
+from src.tac.write_coalescing import WriteCoalescing
+
+# Gerenciador de passes sobre o TAC: roda um pipeline configurável, mede o tempo e a
+# variação no número de instruções de cada passe e mantém um cache de análises
+# (o CFG, com dominadores e vivacidade) que passa de um passe para o seguinte
+# enquanto o código não muda.
+
+#Passes de cada nível de otimização (-O0, -O1, -O2)
+PIPELINES = {
+    0: [],
+    1: [WriteCoalescing, PeepholeOptimizer, TempAllocator],
+    2: [LoopInvariantCodeMotion, InductionVariableStrengthReduction, WriteCoalescing, PeepholeOptimizer,
+        TempAllocator],
+}
+
+
+#Identifica o conteúdo atual da lista: as instruções e os operandos que elas apontam
+def fingerprint(tac_instructions):
+    return tuple((id(instr), instr.opcode, id(instr.result), id(instr.arg1), id(instr.arg2))
+                 for instr in tac_instructions)
+
+
+#Além do CFG, leva a tabela de símbolos do programa (nome -> tipo Arara), que os passes
+#consultam para não tratar valores reais como inteiros
+class AnalysisCache:
+
+    def __init__(self, symbols=None):
+        self.symbols = symbols or {}
+        self._cfg = None
+        self._key = None
+        self.hits = 0
+        self.misses = 0
+
+    #CFG da lista; reaproveitado se nem a lista nem o CFG guardado mudaram desde a construção
+    def cfg(self, tac_instructions):
+        key = fingerprint(tac_instructions)
+        if self._cfg is not None and key == self._key and fingerprint(self._cfg.instructions()) == key:
+            self.hits += 1
+            return self._cfg
+        self.misses += 1
+        self._cfg = ControlFlowGraph(tac_instructions)
+        self._key = key
+        return self._cfg
+
+    def invalidate(self):
+        self._cfg = None
+        self._key = None
+
+
+class PassStats:
+
+    def __init__(self, name, seconds, before, after, changed):
+        self.name = name
+        self.seconds = seconds
+        self.before = before
+        self.after = after
+        self.changed = changed
+
+    @property
+    def delta(self):
+        return self.after - self.before
+
+
+class PassManager:
+
+    def __init__(self, passes, symbols=None):
+        self.passes = passes
+        self.analyses = AnalysisCache(symbols)
+        self.stats = []
+
+    @classmethod
+    def for_level(cls, level, symbols=None):
+        return cls([tac_pass() for tac_pass in PIPELINES[level]], symbols)
+
+    def run(self, tac_instructions):
+        for tac_pass in self.passes:
+            before = fingerprint(tac_instructions)
+            inicio = time.perf_counter()
+            tac_instructions = tac_pass.run(tac_instructions, self.analyses)
+            decorrido = time.perf_counter() - inicio
+            changed = fingerprint(tac_instructions) != before
+            self.stats.append(PassStats(tac_pass.name, decorrido, len(before), len(tac_instructions), changed))
+        return tac_instructions
+
+    def report(self):
+        linhas = [f"{'passe':<10} {'tempo (ms)':>11} {'antes':>8} {'depois':>8} {'delta':>7}  alterou"]
+        for s in self.stats:
+            linhas.append(f"{s.name:<10} {s.seconds * 1000:>11.2f} {s.before:>8} {s.after:>8} {s.delta:>+7}  "
+                          f"{'sim' if s.changed else 'não'}")
+        total = sum(s.seconds for s in self.stats)
+        linhas.append(f"{'total':<10} {total * 1000:>11.2f}")
+        linhas.append(f"cache de análises: {self.analyses.hits} acertos, {self.analyses.misses} construções do CFG")
+        return "\n".join(linhas)
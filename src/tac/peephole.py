@@ -0,0 +1,134 @@
+# Arquivo: src/tac/peephole.py
+
+from src.tac.TACGenerator import TACInstruction
+from src.tac.cfg import BRANCH_OPCODES, COMPARE_BRANCH, JUMP_OPCODES, INVERSE_BRANCH, analysis_real_names
+
+
+#Otimizador peephole de saltos, aplicado até um ponto fixo:
+# - labels consecutivos viram um só
+# - saltos para um label seguido de GOTO vão direto ao destino final (jump threading)
+# - 'IF_FALSE c GOTO L1; GOTO L2; L1:' vira 'IF_TRUE c GOTO L2; L1:' (inversão de desvio; não
+#   para comparações de reais, em que com NaN o contrário de '<' não é '>=')
+# - saltos para a instrução seguinte e código após GOTO sem label são removidos
+# - labels sem nenhum salto para eles são removidos, unindo blocos
+class PeepholeOptimizer:
+    name = "peephole"
+
+    def __init__(self):
+        self.real = set()
+
+    def run(self, tac_instructions, analyses=None):
+        self.real = analysis_real_names(tac_instructions, analyses)
+        steps = [self._merge_labels, self._thread_jumps, self._invert_branches,
+                 self._remove_jumps_to_next, self._remove_unreachable, self._remove_unused_labels]
+        changed = True
+        while changed:
+            changed = False
+            for step in steps:
+                tac_instructions, step_changed = step(tac_instructions)
+                changed = changed or step_changed
+        return tac_instructions
+
+    def _retarget(self, tac_instructions, aliases):
+        for instr in tac_instructions:
+            if instr.opcode in JUMP_OPCODES and instr.result.value in aliases:
+                instr.result = aliases[instr.result.value]
+
+    def _merge_labels(self, tac_instructions):
+        result = []
+        aliases = {}
+        for instr in tac_instructions:
+            if instr.opcode == "LABEL" and result and result[-1].opcode == "LABEL":
+                aliases[instr.result.value] = result[-1].result
+                continue
+            result.append(instr)
+        self._retarget(result, aliases)
+        return result, bool(aliases)
+
+    #Primeira instrução que não é label a partir de cada label
+    def _label_targets(self, tac_instructions):
+        targets = {}
+        pending = []
+        for instr in tac_instructions:
+            if instr.opcode == "LABEL":
+                pending.append(instr.result.value)
+                continue
+            for label in pending:
+                targets[label] = instr
+            pending = []
+        return targets
+
+    def _thread_jumps(self, tac_instructions):
+        targets = self._label_targets(tac_instructions)
+        changed = False
+        for instr in tac_instructions:
+            if instr.opcode not in JUMP_OPCODES:
+                continue
+            seen = {instr.result.value}
+            target = targets.get(instr.result.value)
+            while target is not None and target.opcode == "GOTO" and target.result.value not in seen:
+                instr.result = target.result
+                seen.add(target.result.value)
+                target = targets.get(target.result.value)
+                changed = True
+        return tac_instructions, changed
+
+    def _invert_branches(self, tac_instructions):
+        result = []
+        changed = False
+        i = 0
+        while i < len(tac_instructions):
+            instr = tac_instructions[i]
+            if (instr.opcode in BRANCH_OPCODES and i + 2 < len(tac_instructions)
+                    and not (instr.opcode in COMPARE_BRANCH and self._real_operands(instr))
+                    and tac_instructions[i + 1].opcode == "GOTO"
+                    and tac_instructions[i + 2].opcode == "LABEL"
+                    and tac_instructions[i + 2].result.value == instr.result.value):
+                goto = tac_instructions[i + 1]
+                result.append(TACInstruction(INVERSE_BRANCH[instr.opcode], goto.result, instr.arg1, instr.arg2,
+                                              instr.position))
+                changed = True
+                i += 2
+                continue
+            result.append(instr)
+            i += 1
+        return result, changed
+
+    def _real_operands(self, instr):
+        return any(op.value in self.real for op in (instr.arg1, instr.arg2) if op.is_id() or op.is_temp())
+
+    def _remove_jumps_to_next(self, tac_instructions):
+        result = []
+        changed = False
+        for i, instr in enumerate(tac_instructions):
+            if instr.opcode in JUMP_OPCODES:
+                following = set()
+                for nxt in tac_instructions[i + 1:]:
+                    if nxt.opcode != "LABEL":
+                        break
+                    following.add(nxt.result.value)
+                if instr.result.value in following:
+                    changed = True
+                    continue
+            result.append(instr)
+        return result, changed
+
+    def _remove_unreachable(self, tac_instructions):
+        result = []
+        changed = False
+        unreachable = False
+        for instr in tac_instructions:
+            if instr.opcode == "LABEL":
+                unreachable = False
+            elif unreachable:
+                changed = True
+                continue
+            result.append(instr)
+            if instr.opcode == "GOTO":
+                unreachable = True
+        return result, changed
+
+    def _remove_unused_labels(self, tac_instructions):
+        used = {instr.result.value for instr in tac_instructions if instr.opcode in JUMP_OPCODES}
+        result = [instr for instr in tac_instructions if instr.opcode != "LABEL" or instr.result.value in used]
+        return result, len(result) != len(tac_instructions)
@@ -0,0 +1,235 @@
+# Arquivo: src/tac/tac_file.py
+
+import mmap
+import re
+import struct
+import sys
+from array import array
+
+from src.tac.TACGenerator import TACOperand, TACInstruction, SYMBOLS
+from src.tac.compact import CompactTAC, OPCODES
+from src.tac.cfg import COMPARE_BRANCH
+
+# Leitura e gravação de TAC em arquivo, para retomar o pipeline sem passar pelo fonte.
+#
+# Formato binário (.tacb), little-endian, versão 1:
+#   cabeçalho   'TACB' | versão u16 | reservado u16 | instruções u32 | operandos u32 | símbolos u32
+#   operandos   tipo u8 | espécie u8 (0 = inteiro i64, 1 = texto u32 + utf-8,
+#               2 = inteiro fora do i64, em decimal como texto)
+#   símbolos    nome e tipo Arara, ambos texto (u32 + utf-8)
+#   colunas     alinhadas em 4 bytes: results, args1, args2 (u32 cada) e opcodes (u8),
+#               na mesma forma do CompactTAC, prontas para serem lidas direto de um mmap
+#
+# Formato texto (.tac): o mesmo produzido por str(TACInstruction).
+
+MAGIC = b'TACB'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIII')
+OPERAND_TYPES = ['LITERAL', 'ID', 'TEMP', 'LABEL']
+INT_KIND, TEXT_KIND, BIG_INT_KIND = 0, 1, 2
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+
+class TACFileError(Exception):
+    pass
+
+CORRUPTED = "arquivo TAC binário truncado ou corrompido"
+
+
+def _pack_text(text):
+    data = text.encode('utf-8')
+    return struct.pack('<I', len(data)) + data
+
+def _unpack_text(buffer, offset):
+    (size,) = struct.unpack_from('<I', buffer, offset)
+    offset += 4
+    if offset + size > len(buffer):
+        raise TACFileError(CORRUPTED)
+    return bytes(buffer[offset:offset + size]).decode('utf-8'), offset + size
+
+def _padding(offset):
+    return -offset % 4
+
+
+def write_binary(path, tac, symbols=None):
+    store = tac if isinstance(tac, CompactTAC) else CompactTAC.from_instructions(tac)
+    try:
+        data = _encode_binary(store, symbols or {})
+    except (struct.error, ValueError, UnicodeEncodeError) as e:
+        raise TACFileError(f"não foi possível gravar o TAC binário: {e}") from e
+    with open(path, 'wb') as f:
+        f.write(data)
+
+#Os literais inteiros do TAC são os do fonte, sem limite de tamanho (só os backends os reduzem a
+#32 bits): os que não cabem num i64 vão como texto
+def _operand_kind(value):
+    if not isinstance(value, int):
+        return TEXT_KIND
+    return INT_KIND if INT64_MIN <= value <= INT64_MAX else BIG_INT_KIND
+
+def _encode_binary(store, symbols):
+    operands = store.operands.operands[1:]
+
+    parts = [HEADER.pack(MAGIC, VERSION, 0, len(store), len(operands), len(symbols))]
+    for operand in operands:
+        kind = _operand_kind(operand.value)
+        parts.append(struct.pack('<BB', OPERAND_TYPES.index(operand.type), kind))
+        if kind == INT_KIND:
+            parts.append(struct.pack('<q', operand.value))
+        else:
+            parts.append(_pack_text(str(operand.value)))
+    for name, arara_type in symbols.items():
+        parts.append(_pack_text(name) + _pack_text(str(arara_type)))
+
+    size = sum(len(part) for part in parts)
+    parts.append(b'\0' * _padding(size))
+    for column in [store.results, store.args1, store.args2]:
+        column = array('I', column)
+        if sys.byteorder != 'little':
+            column.byteswap()
+        parts.append(column.tobytes())
+    parts.append(store.opcodes.tobytes())
+    return b''.join(parts)
+
+
+#Lê um .tacb; devolve (CompactTAC, tabela de símbolos)
+def read_binary(path):
+    with open(path, 'rb') as f:
+        if not f.read(1):
+            raise TACFileError("arquivo TAC binário vazio")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return _decode_binary(buffer)
+
+#Qualquer leitura fora do arquivo, tipo de operando, texto ou índice inválido vira TACFileError
+def _decode_binary(buffer):
+    if len(buffer) < HEADER.size or buffer[:4] != MAGIC:
+        raise TACFileError("arquivo TAC binário inválido")
+    _, version, _, n_instrs, n_operands, n_symbols = HEADER.unpack_from(buffer, 0)
+    if version != VERSION:
+        raise TACFileError(f"versão {version} do formato TAC binário não suportada (esperada {VERSION})")
+    try:
+        return _decode_body(buffer, n_instrs, n_operands, n_symbols)
+    except (struct.error, IndexError, ValueError, UnicodeDecodeError) as e:
+        raise TACFileError(CORRUPTED) from e
+
+def _decode_body(buffer, n_instrs, n_operands, n_symbols):
+    store = CompactTAC()
+    table = store.operands
+    offset = HEADER.size
+    for _ in range(n_operands):
+        type_index, kind = struct.unpack_from('<BB', buffer, offset)
+        offset += 2
+        if kind == INT_KIND:
+            (value,) = struct.unpack_from('<q', buffer, offset)
+            offset += 8
+        elif kind == TEXT_KIND:
+            value, offset = _unpack_text(buffer, offset)
+        elif kind == BIG_INT_KIND:
+            text, offset = _unpack_text(buffer, offset)
+            value = int(text)
+        else:
+            raise TACFileError(CORRUPTED)
+        table.intern(TACOperand(OPERAND_TYPES[type_index], value))
+
+    symbols = {}
+    for _ in range(n_symbols):
+        name, offset = _unpack_text(buffer, offset)
+        symbols[name], offset = _unpack_text(buffer, offset)
+
+    offset += _padding(offset)
+    if offset + 13 * n_instrs > len(buffer):
+        raise TACFileError(CORRUPTED)
+    with memoryview(buffer) as view:
+        for column in [store.results, store.args1, store.args2]:
+            column.frombytes(view[offset:offset + 4 * n_instrs])
+            if sys.byteorder != 'little':
+                column.byteswap()
+            offset += 4 * n_instrs
+        store.opcodes.frombytes(view[offset:offset + n_instrs])
+    # O .tacb não guarda a posição no fonte: as instruções lidas ficam sem posição
+    for column in [store.position_lines, store.position_columns]:
+        column.frombytes(bytes(4 * n_instrs))
+
+    # Os índices de operando não podem passar da tabela (o 0 é a ausência de operando)
+    if n_instrs and (max(store.opcodes) >= len(OPCODES)
+                     or max(max(column) for column in [store.results, store.args1, store.args2]) > len(table)):
+        raise TACFileError(CORRUPTED)
+    return store, symbols
+
+
+TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|\S+')
+INT_LITERAL = re.compile(r'-?\d+')
+TEMP_NAME = re.compile(r'_t\d+')
+SYMBOL_OPCODES = {symbol: opcode for opcode, symbol in SYMBOLS.items()}
+
+
+def _operand(token):
+    if token.startswith('"'):
+        return TACOperand('LITERAL', token)
+    if INT_LITERAL.fullmatch(token):
+        return TACOperand('LITERAL', int(token))
+    if TEMP_NAME.fullmatch(token):
+        return TACOperand('TEMP', token)
+    return TACOperand('ID', token)
+
+def _label(token):
+    return TACOperand('LABEL', token)
+
+
+#Converte uma linha do formato texto em instrução; None para linhas vazias
+def parse_line(line):
+    tokens = TOKEN.findall(line)
+    if not tokens:
+        return None
+    n = len(tokens)
+    if n == 1 and tokens[0].endswith(':'):
+        return TACInstruction('LABEL', _label(tokens[0][:-1]))
+    if n == 2 and tokens[0] in ['GOTO', 'READ', 'WRITE']:
+        if tokens[0] == 'GOTO':
+            return TACInstruction('GOTO', _label(tokens[1]))
+        return TACInstruction(tokens[0], _operand(tokens[1]))
+    if n == 3 and tokens[0] == 'WRITE_REPEAT':
+        return TACInstruction('WRITE_REPEAT', _operand(tokens[1]), _operand(tokens[2]))
+    if n == 4 and tokens[0] in ['IF_FALSE', 'IF_TRUE'] and tokens[2] == 'GOTO':
+        return TACInstruction(tokens[0] + '_GOTO', _label(tokens[3]), _operand(tokens[1]))
+    if n == 5 and tokens[0] in COMPARE_BRANCH and tokens[3] == 'GOTO':
+        return TACInstruction(tokens[0], _label(tokens[4]), _operand(tokens[1]), _operand(tokens[2]))
+    if n >= 3 and tokens[1] == '=':
+        result = _operand(tokens[0])
+        if n == 3:
+            return TACInstruction('ASSIGN', result, _operand(tokens[2]))
+        if n == 4 and tokens[2] == '!':
+            return TACInstruction('NOT', result, _operand(tokens[3]))
+        if n == 5 and tokens[3] in SYMBOL_OPCODES:
+            return TACInstruction(SYMBOL_OPCODES[tokens[3]], result, _operand(tokens[2]), _operand(tokens[4]))
+    raise TACFileError(f"instrução TAC inválida: {line.strip()}")
+
+
+def parse_text(text):
+    instructions = []
+    for number, line in enumerate(text.splitlines(), 1):
+        try:
+            instr = parse_line(line)
+        except TACFileError as e:
+            raise TACFileError(f"linha {number}: {e}") from None
+        if instr is not None:
+            instructions.append(instr)
+    return instructions
+
+
+def write_text(path, tac_instructions):
+    with open(path, 'w', encoding='utf-8') as f:
+        for instruction in tac_instructions:
+            f.write(str(instruction) + '\n')
+
+
+#Lê um arquivo TAC em qualquer dos formatos (o binário é reconhecido pelo cabeçalho).
+#Devolve (lista de instruções, tabela de símbolos); o formato texto não guarda os tipos.
+def read_tac(path):
+    with open(path, 'rb') as f:
+        magic = f.read(len(MAGIC))
+    if magic == MAGIC:
+        store, symbols = read_binary(path)
+        return store.to_instructions(), symbols
+    with open(path, encoding='utf-8') as f:
+        return parse_text(f.read()), {}
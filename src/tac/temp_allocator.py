@@ -0,0 +1,75 @@
+# Arquivo: src/tac/temp_allocator.py
+
+import heapq
+from collections import Counter
+
+from src.tac.TACGenerator import TACOperand
+from src.tac.cfg import build_cfg, instr_def
+
+
+#Reaproveitamento de temporárias por varredura linear (linear scan) sobre o TAC.
+#Cada temporária ganha um intervalo de vida na ordem linear das instruções, estendido
+#pelos blocos em que está viva na entrada ou na saída (laços); temporárias cujos
+#intervalos não se sobrepõem passam a compartilhar o mesmo nome '_tN'.
+class TempAllocator:
+    name = "temps"
+
+    def __init__(self):
+        self.peak = 0
+
+    def run(self, tac_instructions, analyses=None):
+        intervals = self._intervals(build_cfg(tac_instructions, analyses), tac_instructions)
+        defs = Counter(instr_def(instr) for instr in tac_instructions)
+
+        #Temporárias com mais de uma definição ('&&'/'||' em contexto de valor) costumam ir
+        #para a memória no LLVM, então só compartilham nomes entre si
+        mapping = {}
+        free = {False: [], True: []}    # índices '_tN' livres (heap: o menor é reaproveitado primeiro)
+        active = []                     # heap de (fim do intervalo, índice, classe)
+        next_index = 0
+        for name, (start, end) in sorted(intervals.items(), key=lambda item: item[1]):
+            while active and active[0][0] < start:
+                _, index, kind = heapq.heappop(active)
+                heapq.heappush(free[kind], index)
+            kind = defs[name] > 1
+            if free[kind]:
+                index = heapq.heappop(free[kind])
+            else:
+                index = next_index
+                next_index += 1
+            mapping[name] = f'_t{index}'
+            heapq.heappush(active, (end, index, kind))
+        self.peak = next_index
+
+        for instr in tac_instructions:
+            for slot in ['result', 'arg1', 'arg2']:
+                op = getattr(instr, slot)
+                if op is not None and op.is_temp() and mapping[op.value] != op.value:
+                    setattr(instr, slot, TACOperand('TEMP', mapping[op.value]))
+        return tac_instructions
+
+    def _intervals(self, cfg, tac_instructions):
+        live_in, live_out = cfg.liveness()
+        temps = {op.value for instr in tac_instructions for op in [instr.result, instr.arg1, instr.arg2]
+                 if op is not None and op.is_temp()}
+        intervals = {}
+
+        def touch(name, pos):
+            start, end = intervals.get(name, (pos, pos))
+            intervals[name] = (min(start, pos), max(end, pos))
+
+        pos = 0
+        for block in cfg.blocks:
+            if not block.instructions:
+                continue
+            block_start = pos
+            for instr in block.instructions:
+                for op in [instr.result, instr.arg1, instr.arg2]:
+                    if op is not None and op.is_temp():
+                        touch(op.value, pos)
+                pos += 1
+            for name in live_in[block.index] & temps:
+                touch(name, block_start)
+            for name in live_out[block.index] & temps:
+                touch(name, pos - 1)
+        return intervals
@@ -0,0 +1,230 @@
+# Arquivo: src/tac/write_coalescing.py
+
+from src.tac.TACGenerator import TACOperand, TACInstruction
+from src.tac.cfg import (build_cfg, NameFactory, PURE_OPCODES, COMPARE_BRANCH, instr_def, instr_uses,
+                         analysis_real_names)
+
+#Comparação equivalente com os operandos trocados ('b <= v' é 'v >= b') e a negada
+SWAPPED = {"EQ": "EQ", "NEQ": "NEQ", "LT": "GT", "LE": "GE", "GT": "LT", "GE": "LE"}
+NEGATED = {"EQ": "NEQ", "NEQ": "EQ", "LT": "GE", "LE": "GT", "GT": "LE", "GE": "LT"}
+
+#Laço 'enquanto' contado que só escreve constantes: para cada (saída 'v REL b', passo de v),
+#se a contagem é 'v - b' (senão 'b - v') e quanto somar a ela; v termina em b + passo * ajuste
+REPEAT_EXITS = {("GE", 1): (False, 0), ("GT", 1): (False, 1), ("LE", -1): (True, 0), ("LT", -1): (True, 1)}
+
+ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\t': '\\t', '\r': '\\r'}
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+#Texto escrito por um WRITE constante (string entre aspas ou inteiro, que sai como '%d '); None se não é constante
+def constant_text(operand):
+    if not operand.is_literal():
+        return None
+    if isinstance(operand.value, int):
+        value = (operand.value - INT32_MIN) % 2 ** 32 + INT32_MIN
+        return f"{value} "
+    if isinstance(operand.value, str) and operand.value.startswith('"'):
+        return operand.value[1:-1].encode('latin1').decode('unicode_escape')
+    return None
+
+#Literal TAC (entre aspas, com escapes) cujo texto é 'text'
+def string_literal(text):
+    parts = []
+    for ch in text:
+        code = ord(ch)
+        if ch in ESCAPES:
+            parts.append(ESCAPES[ch])
+        elif code < 32 or code == 127:
+            parts.append(f'\\x{code:02x}')
+        elif code > 0xFFFF:
+            parts.append(f'\\U{code:08x}')
+        elif code > 0xFF:
+            parts.append(f'\\u{code:04x}')
+        else:
+            parts.append(ch)
+    return TACOperand('LITERAL', '"' + ''.join(parts) + '"')
+
+
+#Junta escritas constantes:
+# - WRITEs constantes seguidos viram um só, com os inteiros já convertidos para texto
+# - laços contados cujo corpo só escreve constantes e incrementa a variável de controle
+#   viram uma única escrita repetida (WRITE_REPEAT texto contagem)
+class WriteCoalescing:
+    name = "writes"
+
+    def run(self, tac_instructions, analyses=None):
+        tac_instructions = self._coalesce(tac_instructions)
+        cfg = build_cfg(tac_instructions, analyses)
+        names = NameFactory(tac_instructions)
+        real = analysis_real_names(tac_instructions, analyses)
+        live_in, live_out = cfg.liveness()
+        changed = False
+        for loop in cfg.loops():
+            body = self._repeat_body(cfg, loop, live_in, live_out, names, real)
+            if body is not None:
+                cfg.blocks[max(loop.body)].instructions = body
+                changed = True
+        return cfg.instructions() if changed else tac_instructions
+
+    def _coalesce(self, tac_instructions):
+        result = []
+        run = []
+
+        def flush():
+            if len(run) == 1 and not isinstance(run[0].result.value, int):
+                result.append(run[0])
+            elif run:
+                text = "".join(constant_text(instr.result) for instr in run)
+                result.append(TACInstruction("WRITE", string_literal(text), position=run[0].position))
+            run.clear()
+
+        for instr in tac_instructions:
+            if instr.opcode == "WRITE" and constant_text(instr.result) is not None:
+                run.append(instr)
+                continue
+            flush()
+            result.append(instr)
+        flush()
+        return result
+
+    #Laço de dois blocos: o cabeçalho só calcula o limite e sai por 'v REL b'; o corpo, logo
+    #depois dele, escreve constantes, faz 'v = v + 1' (ou - 1) e volta ao cabeçalho.
+    #O corpo novo escreve o texto repetido, deixa v com o valor final e sai do laço.
+    #v e b precisam ser inteiros: com reais a contagem não é exata.
+    def _repeat_body(self, cfg, loop, live_in, live_out, names, real):
+        header = cfg.blocks[loop.header]
+        if len(loop.body) != 2 or loop.header + 1 not in loop.body or loop.latches != [loop.header + 1]:
+            return None
+        body = cfg.blocks[loop.header + 1]
+        branch = header.terminator
+        if (branch is None or branch.opcode == "GOTO" or body.terminator is None
+                or body.terminator.opcode != "GOTO" or len(header.succs) != 2):
+            return None
+        exit_block = cfg.label_block[branch.result.value]
+        if exit_block in loop.body:
+            return None
+
+        update = self._body_update(body, live_out[body.index])
+        if update is None:
+            return None
+        var, step, text = update
+        if var in real:
+            return None
+        body_defs = {instr_def(instr) for instr in body.instructions} - {None}
+
+        condition = self._exit_condition(header, var, body_defs, live_in[exit_block])
+        if condition is None or (condition[0], step) not in REPEAT_EXITS:
+            return None
+        relation, bound = condition
+        if bound.value in real:
+            return None
+        var_first, extra = REPEAT_EXITS[(relation, step)]
+        if bound.is_literal() and not INT32_MIN <= bound.value + step * extra <= INT32_MAX:
+            return None
+
+        var_operand = TACOperand('ID', var)
+        count = names.next_temp()
+        new_body = [instr for instr in body.instructions if instr.opcode == "LABEL"]
+        if var_first:
+            new_body.append(TACInstruction("SUB", count, var_operand, bound))
+        else:
+            new_body.append(TACInstruction("SUB", count, bound, var_operand))
+        if extra:
+            total = names.next_temp()
+            new_body.append(TACInstruction("ADD", total, count, TACOperand('LITERAL', 1)))
+            count = total
+        new_body.append(TACInstruction("WRITE_REPEAT", string_literal(text), count))
+        if var in live_in[exit_block]:
+            if extra:
+                final = names.next_temp()
+                new_body.append(TACInstruction("ADD", final, bound, TACOperand('LITERAL', step * extra)))
+                new_body.append(TACInstruction("ASSIGN", var_operand, final))
+            else:
+                new_body.append(TACInstruction("ASSIGN", var_operand, bound))
+        new_body.append(TACInstruction("GOTO", branch.result))
+        #O que substitui o laço fica com a posição dele no fonte (para o --perfil)
+        for instr in new_body:
+            if instr.position is None:
+                instr.position = branch.position
+        return new_body
+
+    #Corpo só com escritas constantes e um único 'v = v +/- 1' (direto ou por uma temporária
+    #que morre no corpo); devolve (v, passo, texto escrito) ou None
+    def _body_update(self, body, live_out):
+        text = []
+        update = None
+        instructions = [instr for instr in body.instructions[:-1] if instr.opcode != "LABEL"]
+        pos = 0
+        while pos < len(instructions):
+            instr = instructions[pos]
+            pos += 1
+            if instr.opcode == "WRITE":
+                piece = constant_text(instr.result)
+                if piece is None:
+                    return None
+                text.append(piece)
+                continue
+            if update is not None or instr.opcode not in ["ADD", "SUB"]:
+                return None
+            if instr.result.is_id():
+                target = instr.result.value
+            elif (instr.result.is_temp() and instr.result.value not in live_out and pos < len(instructions)
+                  and instructions[pos].opcode == "ASSIGN" and instructions[pos].arg1.is_temp()
+                  and instructions[pos].arg1.value == instr.result.value and instructions[pos].result.is_id()):
+                target = instructions[pos].result.value
+                pos += 1
+            else:
+                return None
+            update = self._step(instr, target)
+            if update is None:
+                return None
+        if update is None or not text or not "".join(text):
+            return None
+        return update[0], update[1], "".join(text)
+
+    def _step(self, instr, var):
+        pairs = [(instr.arg1, instr.arg2)]
+        if instr.opcode == "ADD":
+            pairs.append((instr.arg2, instr.arg1))
+        for v, c in pairs:
+            if v.is_id() and v.value == var and c.is_literal() and c.value == 1:
+                return var, 1 if instr.opcode == "ADD" else -1
+        return None
+
+    #Condição de saída do cabeçalho na forma 'v REL b', com b literal ou um nome que o corpo
+    #não altera (ou que o próprio cabeçalho calcula); o resto do cabeçalho só calcula
+    #temporárias, sem depender do que o corpo define
+    def _exit_condition(self, header, var, body_defs, exit_live):
+        branch = header.terminator
+        instructions = [instr for instr in header.instructions[:-1] if instr.opcode != "LABEL"]
+        compare = None
+        if branch.opcode in COMPARE_BRANCH:
+            relation, args = COMPARE_BRANCH[branch.opcode], (branch.arg1, branch.arg2)
+        else:
+            if not instructions or instr_def(instructions[-1]) != branch.arg1.value:
+                return None
+            compare = instructions[-1]
+            if compare.opcode not in SWAPPED or compare.result.value in exit_live:
+                return None
+            relation, args = compare.opcode, (compare.arg1, compare.arg2)
+            if branch.opcode == "IF_FALSE_GOTO":
+                relation = NEGATED[relation]
+        defined = set()
+        for instr in instructions:
+            if instr is compare:
+                continue
+            if instr.opcode not in PURE_OPCODES + ["ASSIGN"] or not instr.result.is_temp():
+                return None
+            if any(name in body_defs and name not in defined for name in instr_uses(instr)):
+                return None
+            defined.add(instr.result.value)
+        first, second = args
+        if not (first.is_id() and first.value == var):
+            first, second, relation = second, first, SWAPPED[relation]
+        if not (first.is_id() and first.value == var):
+            return None
+        if second.is_literal():
+            return (relation, second) if isinstance(second.value, int) else None
+        if second.value in body_defs and second.value not in defined:
+            return None
+        return relation, second
@@ -0,0 +1,708 @@
+# Arquivo: src/x86_generator.py
+
+import bisect
+import io
+import struct
+from src.tac.cfg import ControlFlowGraph, COMPARE_BRANCH, ARITHMETIC_OPCODES, instr_def, operand_types
+
+# Gerador de assembly x86-64 (System V, sintaxe AT&T do GNU as) direto do TAC, para montar
+# com o 'as' do sistema e ligar com o 'cc', sem passar pelo LLVM. As variáveis e temporárias
+# ganham registradores por varredura linear (linear scan) sobre os intervalos de vida tirados
+# da vivacidade por blocos; o que não cabe fica na pilha. Inteiros vão em registradores de
+# uso geral (32 bits, aritmética circular como no LLVM IR) e reais em xmm (SSE2). A E/S chama
+# a mesma biblioteca de runtime do LLVM IR (src/runtime/arara_runtime.c).
+
+#Registradores de uso geral alocáveis. Só os preservados pelas chamadas (callee-saved) guardam
+#valores que atravessam uma chamada à runtime; os demais, só valores que morrem antes dela.
+#rax, rdx e r11 ficam de rascunho (divisão, cópias entre posições de memória, conversões).
+CALLEE_SAVED = ["rbx", "r12", "r13", "r14", "r15"]
+CALLER_SAVED = ["rcx", "rsi", "rdi", "r8", "r9", "r10"]
+#No System V toda chamada destrói os xmm: reais vivos através de chamadas ficam na pilha.
+#xmm0 (argumento e retorno), xmm14 e xmm15 são rascunho
+XMM_REGISTERS = [f"xmm{n}" for n in range(1, 14)]
+REG32 = {"rbx": "ebx", "rcx": "ecx", "rsi": "esi", "rdi": "edi",
+         **{f"r{n}": f"r{n}d" for n in range(8, 16)}}
+
+#Códigos de condição (sufixos de set/j) das comparações entre inteiros. Entre reais, 'a'/'ae'
+#(e as negações 'be'/'b') já tratam o caso não ordenado (NaN); '==' e '!=' precisam também
+#do PF e usam os códigos próprios 'oeq' e 'une', como o fcmp do LLVM IR.
+INT_CC = {"EQ": "e", "NEQ": "ne", "LT": "l", "LE": "le", "GT": "g", "GE": "ge"}
+SWAPPED = {"EQ": "EQ", "NEQ": "NEQ", "LT": "GT", "LE": "GE", "GT": "LT", "GE": "LE"}
+NEGATED_CC = {"e": "ne", "ne": "e", "l": "ge", "ge": "l", "le": "g", "g": "le",
+              "a": "be", "be": "a", "ae": "b", "b": "ae", "oeq": "une", "une": "oeq"}
+INT_OPS = {"ADD": "addl", "SUB": "subl", "MUL": "imull"}
+REAL_OPS = {"ADD": "addsd", "SUB": "subsd", "MUL": "mulsd", "DIV": "divsd"}
+COMMUTATIVE = ["ADD", "MUL"]
+CALL_OPCODES = ["READ", "WRITE", "WRITE_REPEAT"]
+
+INT32_MIN = -2 ** 31
+
+
+def int32(value):
+    if not isinstance(value, int):
+        return 0
+    return (value - INT32_MIN) % 2 ** 32 + INT32_MIN
+
+
+#Multiplicador mágico e deslocamento da divisão com sinal de 32 bits por uma constante que não
+#é potência de 2 (Warren, Hacker's Delight, cap. 10): n / d é a metade alta de n * m, corrigida
+#por n quando m e d têm sinais diferentes, deslocada e somada de 1 se negativa
+def signed_magic(divisor):
+    two31 = 2 ** 31
+    magnitude = abs(divisor)
+    t = two31 + (1 if divisor < 0 else 0)
+    anc = t - 1 - t % magnitude
+    p = 31
+    q1, r1 = divmod(two31, anc)
+    q2, r2 = divmod(two31, magnitude)
+    while True:
+        p += 1
+        q1, r1 = 2 * q1, 2 * r1
+        if r1 >= anc:
+            q1, r1 = q1 + 1, r1 - anc
+        q2, r2 = 2 * q2, 2 * r2
+        if r2 >= magnitude:
+            q2, r2 = q2 + 1, r2 - magnitude
+        q1 &= 0xFFFFFFFF
+        q2 &= 0xFFFFFFFF
+        delta = magnitude - r2
+        if not (q1 < delta or (q1 == delta and r1 == 0)):
+            break
+    magic = q2 + 1
+    return int32(-magic if divisor < 0 else magic), p - 32
+
+
+#Literal de string do as: só aspas e barra invertida precisam de escape; o resto fora do
+#ASCII imprimível vai em octal
+def asm_string(data):
+    parts = []
+    for byte in data:
+        ch = chr(byte)
+        if ch in '"\\':
+            parts.append('\\' + ch)
+        elif 32 <= byte < 127:
+            parts.append(ch)
+        else:
+            parts.append(f'\\{byte:03o}')
+    return '"' + ''.join(parts) + '"'
+
+
+def is_memory(operand):
+    return "(" in operand
+
+
+def is_register(operand):
+    return operand.startswith("%")
+
+
+class X86Generator:
+    def __init__(self, semantic_table={}):
+        self.semantic_table = semantic_table
+        self.lines = []
+        self.operands = {}
+        self.location = {}
+        self.saved = []
+        self.frame_size = 0
+        self.strings = {}
+        self.doubles = {}
+        self.local_labels = 0
+        self.folded = set()
+        self.rotated = {}
+        self.extra_labels = {}
+
+    def generate(self, tac_instructions):
+        buffer = io.StringIO()
+        self.generate_to(tac_instructions, buffer)
+        return buffer.getvalue()
+
+    def generate_to(self, tac_instructions, out):
+        self.__init__(self.semantic_table)
+        self.cfg = ControlFlowGraph(tac_instructions)
+        instructions = self.cfg.instructions()
+        # Registrador virtual de cada operando: (nome, é real); uma temporária reaproveitada
+        # para inteiros e reais vira dois
+        for instr, slot, real in operand_types(instructions, self.semantic_table):
+            self.operands[(id(instr), slot)] = (getattr(instr, slot).value, real)
+        self._fold_copies(instructions)
+        self._rotate_loops()
+        ranges, entry = self._live_ranges(instructions)
+        calls = [(i, self._def(instr) if instr.opcode == "READ" else None)
+                 for i, instr in enumerate(instructions) if instr.opcode in CALL_OPCODES]
+        self._allocate(ranges, calls)
+
+        self._prologue(entry)
+        for i, instr in enumerate(instructions):
+            following = instructions[i + 1] if i + 1 < len(instructions) else None
+            if id(instr) in self.extra_labels:
+                self.lines.append(f"{self.extra_labels[id(instr)]}:")
+            if id(instr) not in self.folded:
+                self._instruction(instr, following)
+        self._epilogue()
+
+        out.write("# Gerado pelo compilador Arara a partir do TAC\n")
+        out.write("    .text\n    .globl main\n    .type main, @function\nmain:\n")
+        out.write("\n".join(self.lines) + "\n")
+        out.write("    .size main, .-main\n")
+        if self.doubles or self.strings:
+            out.write("    .section .rodata\n")
+        if self.doubles:
+            out.write("    .align 8\n")
+        for bits, label in self.doubles.items():
+            out.write(f"{label}:\n    .quad 0x{bits}\n")
+        for data, label in self.strings.items():
+            out.write(f"{label}:\n    .ascii {asm_string(data)}\n")
+        out.write('    .section .note.GNU-stack,"",@progbits\n')
+
+    #Registradores virtuais lidos pela instrução; o GOTO de um laço rotacionado lê também os
+    #operandos do teste do cabeçalho, que ele repete
+    def _uses(self, instr):
+        if id(instr) in self.folded:
+            return []
+        if id(instr) in self.rotated:
+            instr = self.rotated[id(instr)][0]
+        slots = ["arg1", "arg2"] + (["result"] if instr.opcode in ["WRITE", "READ"] else [])
+        return [self.operands[(id(instr), slot)] for slot in slots if (id(instr), slot) in self.operands]
+
+    def _def(self, instr):
+        if instr_def(instr) is None or id(instr) in self.folded:
+            return None
+        return self.operands[(id(instr), "result")]
+
+    #'_t1 = a + b' seguido de 'x = _t1', com a temporária morta depois da cópia: a operação
+    #escreve direto em x (convertendo, se os tipos diferem, como faria a cópia) e a cópia some
+    def _fold_copies(self, instructions):
+        temps = {instr.result.value for instr in instructions if instr_def(instr) is not None and instr.result.is_temp()}
+        _, live_out = self.cfg.liveness(temps)
+        for block in self.cfg.blocks:
+            code = block.instructions
+            for j in range(len(code) - 1):
+                instr, following = code[j], code[j + 1]
+                vreg = self._def(instr)
+                if (vreg is not None and instr.result.is_temp() and instr.opcode != "READ"
+                        and following.opcode == "ASSIGN" and id(instr) not in self.folded
+                        and self.operands.get((id(following), "arg1")) == vreg
+                        and self._dead_after(vreg, code[j + 2:], live_out[block.index])):
+                    self.operands[(id(instr), "result")] = self.operands[(id(following), "result")]
+                    self.folded.add(id(following))
+
+    def _dead_after(self, vreg, rest, live_out):
+        for instr in rest:
+            if vreg in self._uses(instr):
+                return False
+            if self._def(instr) == vreg:
+                return True
+        return vreg[0] not in live_out
+
+    #Laços testados no topo: o 'GOTO cabeçalho' no fim do corpo repete o teste do cabeçalho
+    #(quando ele só tem o desvio de saída) e volta direto para o corpo, com um salto só por volta
+    def _rotate_loops(self):
+        blocks = self.cfg.blocks
+        for block in blocks:
+            term = block.terminator
+            if term is None or term.opcode != "GOTO":
+                continue
+            header = blocks[self.cfg.label_block[term.result.value]]
+            branch = header.terminator
+            if (len(header.instructions) != 2 or branch is None or branch.opcode == "GOTO"
+                    or header.index + 1 >= len(blocks) or not blocks[header.index + 1].instructions):
+                continue
+            body = blocks[header.index + 1]
+            if body.label is not None:
+                label = self._label(body.label)
+            else:
+                label = self.extra_labels.setdefault(id(body.instructions[0]), self._local_label())
+            self.rotated[id(term)] = (branch, label)
+
+    #Intervalos de vida [início, fim] de cada registrador virtual, sem buracos: a instrução i
+    #lê na posição 2i e escreve em 2i+1, e a vivacidade por blocos estende o intervalo até o
+    #começo dos blocos em que ele entra vivo e o fim dos blocos de onde sai vivo. Devolve também
+    #os que chegam vivos ao início do programa (lidos antes de qualquer escrita), que começam em zero.
+    def _live_ranges(self, instructions):
+        blocks = self.cfg.blocks
+        use, defs, first = [], [], []
+        position = 0
+        for block in blocks:
+            u, d = set(), set()
+            for instr in block.instructions:
+                u.update(vreg for vreg in self._uses(instr) if vreg not in d)
+                vreg = self._def(instr)
+                if vreg is not None:
+                    d.add(vreg)
+            use.append(u)
+            defs.append(d)
+            first.append(position)
+            position += len(block.instructions)
+
+        live_in = [set() for _ in blocks]
+        live_out = [set() for _ in blocks]
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(blocks):
+                b = block.index
+                out = set().union(*(live_in[s] for s in block.succs))
+                new_in = use[b] | (out - defs[b])
+                if out != live_out[b] or new_in != live_in[b]:
+                    live_out[b], live_in[b] = out, new_in
+                    changed = True
+
+        ranges = {}
+
+        def extend(vreg, position):
+            current = ranges.get(vreg)
+            if current is None:
+                ranges[vreg] = [position, position]
+            elif position < current[0]:
+                current[0] = position
+            elif position > current[1]:
+                current[1] = position
+
+        for block in blocks:
+            if not block.instructions:
+                continue
+            start = first[block.index]
+            end = start + len(block.instructions) - 1
+            for vreg in live_in[block.index]:
+                extend(vreg, 2 * start)
+            for vreg in live_out[block.index]:
+                extend(vreg, 2 * end + 1)
+            for i, instr in enumerate(block.instructions, start):
+                for vreg in self._uses(instr):
+                    extend(vreg, 2 * i)
+                vreg = self._def(instr)
+                if vreg is not None:
+                    extend(vreg, 2 * i + 1)
+        return ranges, live_in[0] if blocks else set()
+
+    #Um intervalo atravessa a chamada da instrução i quando está vivo antes e depois dela. A
+    #variável lida por um READ não conta: vai como argumento e volta como retorno da chamada.
+    def _crosses(self, vreg, start, end, calls, call_positions):
+        k = bisect.bisect_left(call_positions, (start + 1) // 2)
+        while k < len(calls) and 2 * calls[k][0] + 1 <= end:
+            if calls[k][1] != vreg:
+                return True
+            k += 1
+        return False
+
+    #Varredura linear (Poletto e Sarkar): os intervalos em ordem de início; sem registrador livre,
+    #vai para a pilha o intervalo (o novo ou um ativo) que termina mais tarde
+    def _allocate(self, ranges, calls):
+        call_positions = [i for i, _ in calls]
+        register, slot = {}, {}
+        free = {False: CALLER_SAVED + CALLEE_SAVED, True: list(XMM_REGISTERS)}
+        preference = {False: CALLER_SAVED + CALLEE_SAVED, True: XMM_REGISTERS}
+        active = {False: [], True: []}
+        for vreg, (start, end) in sorted(ranges.items(), key=lambda item: (item[1][0], item[1][1])):
+            real = vreg[1]
+            still = []
+            for other in active[real]:
+                if ranges[other][1] < start:
+                    free[real].append(register[other])
+                else:
+                    still.append(other)
+            active[real] = still
+
+            crosses = self._crosses(vreg, start, end, calls, call_positions)
+            if crosses and real:
+                slot[vreg] = len(slot)
+                continue
+            eligible = [r for r in free[real] if not crosses or r in CALLEE_SAVED]
+            if eligible:
+                reg = min(eligible, key=preference[real].index)
+                free[real].remove(reg)
+                register[vreg] = reg
+                active[real].append(vreg)
+                continue
+            candidates = [o for o in active[real] if not crosses or register[o] in CALLEE_SAVED]
+            victim = max(candidates, key=lambda o: ranges[o][1], default=None)
+            if victim is not None and ranges[victim][1] > end:
+                register[vreg] = register.pop(victim)
+                slot[victim] = len(slot)
+                active[real].remove(victim)
+                active[real].append(vreg)
+            else:
+                slot[vreg] = len(slot)
+
+        self.saved = [r for r in CALLEE_SAVED if r in register.values()]
+        for vreg, reg in register.items():
+            self.location[vreg] = f"%{reg}" if vreg[1] else f"%{REG32[reg]}"
+        for vreg, n in slot.items():
+            self.location[vreg] = f"-{8 * (len(self.saved) + n + 1)}(%rbp)"
+        # Na chamada, a pilha fica alinhada em 16 bytes: rbp e os registradores salvos já
+        # foram empilhados
+        self.frame_size = 8 * len(slot)
+        if (8 * len(self.saved) + self.frame_size) % 16:
+            self.frame_size += 8
+
+    def _emit(self, text):
+        self.lines.append("    " + text)
+
+    def _prologue(self, entry):
+        self._emit("pushq %rbp")
+        self._emit("movq %rsp, %rbp")
+        for reg in self.saved:
+            self._emit(f"pushq %{reg}")
+        if self.frame_size:
+            self._emit(f"subq ${self.frame_size}, %rsp")
+        # Variáveis lidas antes de receber valor começam em zero
+        for vreg in sorted(entry, key=str):
+            place = self.location[vreg]
+            if not is_register(place):
+                self._emit(f"movq $0, {place}" if vreg[1] else f"movl $0, {place}")
+            elif vreg[1]:
+                self._emit(f"xorpd {place}, {place}")
+            else:
+                self._emit(f"xorl {place}, {place}")
+
+    def _epilogue(self):
+        self._emit("call arara_flush")
+        self._emit("xorl %eax, %eax")
+        if self.frame_size:
+            self._emit(f"addq ${self.frame_size}, %rsp")
+        for reg in reversed(self.saved):
+            self._emit(f"popq %{reg}")
+        self._emit("popq %rbp")
+        self._emit("ret")
+
+    def _label(self, name):
+        return f".Lb_{name}"
+
+    def _local_label(self):
+        self.local_labels += 1
+        return f".Lx{self.local_labels - 1}"
+
+    def _string(self, data):
+        if data not in self.strings:
+            self.strings[data] = f".Ls{len(self.strings)}"
+        return f"{self.strings[data]}(%rip)"
+
+    def _double_constant(self, value):
+        bits = struct.pack(">d", float(value)).hex().upper()
+        if bits not in self.doubles:
+            self.doubles[bits] = f".Ld{len(self.doubles)}"
+        return f"{self.doubles[bits]}(%rip)"
+
+    def _literal_bytes(self, operand):
+        return operand.value[1:-1].encode('latin1').decode('unicode_escape').encode('utf-8')
+
+    def _is_real(self, instr, slot):
+        vreg = self.operands.get((id(instr), slot))
+        return vreg is not None and vreg[1]
+
+    #Operando inteiro: imediato, registrador de 32 bits ou posição na pilha
+    def _int_operand(self, instr, slot):
+        vreg = self.operands.get((id(instr), slot))
+        if vreg is None:
+            return f"${int32(getattr(instr, slot).value)}"
+        return self.location[vreg]
+
+    #Operando real: xmm, posição na pilha ou constante; um inteiro é convertido em 'scratch'
+    def _real_operand(self, instr, slot, scratch):
+        vreg = self.operands.get((id(instr), slot))
+        if vreg is None:
+            return self._double_constant(int32(getattr(instr, slot).value))
+        if vreg[1]:
+            return self.location[vreg]
+        self._emit(f"cvtsi2sdl {self.location[vreg]}, {scratch}")
+        return scratch
+
+    def _move(self, source, target, real=False):
+        if source == target:
+            return
+        if real:
+            if is_memory(source) and is_memory(target):
+                self._emit(f"movsd {source}, %xmm14")
+                source = "%xmm14"
+            op = "movapd" if is_register(source) and is_register(target) else "movsd"
+        else:
+            if is_memory(source) and is_memory(target):
+                self._emit(f"movl {source}, %eax")
+                source = "%eax"
+            op = "movl"
+        self._emit(f"{op} {source}, {target}")
+
+    #Grava um inteiro (registrador de 32 bits) no destino, convertendo se o destino é real
+    def _store_int(self, source, vreg):
+        target = self.location[vreg]
+        if not vreg[1]:
+            self._move(source, target)
+        elif is_register(target):
+            self._emit(f"cvtsi2sdl {source}, {target}")
+        else:
+            self._emit(f"cvtsi2sdl {source}, %xmm14")
+            self._emit(f"movsd %xmm14, {target}")
+
+    #Grava um real (xmm) no destino; num inteiro, trunca em direção a zero como o fptosi
+    def _store_real(self, source, vreg):
+        target = self.location[vreg]
+        if vreg[1]:
+            self._move(source, target, real=True)
+        elif is_register(target):
+            self._emit(f"cvttsd2si {source}, {target}")
+        else:
+            self._emit(f"cvttsd2si {source}, %eax")
+            self._emit(f"movl %eax, {target}")
+
+    def _store_flag(self, vreg):
+        target = self.location[vreg]
+        if not vreg[1] and is_register(target):
+            self._emit(f"movzbl %al, {target}")
+        else:
+            self._emit("movzbl %al, %eax")
+            self._store_int("%eax", vreg)
+
+    #Compara dois inteiros e devolve o código de condição da relação (ou o resultado, se os
+    #dois são constantes)
+    def _int_flags(self, instr, relation):
+        a, b = self._int_operand(instr, "arg1"), self._int_operand(instr, "arg2")
+        if a.startswith("$") and b.startswith("$"):
+            x, y = int(a[1:]), int(b[1:])
+            return {"EQ": x == y, "NEQ": x != y, "LT": x < y, "LE": x <= y, "GT": x > y, "GE": x >= y}[relation]
+        if a.startswith("$"):
+            a, b, relation = b, a, SWAPPED[relation]
+        if is_memory(a) and is_memory(b):
+            self._emit(f"movl {a}, %eax")
+            a = "%eax"
+        if b == "$0" and is_register(a):
+            self._emit(f"testl {a}, {a}")
+        else:
+            self._emit(f"cmpl {b}, {a}")
+        return INT_CC[relation]
+
+    #Compara dois reais com ucomisd; '<' e '<=' viram '>' e '>=' com os operandos trocados,
+    #que são falsos quando a comparação não é ordenada
+    def _real_flags(self, instr, relation):
+        a = self._real_operand(instr, "arg1", "%xmm14")
+        b = self._real_operand(instr, "arg2", "%xmm15")
+        if relation in ["LT", "LE"]:
+            a, b, relation = b, a, SWAPPED[relation]
+        if not is_register(a):
+            scratch = "%xmm15" if b == "%xmm14" else "%xmm14"
+            self._emit(f"movsd {a}, {scratch}")
+            a = scratch
+        self._emit(f"ucomisd {b}, {a}")
+        return {"GT": "a", "GE": "ae", "EQ": "oeq", "NEQ": "une"}[relation]
+
+    def _compare_flags(self, instr, relation):
+        if self._is_real(instr, "arg1") or self._is_real(instr, "arg2"):
+            return self._real_flags(instr, relation)
+        return self._int_flags(instr, relation)
+
+    #Condição de o operando ser verdadeiro (diferente de zero)
+    def _truth_flags(self, instr, slot):
+        if self._is_real(instr, slot):
+            self._emit("xorpd %xmm15, %xmm15")
+            self._emit(f"ucomisd {self.location[self.operands[(id(instr), slot)]]}, %xmm15")
+            return "une"
+        value = self._int_operand(instr, slot)
+        if value.startswith("$"):
+            return value != "$0"
+        if is_register(value):
+            self._emit(f"testl {value}, {value}")
+        else:
+            self._emit(f"cmpl $0, {value}")
+        return "ne"
+
+    def _negate(self, cc):
+        return not cc if isinstance(cc, bool) else NEGATED_CC[cc]
+
+    def _set_byte(self, cc, byte):
+        if isinstance(cc, bool):
+            self._emit(f"movb ${int(cc)}, {byte}")
+        elif cc == "oeq":
+            self._emit(f"sete {byte}")
+            self._emit("setnp %r11b")
+            self._emit(f"andb %r11b, {byte}")
+        elif cc == "une":
+            self._emit(f"setne {byte}")
+            self._emit("setp %r11b")
+            self._emit(f"orb %r11b, {byte}")
+        else:
+            self._emit(f"set{cc} {byte}")
+
+    def _jump_if(self, cc, target):
+        if cc is True:
+            self._emit(f"jmp {target}")
+        elif cc is False:
+            return
+        elif cc == "oeq":
+            skip = self._local_label()
+            self._emit(f"jp {skip}")
+            self._emit(f"je {target}")
+            self.lines.append(f"{skip}:")
+        elif cc == "une":
+            self._emit(f"jne {target}")
+            self._emit(f"jp {target}")
+        else:
+            self._emit(f"j{cc} {target}")
+
+    def _instruction(self, instr, following):
+        op = instr.opcode
+        if op == "LABEL":
+            self.lines.append(f"{self._label(instr.result.value)}:")
+        elif op in ARITHMETIC_OPCODES:
+            self._arithmetic(instr)
+        elif op in INT_CC:
+            self._set_byte(self._compare_flags(instr, op), "%al")
+            self._store_flag(self._def(instr))
+        elif op in ["AND", "OR"]:
+            self._set_byte(self._truth_flags(instr, "arg1"), "%al")
+            self._set_byte(self._truth_flags(instr, "arg2"), "%dl")
+            self._emit(f"{'andb' if op == 'AND' else 'orb'} %dl, %al")
+            self._store_flag(self._def(instr))
+        elif op == "NOT":
+            self._set_byte(self._negate(self._truth_flags(instr, "arg1")), "%al")
+            self._store_flag(self._def(instr))
+        elif op == "ASSIGN":
+            self._assign(instr)
+        elif op == "GOTO" and id(instr) in self.rotated:
+            branch, body = self.rotated[id(instr)]
+            self._jump_if(self._negate(self._branch_flags(branch)), body)
+            self._jump(branch.result.value, following)
+        elif op == "GOTO":
+            self._jump(instr.result.value, following)
+        elif op in ["IF_TRUE_GOTO", "IF_FALSE_GOTO"] or op in COMPARE_BRANCH:
+            self._jump_if(self._branch_flags(instr), self._label(instr.result.value))
+        elif op == "READ":
+            vreg = self._def(instr)
+            if vreg[1]:
+                self._move(self.location[vreg], "%xmm0", real=True)
+                self._emit("call arara_read_real")
+                self._move("%xmm0", self.location[vreg], real=True)
+            else:
+                self._move(self.location[vreg], "%edi")
+                self._emit("call arara_read_int")
+                self._move("%eax", self.location[vreg])
+        elif op == "WRITE" and instr.result.is_literal() and str(instr.result.value).startswith('"'):
+            data = self._literal_bytes(instr.result)
+            self._emit(f"leaq {self._string(data)}, %rdi")
+            self._emit(f"movl ${len(data)}, %esi")
+            self._emit("call arara_write_str")
+        elif op == "WRITE" and self._is_real(instr, "result"):
+            self._move(self.location[self.operands[(id(instr), "result")]], "%xmm0", real=True)
+            self._emit("call arara_write_real")
+        elif op == "WRITE":
+            self._move(self._int_operand(instr, "result"), "%edi")
+            self._emit("call arara_write_int")
+        elif op == "WRITE_REPEAT":
+            # O contador vai primeiro para edx: ele pode estar em rdi ou rsi
+            if self._is_real(instr, "arg1"):
+                self._emit(f"cvttsd2si {self.location[self.operands[(id(instr), 'arg1')]]}, %edx")
+            else:
+                self._move(self._int_operand(instr, "arg1"), "%edx")
+            data = self._literal_bytes(instr.result)
+            self._emit(f"leaq {self._string(data)}, %rdi")
+            self._emit(f"movl ${len(data)}, %esi")
+            self._emit("call arara_write_repeat")
+
+    def _jump(self, label, following):
+        if following is None or following.opcode != "LABEL" or following.result.value != label:
+            self._emit(f"jmp {self._label(label)}")
+
+    #Condição em que o desvio condicional é tomado
+    def _branch_flags(self, instr):
+        if instr.opcode in COMPARE_BRANCH:
+            return self._compare_flags(instr, COMPARE_BRANCH[instr.opcode])
+        cc = self._truth_flags(instr, "arg1")
+        return cc if instr.opcode == "IF_TRUE_GOTO" else self._negate(cc)
+
+    def _assign(self, instr):
+        vreg = self._def(instr)
+        target = self.location[vreg]
+        if vreg[1]:
+            scratch = target if is_register(target) else "%xmm14"
+            self._move(self._real_operand(instr, "arg1", scratch), target, real=True)
+        elif self._is_real(instr, "arg1"):
+            self._store_real(self.location[self.operands[(id(instr), "arg1")]], vreg)
+        else:
+            self._move(self._int_operand(instr, "arg1"), target)
+
+    #Soma, subtração, multiplicação e divisão: em double se algum operando é real, senão em
+    #32 bits; o resultado é convertido quando o destino é de outro tipo
+    def _arithmetic(self, instr):
+        vreg = self._def(instr)
+        if self._is_real(instr, "arg1") or self._is_real(instr, "arg2"):
+            target = self.location[vreg] if vreg[1] else "%xmm14"
+            self._real_binary(instr, target)
+            if not vreg[1]:
+                self._store_real("%xmm14", vreg)
+        else:
+            target = self.location[vreg] if not vreg[1] else "%eax"
+            if instr.opcode == "DIV":
+                self._int_divide(instr, target)
+            else:
+                self._int_binary(instr, target)
+            if vreg[1]:
+                self._store_int("%eax", vreg)
+
+    def _int_binary(self, instr, target):
+        op = instr.opcode
+        a, b = self._int_operand(instr, "arg1"), self._int_operand(instr, "arg2")
+        if a.startswith("$") and b.startswith("$"):
+            x, y = int(a[1:]), int(b[1:])
+            self._move(f"${int32({'ADD': x + y, 'SUB': x - y, 'MUL': x * y}[op])}", target)
+            return
+        if op in COMMUTATIVE and (b == target or a.startswith("$")) and a != target:
+            a, b = b, a
+        work = target if is_register(target) and b != target else "%eax"
+        self._move(a, work)
+        self._emit(f"{INT_OPS[op]} {b}, {work}")
+        self._move(work, target)
+
+    #Divisão com sinal truncada em direção a zero (sdiv). Por constante não há idiv: potência
+    #de 2 vira deslocamento (somando |divisor| - 1 antes quando o dividendo é negativo) e as
+    #demais, multiplicação pelo número mágico
+    def _int_divide(self, instr, target):
+        a, b = self._int_operand(instr, "arg1"), self._int_operand(instr, "arg2")
+        divisor = int(b[1:]) if b.startswith("$") else None
+        self._move(a, "%eax")
+        if not divisor:
+            if divisor is not None:
+                self._emit(f"movl {b}, %r11d")
+                b = "%r11d"
+            self._emit("cltd")
+            self._emit(f"idivl {b}")
+        elif abs(divisor) & (abs(divisor) - 1) == 0:
+            if abs(divisor) > 1:
+                self._emit(f"leal {abs(divisor) - 1}(%rax), %edx")
+                self._emit("testl %eax, %eax")
+                self._emit("cmovsl %edx, %eax")
+                self._emit(f"sarl ${abs(divisor).bit_length() - 1}, %eax")
+            if divisor < 0:
+                self._emit("negl %eax")
+        else:
+            magic, shift = signed_magic(divisor)
+            self._emit("movl %eax, %edx")
+            self._emit("cltq")
+            self._emit(f"imulq ${magic}, %rax, %rax")
+            self._emit("sarq $32, %rax")
+            if divisor > 0 and magic < 0:
+                self._emit("addl %edx, %eax")
+            elif divisor < 0 and magic > 0:
+                self._emit("subl %edx, %eax")
+            if shift:
+                self._emit(f"sarl ${shift}, %eax")
+            self._emit("movl %eax, %edx")
+            self._emit("shrl $31, %edx")
+            self._emit("addl %edx, %eax")
+        self._move("%eax", target)
+
+    #Divisão por potência de 2 constante vira multiplicação pelo inverso, que é exato
+    def _real_binary(self, instr, target):
+        op = instr.opcode
+        a = self._real_operand(instr, "arg1", "%xmm14")
+        divisor = int32(instr.arg2.value) if instr.arg2.is_literal() else 0
+        if op == "DIV" and divisor and abs(divisor) & (abs(divisor) - 1) == 0:
+            op, b = "MUL", self._double_constant(1 / divisor)
+        else:
+            b = self._real_operand(instr, "arg2", "%xmm15")
+        if op in COMMUTATIVE and b == target and a != target:
+            a, b = b, a
+        #Depois da troca, o inteiro convertido em xmm14 pode ter virado o segundo operando
+        if is_register(target) and b != target:
+            work = target
+        else:
+            work = "%xmm15" if b == "%xmm14" else "%xmm14"
+        self._move(a, work, real=True)
+        self._emit(f"{REAL_OPS[op]} {b}, {work}")
+        self._move(work, target, real=True)